@@ -0,0 +1,129 @@
+"""Motor de alertas: gera e resolve AlertaEstoque a partir do status do produto.
+
+Em vez de reagir a cada transição isoladamente, sincronizar_alertas() compara
+o status atual de um conjunto de produtos com os alertas pendentes deles e
+corrige a diferença com um número fixo de consultas, qualquer que seja o
+tamanho do conjunto. Assim o mesmo código serve para uma movimentação e para
+lotes inteiros.
+"""
+from collections import defaultdict
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .events import publicar_ao_confirmar
+from .models import AlertaEstoque, Produto
+
+TIPO_ALERTA_POR_STATUS = {
+    'baixo': 'atencao',
+    'critico': 'critico',
+    'esgotado': 'critico',
+}
+
+# Alertas manuais ('info') nunca são resolvidos automaticamente
+TIPOS_AUTOMATICOS = set(TIPO_ALERTA_POR_STATUS.values())
+
+# Mantém o número de parâmetros de cada IN (...) abaixo do limite do SQLite
+TAMANHO_LOTE = 500
+
+
+def mensagem_alerta(produto):
+    return (
+        f"{produto.nome}: {produto.get_status_estoque_display().lower()} "
+        f"({produto.quantidade} em estoque, mínimo {produto.estoque_minimo})"
+    )
+
+
+def sincronizar_alertas(produto_ids):
+    """Garante um único alerta pendente por produto em baixo/crítico/esgotado.
+
+    Produtos que voltaram a 'disponivel' (ou foram desativados) têm os alertas
+    automáticos resolvidos; uma mudança de gravidade (baixo -> esgotado)
+    resolve o alerta antigo e abre um novo. `produto_ids` é uma lista de ids
+    ou um queryset de Produto, lido em fatias. Devolve (criados, resolvidos).
+
+    Os clientes de /api/eventos/ recebem um único evento 'estoque' com todos
+    os produtos do conjunto, mais um evento por alerta criado ou resolvido.
+    """
+    if isinstance(produto_ids, QuerySet):
+        lotes = _lotes_do_queryset(produto_ids)
+    else:
+        produto_ids = list(set(produto_ids))
+        lotes = (
+            produto_ids[inicio:inicio + TAMANHO_LOTE]
+            for inicio in range(0, len(produto_ids), TAMANHO_LOTE)
+        )
+    estoque, eventos = [], []
+    for lote in lotes:
+        _sincronizar_lote(lote, estoque, eventos)
+
+    if estoque:
+        eventos.insert(0, ('estoque', {'produtos': estoque}))
+    publicar_ao_confirmar(eventos)
+    return (
+        sum(tipo == 'alerta' for tipo, _ in eventos),
+        sum(tipo == 'alerta_resolvido' for tipo, _ in eventos),
+    )
+
+
+def _lotes_do_queryset(queryset):
+    """Ids de um queryset de Produto em fatias (keyset pelo id), sem carregar todos de uma vez."""
+    ultimo = 0
+    while True:
+        ids = list(queryset.filter(pk__gt=ultimo).order_by('pk').values_list('pk', flat=True)[:TAMANHO_LOTE])
+        if not ids:
+            return
+        yield ids
+        ultimo = ids[-1]
+
+
+def _pendentes(produto_ids):
+    return AlertaEstoque.objects.filter(
+        produto_id__in=produto_ids, resolvido=False, tipo_alerta__in=TIPOS_AUTOMATICOS
+    )
+
+
+def _sincronizar_lote(produto_ids, estoque, eventos):
+    """Corrige os alertas de um lote e acrescenta os eventos a publicar em `estoque` e `eventos`."""
+    produtos = Produto.objects.filter(pk__in=produto_ids).only(
+        'id', 'nome', 'quantidade', 'estoque_minimo', 'status_estoque', 'ativo'
+    )
+    pendentes = defaultdict(list)
+    for alerta in _pendentes(produto_ids).only('id', 'produto_id', 'tipo_alerta'):
+        pendentes[alerta.produto_id].append(alerta)
+
+    novos = []
+    resolver = []
+    for produto in produtos:
+        estoque.append({
+            'produto': produto.id,
+            'quantidade': produto.quantidade,
+            'status_estoque': produto.status_estoque,
+        })
+        tipo = TIPO_ALERTA_POR_STATUS.get(produto.status_estoque) if produto.ativo else None
+        alertas = pendentes.get(produto.id, [])
+        resolver.extend(alerta.id for alerta in alertas if alerta.tipo_alerta != tipo)
+        if tipo and not any(alerta.tipo_alerta == tipo for alerta in alertas):
+            novos.append(AlertaEstoque(
+                produto=produto, tipo_alerta=tipo, mensagem=mensagem_alerta(produto)
+            ))
+
+    if resolver:
+        AlertaEstoque.objects.filter(pk__in=resolver).update(resolvido=True, lido=True, data_atualizacao=timezone.now())
+    if novos:
+        # A restrição api_alerta_pendente_unico recusa o segundo alerta pendente do
+        # mesmo tipo: se outra transação criou o alerta depois da leitura acima, o
+        # INSERT é ignorado. Os ids não voltam do INSERT OR IGNORE, então os
+        # alertas abertos agora são lidos de novo.
+        AlertaEstoque.objects.bulk_create(novos, ignore_conflicts=True)
+        vistos = {alerta.id for alertas in pendentes.values() for alerta in alertas}
+        novos = _pendentes([alerta.produto_id for alerta in novos]).exclude(pk__in=vistos).select_related('produto')
+
+    eventos.extend(('alerta', {
+        'id': alerta.id,
+        'produto': alerta.produto_id,
+        'produto_nome': alerta.produto.nome,
+        'tipo_alerta': alerta.tipo_alerta,
+        'mensagem': alerta.mensagem,
+    }) for alerta in novos)
+    eventos.extend(('alerta_resolvido', {'id': alerta_id}) for alerta_id in resolver)
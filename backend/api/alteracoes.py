@@ -0,0 +1,135 @@
+"""Feed de alterações de produtos (sincronização incremental).
+
+Triggers do SQLite mantêm em api_alteracaoproduto uma linha por produto com
+a sua última alteração; o id da linha é renovado a cada escrita e serve de
+cursor. Um cliente guarda o cursor da última sincronização e pede só o que
+mudou depois dele: o custo depende do número de alterações, não do tamanho
+do catálogo. Exclusões viram tombstones (removido=1); produtos desativados
+são enviados como removidos pelo feed.
+"""
+from django.apps import apps as global_apps
+from django.db import connections, transaction
+
+TABELA = 'api_alteracaoproduto'
+
+
+def _registrar(linha, removido):
+    # DELETE + INSERT (e não UPDATE) para o produto receber um id novo
+    return f"""
+        DELETE FROM {TABELA} WHERE produto_id = {linha}.id;
+        INSERT INTO {TABELA} (produto_id, removido) VALUES ({linha}.id, {removido});
+    """
+
+
+SQL_TRIGGERS = {
+    'api_alteracao_produto_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS api_alteracao_produto_ai AFTER INSERT ON api_produto BEGIN
+            {_registrar('new', 0)}
+        END
+    """,
+    'api_alteracao_produto_au': f"""
+        CREATE TRIGGER IF NOT EXISTS api_alteracao_produto_au AFTER UPDATE ON api_produto BEGIN
+            {_registrar('new', 0)}
+        END
+    """,
+    'api_alteracao_produto_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS api_alteracao_produto_ad AFTER DELETE ON api_produto BEGIN
+            {_registrar('old', 1)}
+        END
+    """,
+}
+
+
+def alteracoes_disponiveis(connection):
+    return connection.vendor == 'sqlite'
+
+
+def criar_triggers_alteracoes(connection):
+    with connection.cursor() as cursor:
+        for sql in SQL_TRIGGERS.values():
+            cursor.execute(sql)
+
+
+def remover_triggers_alteracoes(connection):
+    with connection.cursor() as cursor:
+        for nome in SQL_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+
+
+def registrar_todos(connection):
+    """Registra todos os produtos atuais como alterados agora.
+
+    Os clientes recebem o catálogo de novo na próxima sincronização, o que é
+    seguro depois de escritas que os triggers não registraram.
+    """
+    with connection.cursor() as cursor:
+        # Produtos excluídos enquanto não havia triggers ganham o tombstone agora
+        cursor.execute(
+            f'SELECT produto_id FROM {TABELA} '
+            f'WHERE NOT removido AND produto_id NOT IN (SELECT id FROM api_produto)'
+        )
+        excluidos = [(produto_id,) for produto_id, in cursor.fetchall()]
+        cursor.execute(f'DELETE FROM {TABELA} WHERE NOT removido')
+        cursor.executemany(f'INSERT INTO {TABELA} (produto_id, removido) VALUES (%s, 1)', excluidos)
+        cursor.execute(
+            f'INSERT INTO {TABELA} (produto_id, removido) '
+            f'SELECT id, 0 FROM api_produto ORDER BY data_atualizacao, id'
+        )
+
+
+def listar_alteracoes(desde, limite):
+    """Alterações depois do cursor `desde`, em ordem; devolve (produtos, removidos, cursor, mais).
+
+    `produtos` são os Produto ativos alterados e `removidos` os ids excluídos
+    ou desativados. As duas consultas não precisam de transação (que no
+    SQLite com BEGIN IMMEDIATE pegaria a trava de escrita): um produto
+    alterado ou excluído entre elas ganha uma alteração depois do cursor
+    devolvido, e o cliente recebe o estado final de novo na próxima página.
+    """
+    AlteracaoProduto = global_apps.get_model('api', 'AlteracaoProduto')
+    Produto = global_apps.get_model('api', 'Produto')
+
+    alteracoes = list(
+        AlteracaoProduto.objects.filter(pk__gt=desde)
+        .order_by('pk')
+        .values_list('pk', 'produto_id', 'removido')[:limite + 1]
+    )
+    mais = len(alteracoes) > limite
+    alteracoes = alteracoes[:limite]
+    vivos = Produto.objects.select_related('criado_por').filter(ativo=True).in_bulk(
+        [produto_id for _, produto_id, removido in alteracoes if not removido]
+    )
+
+    produtos = []
+    removidos = []
+    for _, produto_id, _ in alteracoes:
+        if produto_id in vivos:
+            produtos.append(vivos[produto_id])
+        else:
+            removidos.append(produto_id)
+    cursor = alteracoes[-1][0] if alteracoes else desde
+    return produtos, removidos, cursor, mais
+
+
+def garantir_alteracoes(sender, using='default', **kwargs):
+    """Recria os triggers se uma migração tiver reconstruído api_produto (post_migrate).
+
+    Escritas feitas sem os triggers não foram registradas, então todos os
+    produtos são marcados como alterados.
+    """
+    apps = kwargs.get('apps') or global_apps
+    try:
+        apps.get_model('api', 'AlteracaoProduto')
+    except LookupError:
+        return
+
+    connection = connections[using]
+    if not alteracoes_disponiveis(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existentes = {row[0] for row in cursor.fetchall()}
+    if not set(SQL_TRIGGERS) <= existentes:
+        with transaction.atomic(using=using):
+            criar_triggers_alteracoes(connection)
+            registrar_todos(connection)
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .alteracoes import garantir_alteracoes
+        from .consumo import garantir_consumo
+        from .perfil import instalar_contador_sql
+        from .resumo import garantir_resumo
+        from .search import garantir_indice_busca
+        post_migrate.connect(garantir_indice_busca, sender=self)
+        post_migrate.connect(garantir_resumo, sender=self)
+        post_migrate.connect(garantir_alteracoes, sender=self)
+        post_migrate.connect(garantir_consumo, sender=self)
+        connection_created.connect(instalar_contador_sql)
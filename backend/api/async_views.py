@@ -0,0 +1,86 @@
+"""Versões assíncronas das leituras mais frequentes: produtos, alertas e dashboard.
+
+Rodando no saep/asgi.py, uma requisição que espera o banco devolve o event
+loop para as demais em vez de prender um worker. O corpo das respostas é o
+mesmo das views do DRF correspondentes (GET /api/produtos/, /api/alertas/ e
+/api/dashboard/).
+"""
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from .authentication import autenticar_jwt
+from .condicional import avalidador, com_validadores, nao_modificado, validador_conteudo
+from .dashboard import aobter_dashboard
+from .models import AlertaEstoque, Produto
+from .pagination import ProdutoPagination
+from .search import buscar_produtos
+from .serializers import AlertaEstoqueSerializer, ProdutoSerializer
+
+
+def _json(dados, status=200):
+    # Mesmo renderer do DRF, para a saída ser idêntica à das views síncronas
+    return HttpResponse(JSONRenderer().render(dados), content_type='application/json', status=status)
+
+
+def _nao_autenticado():
+    response = _json({'detail': 'Credenciais inválidas ou não informadas'}, status=401)
+    response['WWW-Authenticate'] = 'Bearer realm="api"'
+    return response
+
+
+def autenticado(view):
+    """Exige um access token válido no header Authorization."""
+    async def wrapper(request, *args, **kwargs):
+        usuario = await autenticar_jwt(request)
+        if usuario is None:
+            return _nao_autenticado()
+        request.user = usuario
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@require_GET
+@autenticado
+async def produtos(request):
+    queryset = Produto.objects.select_related('criado_por')
+    termo = request.GET.get('search')
+    if termo:
+        queryset = buscar_produtos(queryset, termo)
+
+    etag, last_modified = await avalidador(queryset, ('data_atualizacao',), request)
+    if response := nao_modificado(request, etag, last_modified):
+        return com_validadores(response, etag, last_modified)
+
+    paginacao = ProdutoPagination()
+    try:
+        pagina = await paginacao.apaginate_queryset(queryset, Request(request))
+    except NotFound as e:
+        return _json({'detail': e.detail}, status=404)
+    response = _json(paginacao.get_paginated_data(ProdutoSerializer(pagina, many=True).data))
+    return com_validadores(response, etag, last_modified)
+
+
+@require_GET
+@autenticado
+async def alertas(request):
+    queryset = AlertaEstoque.objects.filter(lido=False).select_related('produto')
+    etag, last_modified = await avalidador(
+        queryset, ('data_criacao', 'data_atualizacao', 'produto__data_atualizacao'), request
+    )
+    if response := nao_modificado(request, etag, last_modified):
+        return com_validadores(response, etag, last_modified)
+
+    alertas = [alerta async for alerta in queryset.aiterator()]
+    return com_validadores(_json(AlertaEstoqueSerializer(alertas, many=True).data), etag, last_modified)
+
+
+@require_GET
+@autenticado
+async def dashboard(request):
+    dados = await aobter_dashboard()
+    etag, last_modified = validador_conteudo(dados)
+    response = nao_modificado(request, etag, last_modified) or _json(dados)
+    return com_validadores(response, etag, last_modified)
@@ -1,75 +1,68 @@
 # api/auth_views.py
+from django.contrib.auth.hashers import check_password, make_password
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate
 from .models import Usuario
 from .serializers import UsuarioSerializer
-import json
+from .throttling import LimiteLoginEmail, LimiteLoginIP, LoginBloqueado, chave_email, tentativas_por_email
+
+_hash_ficticio = None
+
+def verificar_senha_ficticia(password):
+    """Gasta o mesmo tempo de um check_password quando o e-mail não existe.
+
+    Sem isso a resposta rápida para e-mails desconhecidos revelaria quais
+    e-mails têm conta. Na primeira chamada o próprio make_password() é o
+    único hash da tentativa.
+    """
+    global _hash_ficticio
+    if _hash_ficticio is None:
+        _hash_ficticio = make_password(password)
+    else:
+        check_password(password, _hash_ficticio)
+    return False
 
 class LoginView(generics.GenericAPIView):
     permission_classes = [AllowAny]
     serializer_class = UsuarioSerializer
-    
+    # Verificados antes do post(), ou seja, antes de qualquer hash de senha
+    throttle_classes = [LimiteLoginIP, LimiteLoginEmail]
+
+    def throttled(self, request, wait):
+        raise LoginBloqueado(wait)
+
     def post(self, request, *args, **kwargs):
-        # Handle JSON data
-        if request.content_type == 'application/json':
-            try:
-                data = json.loads(request.body)
-                email = data.get('email')
-                password = data.get('password')
-            except json.JSONDecodeError:
-                return Response(
-                    {'error': 'JSON inválido'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        else:
-            email = request.data.get('email')
-            password = request.data.get('password')
-        
-        print(f"Login attempt with email: {email}")
-        
-        if not email or not password:
+        # request.data já vem interpretado pelo DRF (JSON ou formulário); um
+        # corpo JSON que não é objeto (lista, número) cai no 400 abaixo
+        dados = request.data if isinstance(request.data, dict) else {}
+        email = dados.get('email')
+        password = dados.get('password')
+
+        if not isinstance(email, str) or not isinstance(password, str) or not email or not password:
             return Response(
                 {'error': 'Email e senha são obrigatórios'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        try:
-            # Busca o usuário pelo email
-            user = Usuario.objects.get(email=email)
-            print(f"User found: {user.username} - {user.email}")
-            print(f"User active: {user.is_active}")
-            
-            # Verifica a senha MANUALMENTE (evita problemas com authenticate)
-            if user.check_password(password) and user.is_active:
-                print("Password is correct and user is active")
-                
-                # Gera os tokens JWT diretamente
-                refresh = RefreshToken.for_user(user)
-                return Response({
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                    'user': UsuarioSerializer(user).data
-                })
-            else:
-                print(f"Password correct: {user.check_password(password)}")
-                print(f"User active: {user.is_active}")
-                return Response(
-                    {'error': 'Credenciais inválidas'},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-                
-        except Usuario.DoesNotExist:
-            print(f"User with email {email} not found")
+
+        user = Usuario.objects.filter(email=email).first()
+        # Exatamente um hash por tentativa, exista o usuário ou não
+        if user is None:
+            senha_correta = verificar_senha_ficticia(password)
+        else:
+            senha_correta = user.check_password(password)
+
+        if not senha_correta or not user.is_active:
             return Response(
                 {'error': 'Credenciais inválidas'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
-        except Exception as e:
-            print(f"Unexpected error: {str(e)}")
-            return Response(
-                {'error': 'Erro interno do servidor'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+
+        tentativas_por_email.limpar(chave_email(email))
+        refresh = RefreshToken.for_user(user)
+        return Response({
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'user': UsuarioSerializer(user).data
+        })
@@ -0,0 +1,144 @@
+"""Autenticação JWT com cache dos usuários e versão para views assíncronas.
+
+Com o JWTAuthentication padrão toda requisição faz um SELECT em api_usuario
+para transformar o user_id do token em um Usuario. Aqui o usuário fica num
+cache LRU com expiração, local ao processo, e é descartado quando o Usuario
+é salvo ou excluído (ver api/signals.py). O TTL limita a defasagem nos
+outros processos, que não recebem o sinal, e em escritas com update().
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .perfil import medir
+
+TAMANHO_CACHE_USUARIOS = 1024
+TTL_CACHE_USUARIOS = 60
+
+
+class CacheUsuarios:
+    """Cache LRU com TTL dos usuários autenticados (thread-safe).
+
+    Guarda os valores das colunas e monta um Usuario novo a cada leitura,
+    para que uma requisição nunca altere a instância vista por outra.
+    """
+
+    def __init__(self, tamanho=TAMANHO_CACHE_USUARIOS, ttl=TTL_CACHE_USUARIOS):
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()
+
+    def obter(self, user_id):
+        chave = str(user_id)
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return None
+            expira, db, valores = item
+            if expira < time.monotonic():
+                del self._itens[chave]
+                return None
+            self._itens.move_to_end(chave)
+        modelo = get_user_model()
+        campos = [campo.attname for campo in modelo._meta.concrete_fields]
+        return modelo.from_db(db, campos, valores)
+
+    def guardar(self, usuario):
+        chave = str(getattr(usuario, api_settings.USER_ID_FIELD))
+        valores = tuple(getattr(usuario, campo.attname) for campo in usuario._meta.concrete_fields)
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl, usuario._state.db, valores)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+    def descartar(self, user_id):
+        with self._lock:
+            self._itens.pop(str(user_id), None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+
+usuarios_em_cache = CacheUsuarios()
+
+
+def _id_do_token(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken(_('Token contained no recognizable user identification'))
+
+
+def _verificar_usuario(user, validated_token):
+    # Mesmas verificações de JWTAuthentication.get_user(), refeitas a cada uso do cache
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+    if api_settings.CHECK_REVOKE_TOKEN:
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que só consulta o banco quando o usuário não está no cache."""
+
+    def authenticate(self, request):
+        with medir('autenticacao'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        usuario = usuarios_em_cache.obter(_id_do_token(validated_token))
+        if usuario is None:
+            usuario = super().get_user(validated_token)
+            usuarios_em_cache.guardar(usuario)
+        return _verificar_usuario(usuario, validated_token)
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """CachedJWTAuthentication com a busca do usuário feita pelo ORM assíncrono.
+
+    A validação do token é só CPU; a única consulta (o usuário, quando não
+    está no cache) usa aget(), sem ocupar uma thread do sync_to_async.
+    """
+
+    async def aget_user(self, validated_token):
+        user_id = _id_do_token(validated_token)
+        usuario = usuarios_em_cache.obter(user_id)
+        if usuario is None:
+            try:
+                usuario = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            usuarios_em_cache.guardar(usuario)
+        return _verificar_usuario(usuario, validated_token)
+
+
+async def autenticar_jwt(request):
+    """Valida o access token do SimpleJWT (header Authorization) e devolve o usuário (ou None)."""
+    with medir('autenticacao'):
+        return await _autenticar_jwt(request)
+
+
+async def _autenticar_jwt(request):
+    autenticacao = AsyncJWTAuthentication()
+    header = autenticacao.get_header(request)
+    token = autenticacao.get_raw_token(header) if header else None
+    if not token:
+        return None
+
+    try:
+        validado = autenticacao.get_validated_token(token)
+        return await autenticacao.aget_user(validado)
+    except (InvalidToken, AuthenticationFailed, TokenError):
+        return None
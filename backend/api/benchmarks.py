@@ -0,0 +1,131 @@
+"""Utilitários do comando bench_api: banco temporário, dados sintéticos e medição em threads."""
+import os
+import itertools
+import random
+import tempfile
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+
+# Senha de todos os usuários criados por gerar_dados()
+SENHA_GERADA = 'Bench-senha-123'
+
+
+@contextmanager
+def banco_temporario():
+    """Cria um banco SQLite descartável, com as migrações aplicadas.
+
+    Usa um arquivo (e não o banco em memória dos testes) para que várias
+    threads, cada uma com a sua conexão, disputem o mesmo banco.
+    """
+    with tempfile.TemporaryDirectory() as diretorio:
+        connection.settings_dict.setdefault('TEST', {})
+        connection.settings_dict['TEST']['NAME'] = os.path.join(diretorio, 'bench.sqlite3')
+        nome_original = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            yield
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+
+def executar_em_threads(funcao, n_threads, *args):
+    """Executa funcao(indice, *args) em n_threads threads e devolve os resultados."""
+    resultados = [None] * n_threads
+    barreira = threading.Barrier(n_threads)
+
+    def alvo(indice):
+        barreira.wait()
+        try:
+            resultados[indice] = funcao(indice, *args)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=alvo, args=(i,)) for i in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return resultados
+
+
+def resumir_latencias(latencias, duracao):
+    """Requisições por segundo e percentis (em ms) de uma lista de latências em segundos."""
+    latencias = sorted(latencias)
+
+    def percentil(p):
+        return latencias[min(len(latencias) - 1, int(len(latencias) * p / 100))] * 1000
+
+    return {
+        'requisicoes': len(latencias),
+        'req_s': len(latencias) / duracao,
+        'p50_ms': percentil(50),
+        'p95_ms': percentil(95),
+        'p99_ms': percentil(99),
+    }
+
+
+def _inserir_em_lotes(modelo, objetos, lote):
+    objetos = iter(objetos)
+    while fatia := list(itertools.islice(objetos, lote)):
+        modelo.objects.bulk_create(fatia)
+
+
+def gerar_dados(produtos, movimentacoes, usuarios, semente=0, lote=5000):
+    """Popula o banco com dados sintéticos reproduzíveis (mesma semente, mesmos dados).
+
+    Tudo entra por bulk_create, em lotes de `lote` linhas (gerados sob
+    demanda, sem montar milhões de objetos de uma vez). Os usuários
+    compartilham um único hash de SENHA_GERADA, calculado uma vez. Devolve os
+    ids dos usuários.
+    """
+    from .alertas import sincronizar_alertas
+    from .models import MovimentacaoEstoque, Produto, Usuario
+
+    aleatorio = random.Random(semente)
+    hash_senha = make_password(SENHA_GERADA)
+    _inserir_em_lotes(
+        Usuario,
+        (
+            Usuario(
+                username=f'usuario{i}', email=f'usuario{i}@saep.local', password=hash_senha,
+                first_name=f'Nome{i}', last_name=f'Sobrenome{i}', empresa=f'Empresa {i % 50}',
+            )
+            for i in range(usuarios)
+        ),
+        lote,
+    )
+    ids_usuarios = list(Usuario.objects.order_by('id').values_list('id', flat=True))
+
+    def produto(i):
+        quantidade = aleatorio.randint(0, 500)
+        estoque_minimo = aleatorio.randint(0, 50)
+        return Produto(
+            codigo=f'P{i:07d}', nome=f'Produto {i:07d}', descricao=f'Descrição do produto {i}',
+            quantidade=quantidade, estoque_minimo=estoque_minimo,
+            preco=Decimal(aleatorio.randint(100, 100_000)) / 100, criado_por_id=aleatorio.choice(ids_usuarios),
+        )
+
+    _inserir_em_lotes(Produto, (produto(i) for i in range(produtos)), lote)
+    ids_produtos = list(Produto.objects.order_by('id').values_list('id', flat=True))
+    # bulk_create não passa pelos sinais que abrem os alertas
+    sincronizar_alertas(ids_produtos)
+
+    _inserir_em_lotes(
+        MovimentacaoEstoque,
+        (
+            MovimentacaoEstoque(
+                produto_id=aleatorio.choice(ids_produtos), usuario_id=aleatorio.choice(ids_usuarios),
+                tipo_movimentacao='entrada' if aleatorio.random() < 0.4 else 'saida',
+                quantidade=aleatorio.randint(1, 20),
+            )
+            for _ in range(movimentacoes)
+        ),
+        lote,
+    )
+    return ids_usuarios
@@ -0,0 +1,179 @@
+"""Campos esparsos (?fields=) e leitura rápida das listagens.
+
+Cada campo de um serializer com CamposEsparsosMixin é traduzido para as
+colunas que ele lê: campos do modelo, fontes com ponto sobre relações
+('produto.nome') e get_<campo>_display saem sozinhos; outras fontes
+calculadas são declaradas em Meta.leituras como
+nome -> (colunas, função que monta o valor a partir da linha).
+
+Com isso o CamposMixin da view:
+- recorta a saída aos campos pedidos em ?fields=a,b;
+- carrega só as colunas desses campos, com select_related apenas das
+  relações que eles atravessam (sem N+1 e sem JOIN à toa);
+- na listagem, busca com values() e monta os dicionários direto, sem
+  instanciar modelos nem passar pelo ModelSerializer. A saída é a mesma do
+  serializer.
+"""
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .perfil import medir
+
+PARAMETRO_CAMPOS = 'fields'
+
+# Campos do DRF cujo to_representation não muda o valor que vem do banco
+_SEM_CONVERSAO = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+_planos = {}
+
+
+class CamposEsparsosMixin:
+    """Mixin de serializer: campos=[...] limita os campos da saída."""
+
+    def __init__(self, *args, campos=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nome in set(self.fields) - set(campos):
+                self.fields.pop(nome)
+
+
+def _converter(campo):
+    if isinstance(campo, _SEM_CONVERSAO):
+        return lambda valor: valor
+    # O DRF não chama to_representation para valores nulos
+    return lambda valor: None if valor is None else campo.to_representation(valor)
+
+
+def _ler_coluna(coluna, converter):
+    return (coluna,), lambda linha: converter(linha[coluna])
+
+
+def _leitura(modelo, campo):
+    """(colunas, ler) de um campo do serializer, ou None se a fonte não for só colunas."""
+    fonte = campo.source_attrs
+    exibicao = re.fullmatch(r'get_(\w+)_display', fonte[-1]) if fonte else None
+    if exibicao:
+        fonte = [*fonte[:-1], exibicao[1]]
+
+    caminho, atual = [], modelo
+    for posicao, atributo in enumerate(fonte):
+        try:
+            campo_modelo = atual._meta.get_field(atributo)
+        except FieldDoesNotExist:
+            return None
+        caminho.append(atributo)
+        if posicao < len(fonte) - 1:
+            if not campo_modelo.many_to_one and not campo_modelo.one_to_one:
+                return None
+            atual = campo_modelo.related_model
+        elif campo_modelo.many_to_many or campo_modelo.one_to_many:
+            return None
+    coluna = '__'.join(caminho)
+
+    if exibicao:
+        escolhas = dict(campo_modelo.flatchoices)
+        return _ler_coluna(coluna, lambda valor: None if valor is None else str(escolhas.get(valor, valor)))
+    return _ler_coluna(coluna, _converter(campo))
+
+
+def plano(serializer_class):
+    """Leitura de cada campo do serializer: nome -> (colunas, ler) ou None.
+
+    Calculado uma vez por classe.
+    """
+    leituras = _planos.get(serializer_class)
+    if leituras is None:
+        modelo = serializer_class.Meta.model
+        declaradas = getattr(serializer_class.Meta, 'leituras', {})
+        leituras = {
+            nome: declaradas[nome] if nome in declaradas else _leitura(modelo, campo)
+            for nome, campo in serializer_class().fields.items()
+        }
+        _planos[serializer_class] = leituras
+    return leituras
+
+
+class CamposMixin:
+    """?fields= e leitura rápida para viewsets com serializer CamposEsparsosMixin."""
+    acoes_com_campos = ('list', 'retrieve')
+
+    def campos_pedidos(self):
+        """Campos pedidos em ?fields= (todos, se ausente), na ordem do serializer."""
+        if not hasattr(self, '_campos_pedidos'):
+            disponiveis = list(plano(self.get_serializer_class()))
+            valor = self.request.query_params.get(PARAMETRO_CAMPOS, '')
+            pedidos = {nome.strip() for nome in valor.split(',') if nome.strip()}
+            desconhecidos = pedidos - set(disponiveis)
+            if desconhecidos:
+                raise ValidationError({PARAMETRO_CAMPOS: (
+                    f"Campos desconhecidos: {', '.join(sorted(desconhecidos))}. "
+                    f"Use: {', '.join(disponiveis)}"
+                )})
+            self._campos_pedidos = [nome for nome in disponiveis if nome in pedidos] if pedidos else disponiveis
+        return self._campos_pedidos
+
+    def _com_campos(self):
+        return self.action in self.acoes_com_campos and self.request.method == 'GET'
+
+    def _colunas(self, campos):
+        """Colunas lidas pelos campos, mais o id e o campo de ordenação da paginação.
+
+        None se algum campo não puder ser lido só de colunas.
+        """
+        leituras = plano(self.get_serializer_class())
+        if any(leituras[nome] is None for nome in campos):
+            return None
+        colunas = {'id'}
+        ordenacao = getattr(self.paginator, 'ordering', None)
+        if ordenacao:
+            colunas.add(ordenacao.lstrip('-'))
+        for nome in campos:
+            colunas.update(leituras[nome][0])
+        return sorted(colunas)
+
+    def get_serializer(self, *args, **kwargs):
+        if self._com_campos():
+            kwargs.setdefault('campos', self.campos_pedidos())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self._com_campos():
+            return queryset
+        colunas = self._colunas(self.campos_pedidos())
+        if colunas is None:
+            return queryset
+        # Cada relação atravessada vira um JOIN, e a chave estrangeira precisa ser carregada
+        relacoes = {coluna.rsplit('__', 1)[0] for coluna in colunas if '__' in coluna}
+        for relacao in list(relacoes):
+            partes = relacao.split('__')
+            relacoes.update('__'.join(partes[:i]) for i in range(1, len(partes)))
+        return queryset.select_related(*relacoes).only(*colunas, *relacoes)
+
+    def list(self, request, *args, **kwargs):
+        campos = self.campos_pedidos()
+        colunas = self._colunas(campos)
+        if colunas is None:
+            return super().list(request, *args, **kwargs)
+
+        linhas = self.filter_queryset(self.get_queryset()).values(*colunas)
+        pagina = self.paginate_queryset(linhas)
+        leituras = plano(self.get_serializer_class())
+        leitores = [(nome, leituras[nome][1]) for nome in campos]
+        with medir('serializacao'):
+            dados = [
+                {nome: ler(linha) for nome, ler in leitores}
+                for linha in (linhas if pagina is None else pagina)
+            ]
+        if pagina is not None:
+            return self.get_paginated_response(dados)
+        return Response(dados)
@@ -0,0 +1,73 @@
+"""GET condicional (ETag / Last-Modified) para as listagens.
+
+O validador de uma coleção é calculado com uma única agregação indexada
+(total de linhas e data da última alteração) mais a URL pedida, que
+identifica os filtros e a página. Se o cliente já tem essa versão, a
+resposta é um 304 sem corpo e nada é serializado.
+
+Exclusões só mudam o total, que o Last-Modified não reflete: clientes que
+enviam apenas If-Modified-Since não as percebem, por isso o ETag é o
+validador principal (o navegador envia os dois, e If-None-Match prevalece).
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+
+def _montar(agregados, request):
+    datas = [valor for chave, valor in agregados.items() if chave != 'total' and valor]
+    ultima = max(datas) if datas else None
+    # A URL identifica filtros e página; o media type separa JSON da API navegável do DRF
+    formato = getattr(request, 'accepted_media_type', '')
+    chave = f"{agregados['total']}|{ultima.isoformat() if ultima else ''}|{request.get_full_path()}|{formato}"
+    etag = quote_etag(hashlib.md5(chave.encode()).hexdigest())
+    # Last-Modified tem resolução de segundos
+    return etag, int(ultima.timestamp()) if ultima else None
+
+
+def _agregacao(campos_data):
+    return {'total': Count('pk'), **{f'ultima_{i}': Max(campo) for i, campo in enumerate(campos_data)}}
+
+
+def validador(queryset, campos_data, request):
+    """(etag, last_modified) da coleção; campos_data são os campos de data que mudam a cada alteração."""
+    return _montar(queryset.order_by().aggregate(**_agregacao(campos_data)), request)
+
+
+async def avalidador(queryset, campos_data, request):
+    return _montar(await queryset.order_by().aaggregate(**_agregacao(campos_data)), request)
+
+
+def validador_conteudo(dados):
+    """ETag para dados já prontos (ex.: o dashboard em cache)."""
+    return quote_etag(hashlib.md5(JSONRenderer().render(dados)).hexdigest()), None
+
+
+def nao_modificado(request, etag, last_modified):
+    """HttpResponseNotModified se o cliente já tem esta versão; senão None."""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def com_validadores(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # O navegador guarda a resposta, mas revalida sempre antes de usá-la
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class CondicionalMixin:
+    """Responde 304 na listagem (GET) quando a coleção não mudou."""
+    campos_validador = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = validador(queryset, self.campos_validador, request)
+        response = nao_modificado(request, etag, last_modified)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return com_validadores(response, etag, last_modified)
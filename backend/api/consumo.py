@@ -0,0 +1,215 @@
+"""Consumo diário (ConsumoDiario) mantido por triggers do SQLite.
+
+Cada movimentação inserida soma a sua quantidade na linha (produto, dia,
+tipo) de api_consumodiario, com um INSERT ... ON CONFLICT DO UPDATE; exclusões
+e edições desfazem a parcela antiga. Vale para save(), bulk_create() e SQL
+direto. Os relatórios somam essas linhas, então o custo depende do número de
+dias pedidos e não do tamanho do histórico.
+"""
+from datetime import datetime, time, timedelta
+
+from django.apps import apps as global_apps
+from django.db import connections, models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Cast, TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+
+TABELA = 'api_consumodiario'
+TIPOS = ('entrada', 'saida')
+
+
+def _somar(linha):
+    return f"""
+        INSERT INTO {TABELA} (produto_id, data, tipo_movimentacao, quantidade, movimentacoes)
+        VALUES ({linha}.produto_id, date({linha}.data_movimentacao), {linha}.tipo_movimentacao, {linha}.quantidade, 1)
+        ON CONFLICT (produto_id, data, tipo_movimentacao) DO UPDATE SET
+            quantidade = quantidade + excluded.quantidade,
+            movimentacoes = movimentacoes + 1;
+    """
+
+
+def _subtrair(linha):
+    filtro = (
+        f"produto_id = {linha}.produto_id AND data = date({linha}.data_movimentacao) "
+        f"AND tipo_movimentacao = {linha}.tipo_movimentacao"
+    )
+    return f"""
+        UPDATE {TABELA} SET quantidade = quantidade - {linha}.quantidade, movimentacoes = movimentacoes - 1
+        WHERE {filtro};
+        DELETE FROM {TABELA} WHERE {filtro} AND movimentacoes <= 0;
+    """
+
+
+SQL_TRIGGERS = {
+    'api_consumo_movimentacao_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS api_consumo_movimentacao_ai
+        AFTER INSERT ON api_movimentacaoestoque BEGIN
+            {_somar('new')}
+        END
+    """,
+    'api_consumo_movimentacao_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS api_consumo_movimentacao_ad
+        AFTER DELETE ON api_movimentacaoestoque BEGIN
+            {_subtrair('old')}
+        END
+    """,
+    'api_consumo_movimentacao_au': f"""
+        CREATE TRIGGER IF NOT EXISTS api_consumo_movimentacao_au
+        AFTER UPDATE OF produto_id, tipo_movimentacao, quantidade, data_movimentacao
+        ON api_movimentacaoestoque
+        WHEN old.produto_id IS NOT new.produto_id OR old.tipo_movimentacao IS NOT new.tipo_movimentacao
+            OR old.quantidade IS NOT new.quantidade OR old.data_movimentacao IS NOT new.data_movimentacao
+        BEGIN
+            {_subtrair('old')}
+            {_somar('new')}
+        END
+    """,
+}
+
+
+def consumo_disponivel(connection):
+    return connection.vendor == 'sqlite'
+
+
+def criar_triggers_consumo(connection):
+    with connection.cursor() as cursor:
+        for sql in SQL_TRIGGERS.values():
+            cursor.execute(sql)
+
+
+def remover_triggers_consumo(connection):
+    with connection.cursor() as cursor:
+        for nome in SQL_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+
+
+def reconstruir_consumo(connection):
+    """Recalcula a tabela inteira a partir do histórico de movimentações."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABELA}')
+        cursor.execute(
+            f'INSERT INTO {TABELA} (produto_id, data, tipo_movimentacao, quantidade, movimentacoes) '
+            f'SELECT produto_id, date(data_movimentacao), tipo_movimentacao, SUM(quantidade), COUNT(*) '
+            f'FROM api_movimentacaoestoque GROUP BY 1, 2, 3'
+        )
+
+
+AGRUPAMENTOS = {
+    'dia': None,
+    'semana': TruncWeek,
+    'mes': TruncMonth,
+}
+
+
+def _do_consumo(inicio, fim):
+    ConsumoDiario = global_apps.get_model('api', 'ConsumoDiario')
+    return ConsumoDiario.objects.filter(data__gte=inicio, data__lte=fim), F('data'), Sum('movimentacoes')
+
+
+def _do_historico(inicio, fim):
+    """As mesmas linhas calculadas direto do histórico (bancos sem os triggers)."""
+    MovimentacaoEstoque = global_apps.get_model('api', 'MovimentacaoEstoque')
+    limites = [
+        timezone.make_aware(datetime.combine(data, time.min))
+        for data in (inicio, fim + timedelta(days=1))
+    ]
+    linhas = MovimentacaoEstoque.objects.filter(
+        data_movimentacao__gte=limites[0], data_movimentacao__lt=limites[1]
+    )
+    return linhas, TruncDate('data_movimentacao'), Count('id')
+
+
+def _usar_historico(historico):
+    """Por padrão usa o ConsumoDiario quando ele é mantido neste banco."""
+    if historico is None:
+        ConsumoDiario = global_apps.get_model('api', 'ConsumoDiario')
+        return not consumo_disponivel(connections[ConsumoDiario.objects.db])
+    return historico
+
+
+def _linhas(inicio, fim, historico):
+    """(linhas, expressão do dia, expressão da contagem) do período."""
+    return (_do_historico if _usar_historico(historico) else _do_consumo)(inicio, fim)
+
+
+def saidas_por_dia(inicio, fim, historico=None):
+    """(produto_id, data, quantidade) das saídas de cada produto em cada dia com movimento.
+
+    A data vem como texto AAAA-MM-DD: sem conversão linha a linha para date,
+    e o NumPy a interpreta direto como datetime64.
+    """
+    if not _usar_historico(historico):
+        # O ConsumoDiario já tem uma linha por produto, dia e tipo
+        linhas, dia, _ = _do_consumo(inicio, fim)
+        linhas = linhas.filter(tipo_movimentacao='saida').annotate(total=F('quantidade'))
+    else:
+        linhas, dia, _ = _do_historico(inicio, fim)
+        linhas = (
+            linhas.filter(tipo_movimentacao='saida')
+            .annotate(dia=dia)
+            .values('produto_id', 'dia')
+            .annotate(total=Sum('quantidade'))
+        )
+    return linhas.annotate(texto=Cast(dia, models.CharField())).values_list('produto_id', 'texto', 'total')
+
+
+def relatorio_consumo(inicio, fim, produto_id=None, agrupar='dia', historico=None):
+    """Totais de entradas e saídas entre as datas `inicio` e `fim` (inclusivas) e a série por período.
+
+    `agrupar` é uma chave de AGRUPAMENTOS; `historico=True` força a varredura
+    das movimentações em vez do ConsumoDiario.
+    """
+    linhas, dia, movimentacoes = _linhas(inicio, fim, historico)
+    if produto_id is not None:
+        linhas = linhas.filter(produto_id=produto_id)
+
+    truncar = AGRUPAMENTOS[agrupar]
+    periodo = truncar(dia, output_field=models.DateField()) if truncar else dia
+    valores = (
+        linhas.annotate(periodo=periodo)
+        .values('periodo', 'tipo_movimentacao')
+        .annotate(total=Sum('quantidade'), n=movimentacoes)
+        .order_by('periodo')
+    )
+
+    totais = {tipo: 0 for tipo in TIPOS}
+    totais['movimentacoes'] = 0
+    serie = {}
+    for linha in valores:
+        ponto = serie.setdefault(linha['periodo'], {'periodo': linha['periodo'], **{tipo: 0 for tipo in TIPOS}})
+        ponto[linha['tipo_movimentacao']] += linha['total']
+        totais[linha['tipo_movimentacao']] += linha['total']
+        totais['movimentacoes'] += linha['n']
+
+    return {
+        'inicio': inicio,
+        'fim': fim,
+        'produto': produto_id,
+        'agrupar': agrupar,
+        'totais': totais,
+        'serie': list(serie.values()),
+    }
+
+
+def garantir_consumo(sender, using='default', **kwargs):
+    """Recria os triggers se uma migração tiver reconstruído as tabelas (post_migrate).
+
+    Movimentações gravadas sem os triggers não foram somadas, então a tabela
+    é recalculada.
+    """
+    apps = kwargs.get('apps') or global_apps
+    try:
+        apps.get_model('api', 'ConsumoDiario')
+    except LookupError:
+        return
+
+    connection = connections[using]
+    if not consumo_disponivel(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existentes = {row[0] for row in cursor.fetchall()}
+    if not set(SQL_TRIGGERS) <= existentes:
+        with transaction.atomic(using=using):
+            criar_triggers_consumo(connection)
+            reconstruir_consumo(connection)
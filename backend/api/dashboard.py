@@ -0,0 +1,45 @@
+"""Dados do dashboard (página inicial).
+
+Sem cache: os contadores vêm da linha única do ResumoEstoque, mantida por
+triggers (ver api/resumo.py), e os últimos alertas de uma consulta com
+LIMIT. Um cache local ao processo ficaria desatualizado nos outros workers e
+nos comandos de gerenciamento.
+"""
+from asgiref.sync import sync_to_async
+
+from .models import AlertaEstoque, ResumoEstoque
+from .resumo import aobter_resumo, calcular_resumo, obter_resumo
+from .serializers import DashboardSerializer
+
+
+def _ultimos_alertas():
+    return (
+        AlertaEstoque.objects.filter(lido=False)
+        .select_related('produto')
+        .order_by('-data_criacao')[:5]
+    )
+
+
+def _serializar(resumo, ultimos_alertas):
+    return DashboardSerializer({
+        'total_produtos': resumo.total_produtos,
+        'produtos_em_estoque': resumo.produtos_disponiveis,
+        'produtos_criticos': resumo.produtos_critico + resumo.produtos_esgotado,
+        'alertas_nao_lidos': resumo.alertas_nao_lidos,
+        'valor_total_estoque': resumo.valor_total,
+        'ultimos_alertas': ultimos_alertas,
+    }).data
+
+
+def obter_dashboard():
+    # Contadores vêm da linha do ResumoEstoque; sem ela, de uma varredura única
+    resumo = obter_resumo() or ResumoEstoque(**calcular_resumo())
+    return _serializar(resumo, _ultimos_alertas())
+
+
+async def aobter_dashboard():
+    resumo = await aobter_resumo()
+    if resumo is None:
+        resumo = ResumoEstoque(**await sync_to_async(calcular_resumo)())
+    return _serializar(resumo, [alerta async for alerta in _ultimos_alertas()])
+
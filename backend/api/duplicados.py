@@ -0,0 +1,132 @@
+"""Remoção de usuários duplicados (mesmo e-mail) feita em SQL, por conjuntos.
+
+Uma única consulta marca os duplicados numa tabela temporária: para cada
+e-mail com mais de uma conta, fica a mais recente (date_joined, depois id)
+e as demais são perdedoras. Os e-mails são comparados sem diferenciar
+maiúsculas nem espaços nas pontas: a restrição de unicidade de
+Usuario.email já impede duplicados exatos. Depois, lote a lote de perdedoras e numa
+transação por lote:
+- as chaves estrangeiras que apontam para Usuario (produtos criados,
+  movimentações, log do admin...) passam para a conta que fica, com um
+  UPDATE por relação. Campos auto_now das linhas alteradas (como
+  Produto.data_atualizacao) são atualizados, então os produtos reatribuídos
+  entram no feed de alterações e mudam o ETag das listagens;
+- as linhas de grupos e permissões das perdedoras são apagadas;
+- as perdedoras são apagadas.
+
+Nenhum usuário é carregado no Python, e como o DELETE é direto os sinais
+de Usuario não disparam: o cache de autenticação dos outros processos
+expira sozinho (ver api/authentication.py).
+"""
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Usuario
+
+TABELA = 'tmp_usuarios_duplicados'
+LOTE_DUPLICADOS = 1000
+# Perdedoras de um lote, pela numeração da tabela temporária
+PERDEDORES_DO_LOTE = f'SELECT perdedor FROM {TABELA} WHERE n BETWEEN %s AND %s'
+
+
+def relacoes():
+    """(reatribuir, apagar): [(modelo, campo FK)] e [(tabela, coluna)] das relações com Usuario."""
+    reatribuir, apagar = [], set()
+    for campo in Usuario._meta.get_fields(include_hidden=True):
+        # As tabelas intermediárias dos ManyToMany também aparecem como FK ocultas
+        if campo.one_to_many and not campo.related_model._meta.auto_created:
+            reatribuir.append((campo.related_model, campo.field))
+        elif campo.many_to_many:
+            if campo.concrete:
+                apagar.add((campo.remote_field.through._meta.db_table, campo.m2m_column_name()))
+            else:
+                apagar.add((campo.through._meta.db_table, campo.field.m2m_reverse_name()))
+    return reatribuir, sorted(apagar)
+
+
+def campos_auto_now(modelo):
+    return [campo for campo in modelo._meta.concrete_fields if getattr(campo, 'auto_now', False)]
+
+
+def marcar_duplicados(using='default'):
+    """Cria a tabela temporária (n, perdedor, sobrevivente) e devolve (grupos, perdedores)."""
+    usuarios = Usuario._meta.db_table
+    chave = 'LOWER(TRIM(email))'
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {TABELA}')
+        cursor.execute(
+            f'CREATE TEMP TABLE {TABELA} '
+            f'(n INTEGER PRIMARY KEY, perdedor INTEGER NOT NULL UNIQUE, sobrevivente INTEGER NOT NULL)'
+        )
+        cursor.execute(f"""
+            INSERT INTO {TABELA} (n, perdedor, sobrevivente)
+            SELECT ROW_NUMBER() OVER (ORDER BY perdedor), perdedor, sobrevivente FROM (
+                SELECT id AS perdedor, FIRST_VALUE(id) OVER (
+                    PARTITION BY {chave} ORDER BY date_joined DESC, id DESC
+                ) AS sobrevivente
+                FROM {usuarios}
+                WHERE {chave} IN (SELECT {chave} FROM {usuarios} GROUP BY {chave} HAVING COUNT(*) > 1)
+            ) AS contas
+            WHERE perdedor <> sobrevivente
+        """)
+        cursor.execute(f'SELECT COUNT(DISTINCT sobrevivente), COUNT(*) FROM {TABELA}')
+        return cursor.fetchone()
+
+
+def descartar_marcacao(using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {TABELA}')
+
+
+def resumo_marcacao(using='default', exemplos=10):
+    """Relações afetadas e alguns grupos (e-mail, id que fica, contas removidas).
+
+    As relações vêm como {rótulo: (linhas a reatribuir, campos auto_now atualizados)}.
+    """
+    reatribuir, _ = relacoes()
+    with connections[using].cursor() as cursor:
+        afetadas = {}
+        for modelo, campo in reatribuir:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {modelo._meta.db_table} '
+                f'WHERE {campo.column} IN (SELECT perdedor FROM {TABELA})'
+            )
+            afetadas[f'{modelo._meta.label}.{campo.name}'] = (
+                cursor.fetchone()[0], [f.name for f in campos_auto_now(modelo)]
+            )
+        cursor.execute(
+            f'SELECT u.email, t.sobrevivente, COUNT(*) FROM {TABELA} t '
+            f'JOIN {Usuario._meta.db_table} u ON u.id = t.sobrevivente '
+            f'GROUP BY t.sobrevivente, u.email ORDER BY t.sobrevivente LIMIT %s',
+            [exemplos],
+        )
+        return afetadas, cursor.fetchall()
+
+
+def remover_duplicados(total, using='default', lote=LOTE_DUPLICADOS, progresso=None):
+    """Reatribui e apaga as `total` perdedoras marcadas, `lote` por transação.
+
+    `progresso(removidos, total)` é chamado ao fim de cada lote.
+    """
+    reatribuir, apagar = relacoes()
+    connection = connections[using]
+    for inicio in range(1, total + 1, lote):
+        limites = [inicio, min(inicio + lote - 1, total)]
+        agora = timezone.now()
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            for modelo, campo in reatribuir:
+                tabela = modelo._meta.db_table
+                # Campos auto_now (data_atualizacao) acompanham a alteração, como num save()
+                atualizados = campos_auto_now(modelo)
+                extras = ''.join(f', {f.column} = %s' for f in atualizados)
+                cursor.execute(
+                    f'UPDATE {tabela} SET {campo.column} = '
+                    f'(SELECT sobrevivente FROM {TABELA} WHERE perdedor = {tabela}.{campo.column}){extras} '
+                    f'WHERE {campo.column} IN ({PERDEDORES_DO_LOTE})',
+                    [*(f.get_db_prep_value(agora, connection) for f in atualizados), *limites],
+                )
+            for tabela, coluna in apagar:
+                cursor.execute(f'DELETE FROM {tabela} WHERE {coluna} IN ({PERDEDORES_DO_LOTE})', limites)
+            cursor.execute(f'DELETE FROM {Usuario._meta.db_table} WHERE id IN ({PERDEDORES_DO_LOTE})', limites)
+        if progresso is not None:
+            progresso(limites[1], total)
@@ -0,0 +1,245 @@
+"""Operações em lote: movimentações de estoque e alteração de produtos.
+
+As alterações de produto viram um único UPDATE: quando cada produto recebe
+valores próprios eles passam por uma tabela temporária, lida pelo UPDATE
+por subconsulta; quando valem para todos os produtos de um filtro, o UPDATE
+leva as expressões direto. O status do estoque é
+recalculado no próprio UPDATE pelo ProdutoQuerySet (ver api/models.py).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Greatest, Round
+from django.utils import timezone
+
+from .alertas import sincronizar_alertas
+from .models import MovimentacaoEstoque, Produto
+from .search import buscar_produtos
+
+# Campos alteráveis em lote e casas decimais dos ajustes percentuais
+CAMPOS_LOTE = {'preco': 2, 'estoque_minimo': 0, 'ativo': None}
+# Valores de cada produto no lote, lidos pelo UPDATE
+TABELA_LOTE = 'tmp_produtos_lote'
+# Produtos de um filtro, guardados antes do UPDATE
+TABELA_FILTRO = 'tmp_produtos_filtro'
+
+
+class LoteInvalido(Exception):
+    """Lote recusado; `erros` lista todas as linhas com problema."""
+
+    def __init__(self, erros):
+        super().__init__('Lote de movimentações inválido')
+        self.erros = erros
+
+
+def registrar_movimentacoes_em_lote(itens, usuario):
+    """Aplica uma lista de movimentações já validadas em uma única transação.
+
+    As quantidades são somadas por produto (um UPDATE por produto afetado) e
+    os registros do histórico entram com um único bulk_create. Se alguma
+    saída deixar o estoque negativo nada é gravado e todas as linhas com
+    problema são informadas em LoteInvalido.
+    """
+    ids = {item['produto'] for item in itens}
+
+    with transaction.atomic():
+        produtos = Produto.objects.only('id', 'nome', 'quantidade').in_bulk(ids)
+        saldo = {pk: produto.quantidade for pk, produto in produtos.items()}
+        deltas = defaultdict(int)
+        erros = []
+
+        # Simula o lote na ordem enviada para saber exatamente quais linhas falham
+        for indice, item in enumerate(itens):
+            produto_id = item['produto']
+            if produto_id not in produtos:
+                erros.append({
+                    'indice': indice,
+                    'produto': produto_id,
+                    'erro': 'Produto não encontrado',
+                })
+                continue
+
+            if item['tipo_movimentacao'] == 'entrada':
+                delta = item['quantidade']
+            else:
+                delta = -item['quantidade']
+
+            if saldo[produto_id] + delta < 0:
+                erros.append({
+                    'indice': indice,
+                    'produto': produto_id,
+                    'quantidade': item['quantidade'],
+                    'disponivel': saldo[produto_id],
+                    'erro': 'Quantidade em estoque insuficiente para saída',
+                })
+                continue
+
+            saldo[produto_id] += delta
+            deltas[produto_id] += delta
+
+        if erros:
+            raise LoteInvalido(erros)
+
+        agora = timezone.now()
+        for produto_id, delta in deltas.items():
+            if delta == 0:
+                continue
+            nova_quantidade = F('quantidade') + delta
+            # A guarda protege contra alterações concorrentes feitas após a leitura
+            atualizados = Produto.objects.filter(
+                pk=produto_id, quantidade__gte=-delta
+            ).update(quantidade=nova_quantidade, data_atualizacao=agora)
+            if not atualizados:
+                raise LoteInvalido([{
+                    'produto': produto_id,
+                    'erro': 'Estoque alterado por outra operação, envie o lote novamente',
+                }])
+
+        # bulk_create e update() não disparam sinais
+        sincronizar_alertas(deltas)
+        return MovimentacaoEstoque.objects.bulk_create([
+            MovimentacaoEstoque(
+                produto=produtos[item['produto']],
+                tipo_movimentacao=item['tipo_movimentacao'],
+                quantidade=item['quantidade'],
+                observacao=item.get('observacao'),
+                usuario=usuario,
+            )
+            for item in itens
+        ])
+
+
+def _campos_de_status(campos):
+    """Alterações que podem mudar o status ou a necessidade de alerta."""
+    return bool({'estoque_minimo', 'ativo'} & set(campos))
+
+
+def _valor_do_lote(campo):
+    """Novo valor do campo lido da tabela temporária; quem não trouxe o campo mantém o atual."""
+    campo_modelo = Produto._meta.get_field(campo)
+    tabela, coluna = Produto._meta.db_table, campo_modelo.column
+    return RawSQL(
+        f'SELECT CASE WHEN t.tem_{campo} THEN t.{campo} ELSE {tabela}.{coluna} END '
+        f'FROM {TABELA_LOTE} t WHERE t.id = {tabela}.id',
+        [],
+        output_field=campo_modelo,
+    )
+
+
+def atualizar_produtos_em_lote(itens):
+    """Aplica a cada produto os seus valores ({'id': ..., campo: valor}); devolve quantos mudaram.
+
+    Os valores vão para uma tabela temporária (um executemany) e um único
+    UPDATE os lê por subconsulta. Ids inexistentes recusam o lote inteiro
+    com LoteInvalido.
+    """
+    campos = [campo for campo in CAMPOS_LOTE if any(campo in item for item in itens)]
+    modelo = {campo: Produto._meta.get_field(campo) for campo in campos}
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {TABELA_LOTE}')
+        colunas = ''.join(
+            f', {campo} {modelo[campo].db_type(connection)}, tem_{campo} BOOLEAN NOT NULL'
+            for campo in campos
+        )
+        cursor.execute(f'CREATE TEMP TABLE {TABELA_LOTE} (id INTEGER PRIMARY KEY{colunas})')
+        nomes = ''.join(f', {campo}, tem_{campo}' for campo in campos)
+        cursor.executemany(
+            f"INSERT INTO {TABELA_LOTE} (id{nomes}) VALUES (%s{', %s, %s' * len(campos)})",
+            [
+                [item['id'], *(
+                    valor
+                    for campo in campos
+                    for valor in (modelo[campo].get_db_prep_save(item.get(campo), connection), campo in item)
+                )]
+                for item in itens
+            ],
+        )
+
+        cursor.execute(
+            f'SELECT t.id FROM {TABELA_LOTE} t LEFT JOIN {Produto._meta.db_table} p ON p.id = t.id '
+            f'WHERE p.id IS NULL'
+        )
+        faltando = {linha[0] for linha in cursor.fetchall()}
+        if faltando:
+            raise LoteInvalido([
+                {'indice': indice, 'produto': item['id'], 'erro': 'Produto não encontrado'}
+                for indice, item in enumerate(itens)
+                if item['id'] in faltando
+            ])
+
+        atualizados = Produto.objects.filter(pk__in=RawSQL(f'SELECT id FROM {TABELA_LOTE}', [])).update(
+            **{campo: _valor_do_lote(campo) for campo in campos}
+        )
+        cursor.execute(f'DROP TABLE {TABELA_LOTE}')
+
+        if _campos_de_status(campos):
+            sincronizar_alertas([item['id'] for item in itens])
+    return atualizados
+
+
+def produtos_do_filtro(filtro):
+    """Queryset dos produtos que atendem ao filtro (ids, search, status, ativo)."""
+    produtos = Produto.objects.all()
+    if 'ids' in filtro:
+        produtos = produtos.filter(pk__in=filtro['ids'])
+    if filtro.get('status'):
+        produtos = produtos.filter(status_estoque__in=filtro['status'])
+    if 'ativo' in filtro:
+        produtos = produtos.filter(ativo=filtro['ativo'])
+    if filtro.get('search'):
+        # Subconsulta: o UPDATE não aceita o JOIN com o índice de busca
+        produtos = Produto.objects.filter(pk__in=buscar_produtos(produtos, filtro['search']).values('pk'))
+    return produtos
+
+
+def _expressao_alteracao(campo, alteracao):
+    """Novo valor do campo: {'valor': v}, {'somar': n} ou {'percentual': p}, nunca abaixo de zero."""
+    campo_modelo = Produto._meta.get_field(campo)
+    if 'valor' in alteracao:
+        return Value(alteracao['valor'], output_field=campo_modelo)
+    if 'somar' in alteracao:
+        novo = F(campo) + Value(alteracao['somar'], output_field=campo_modelo)
+    else:
+        # Em Decimal, sem passar por float: o percentual tem até 2 casas, o fator até 4
+        fator = 1 + Decimal(alteracao['percentual']) / 100
+        decimal = DecimalField(max_digits=20, decimal_places=6)
+        novo = Round(
+            ExpressionWrapper(
+                F(campo) * Value(fator, output_field=DecimalField(max_digits=9, decimal_places=4)),
+                output_field=decimal,
+            ),
+            CAMPOS_LOTE[campo],
+            output_field=decimal,
+        )
+    return Cast(Greatest(novo, Value(0), output_field=campo_modelo), output_field=campo_modelo)
+
+
+def atualizar_produtos_por_filtro(produtos, alteracoes):
+    """Aplica as mesmas alterações a todos os produtos do queryset num único UPDATE; devolve quantos mudaram.
+
+    `alteracoes` é {campo: {'valor' | 'somar' | 'percentual': ...}}, com
+    'ativo' recebendo o valor direto.
+    """
+    valores = {
+        campo: _expressao_alteracao(campo, alteracao if isinstance(alteracao, dict) else {'valor': alteracao})
+        for campo, alteracao in alteracoes.items()
+    }
+    if not _campos_de_status(valores):
+        return produtos.update(**valores)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # Depois do UPDATE o filtro pode não achar os mesmos produtos (ex.: filtro
+        # por status): os ids ficam numa tabela temporária, sem passar pelo Python
+        sql, params = produtos.values('pk').query.sql_with_params()
+        cursor.execute(f'DROP TABLE IF EXISTS {TABELA_FILTRO}')
+        cursor.execute(f'CREATE TEMP TABLE {TABELA_FILTRO} (id INTEGER PRIMARY KEY)')
+        cursor.execute(f'INSERT INTO {TABELA_FILTRO} (id) {sql}', params)
+        alterados = Produto.objects.filter(pk__in=RawSQL(f'SELECT id FROM {TABELA_FILTRO}', []))
+        atualizados = alterados.update(**valores)
+        sincronizar_alertas(alterados)
+        cursor.execute(f'DROP TABLE {TABELA_FILTRO}')
+    return atualizados
@@ -0,0 +1,94 @@
+"""Eventos em tempo real (Server-Sent Events).
+
+O fluxo de /api/eventos/ não termina: só o saep/asgi.py o atende sem prender
+um worker por conexão. No WSGI (runserver, gunicorn síncrono) as duas views
+respondem 503 e o cliente não assina. O EventSource não envia headers, então
+o cliente pede antes um ticket de uso único (POST /api/eventos/ticket/, com o
+access token no header) e abre o fluxo com ?ticket=.
+"""
+import asyncio
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .events import VALIDADE_TICKET, broadcaster, tickets_eventos
+from .models import Usuario
+
+# Comentário enviado quando não há eventos, para proxies não fecharem a conexão
+INTERVALO_KEEPALIVE = 15
+
+
+def _ultimo_id(request):
+    valor = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(valor) if valor else None
+    except ValueError:
+        return None
+
+
+async def _transmitir(assinatura):
+    try:
+        yield 'retry: 3000\n\n'
+        if assinatura.lacuna:
+            # Eventos perdidos: o cliente deve recarregar os dados completos
+            yield 'event: reset\ndata: {}\n\n'
+        for evento in assinatura.pendentes:
+            yield evento.formatar()
+
+        while True:
+            try:
+                evento = await asyncio.wait_for(assinatura.fila.get(), INTERVALO_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            if evento is None:
+                break
+            yield evento.formatar()
+    finally:
+        broadcaster.cancelar(assinatura)
+
+
+def eventos_disponiveis(request):
+    # O DRF embrulha a requisição do Django
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+MENSAGEM_INDISPONIVEL = 'Eventos em tempo real disponíveis só com o servidor ASGI (saep/asgi.py)'
+
+
+class TicketEventosView(APIView):
+    """POST /api/eventos/ticket/ — ticket de uso único para abrir /api/eventos/."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not eventos_disponiveis(request):
+            return Response({'error': MENSAGEM_INDISPONIVEL}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({'ticket': tickets_eventos.emitir(request.user), 'validade': VALIDADE_TICKET})
+
+
+async def _usuario_do_ticket(request):
+    user_id = tickets_eventos.consumir(request.GET.get('ticket', ''))
+    if user_id is None:
+        return None
+    return await Usuario.objects.filter(pk=user_id, is_active=True).afirst()
+
+
+async def eventos(request):
+    """GET /api/eventos/?ticket= — fluxo Server-Sent Events de alertas e status do estoque."""
+    if request.method != 'GET':
+        return JsonResponse({'error': 'Método não permitido'}, status=405)
+    if not eventos_disponiveis(request):
+        return JsonResponse({'error': MENSAGEM_INDISPONIVEL}, status=503)
+
+    if await _usuario_do_ticket(request) is None:
+        return JsonResponse({'error': 'Ticket inválido, expirado ou já usado'}, status=401)
+
+    assinatura = broadcaster.assinar(_ultimo_id(request))
+    response = StreamingHttpResponse(_transmitir(assinatura), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,144 @@
+"""Difusão de eventos (alertas e status do estoque) para os clientes conectados.
+
+O Broadcaster é local ao processo: as gravações publicam eventos a partir de
+código síncrono (qualquer thread) e cada conexão SSE, rodando no event loop
+do ASGI, recebe os eventos numa fila própria. Um histórico curto permite que
+um cliente reconectado retome a partir do Last-Event-ID.
+"""
+import asyncio
+import json
+import secrets
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from django.core import signing
+from django.db import transaction
+
+TAMANHO_HISTORICO = 1000
+TAMANHO_FILA = 500
+# Validade (segundos) do ticket que abre uma conexão SSE
+VALIDADE_TICKET = 30
+
+
+@dataclass(frozen=True)
+class Evento:
+    id: int
+    tipo: str
+    dados: dict
+
+    def formatar(self):
+        """Evento no formato text/event-stream."""
+        dados = json.dumps(self.dados, ensure_ascii=False, default=str)
+        return f'id: {self.id}\nevent: {self.tipo}\ndata: {dados}\n\n'
+
+
+@dataclass(eq=False)
+class Assinatura:
+    loop: asyncio.AbstractEventLoop
+    fila: asyncio.Queue
+    # Eventos perdidos (pedido anterior ao histórico); o cliente deve recarregar tudo
+    lacuna: bool = False
+    pendentes: list = field(default_factory=list)
+
+
+class Broadcaster:
+    def __init__(self, tamanho_historico=TAMANHO_HISTORICO):
+        self._lock = threading.Lock()
+        # Começa no relógio em ms para que os ids continuem crescendo após um restart
+        self._ultimo_id = int(time.time() * 1000)
+        self._historico = deque(maxlen=tamanho_historico)
+        self._assinaturas = set()
+
+    def publicar(self, tipo, dados):
+        with self._lock:
+            self._ultimo_id += 1
+            evento = Evento(self._ultimo_id, tipo, dados)
+            self._historico.append(evento)
+            assinaturas = list(self._assinaturas)
+        for assinatura in assinaturas:
+            try:
+                assinatura.loop.call_soon_threadsafe(self._entregar, assinatura, evento)
+            except RuntimeError:
+                # Event loop já encerrado
+                self.cancelar(assinatura)
+        return evento
+
+    def assinar(self, ultimo_id=None):
+        """Registra o chamador (dentro de um event loop) para receber os próximos eventos."""
+        assinatura = Assinatura(asyncio.get_running_loop(), asyncio.Queue(TAMANHO_FILA))
+        with self._lock:
+            if ultimo_id is not None and ultimo_id != self._ultimo_id:
+                primeiro = self._historico[0].id if self._historico else self._ultimo_id + 1
+                # Fora do histórico (muito antigo ou de outro processo): houve perda
+                assinatura.lacuna = not (primeiro - 1 <= ultimo_id <= self._ultimo_id)
+                assinatura.pendentes = [e for e in self._historico if e.id > ultimo_id]
+            self._assinaturas.add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura):
+        with self._lock:
+            self._assinaturas.discard(assinatura)
+
+    def _entregar(self, assinatura, evento):
+        try:
+            assinatura.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Cliente lento: encerra a conexão; ele reconecta e retoma pelo histórico
+            self.cancelar(assinatura)
+            assinatura.fila.get_nowait()
+            assinatura.fila.put_nowait(None)
+
+
+broadcaster = Broadcaster()
+
+
+def publicar_ao_confirmar(eventos):
+    """Publica [(tipo, dados), ...] só depois que a transação atual for confirmada."""
+    if not eventos:
+        return
+
+    def publicar():
+        for tipo, dados in eventos:
+            broadcaster.publicar(tipo, dados)
+
+    transaction.on_commit(publicar)
+
+
+class TicketsEventos:
+    """Tickets de uso único para abrir /api/eventos/.
+
+    O EventSource do navegador não envia headers, então a credencial vai na
+    URL, que acaba em logs de acesso e de proxies. Em vez do access token, a
+    URL leva um ticket assinado (SECRET_KEY) com o id do usuário, que expira
+    em VALIDADE_TICKET segundos e é recusado na segunda vez que aparece.
+    Como o Broadcaster, o registro dos tickets usados é local ao processo.
+    """
+    salt = 'api.eventos.ticket'
+
+    def __init__(self, validade=VALIDADE_TICKET):
+        self.validade = validade
+        self._lock = threading.Lock()
+        self._usados = {}
+
+    def emitir(self, usuario):
+        return signing.dumps({'u': usuario.pk, 'n': secrets.token_urlsafe(12)}, salt=self.salt)
+
+    def consumir(self, ticket):
+        """Id do usuário do ticket, ou None se ele for inválido, expirado ou já usado."""
+        try:
+            dados = signing.loads(ticket, salt=self.salt, max_age=self.validade)
+        except signing.BadSignature:
+            return None
+        agora = time.monotonic()
+        with self._lock:
+            # Tickets usados só precisam ser lembrados até expirarem
+            self._usados = {nonce: expira for nonce, expira in self._usados.items() if expira > agora}
+            if dados['n'] in self._usados:
+                return None
+            self._usados[dados['n']] = agora + self.validade
+        return dados['u']
+
+
+tickets_eventos = TicketsEventos()
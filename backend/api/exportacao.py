@@ -0,0 +1,149 @@
+"""Exportação de produtos e do histórico de movimentações em CSV ou XLSX.
+
+As linhas são lidas com values_list().iterator(), sem instanciar modelos e
+sem carregar o resultado inteiro, e enviadas por StreamingHttpResponse. No
+CSV o consumo de memória não depende do tamanho da exportação. O XLSX é um
+zip que só fica completo no save(): as linhas vão para arquivos temporários,
+mas a tabela de textos (shared strings) do openpyxl fica em memória e o
+envio só começa no fim, então ele é limitado a MAXIMO_LINHAS_XLSX linhas;
+exportações maiores devem usar CSV.
+
+Textos que começam com =, +, -, @, tab ou CR seriam lidos como fórmula pelo
+Excel (injeção de fórmulas): saem com um apóstrofo na frente, que a
+importação remove (ver api/importacao.py).
+"""
+import csv
+import tempfile
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from openpyxl import Workbook
+from rest_framework.exceptions import ValidationError
+
+TAMANHO_CHUNK = 2000
+# Linhas de CSV agrupadas em cada pedaço enviado ao cliente
+LINHAS_POR_BLOCO = 500
+TAMANHO_BLOCO_XLSX = 64 * 1024
+MAXIMO_LINHAS_XLSX = 100_000
+
+# Primeiros caracteres que fazem o Excel tratar o texto como fórmula
+INICIO_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+COLUNAS_PRODUTO = [
+    ('id', 'ID'),
+    ('codigo', 'Código (SKU)'),
+    ('nome', 'Nome'),
+    ('descricao', 'Descrição'),
+    ('quantidade', 'Quantidade'),
+    ('estoque_minimo', 'Estoque Mínimo'),
+    ('preco', 'Preço (R$)'),
+    ('status_estoque', 'Status do Estoque'),
+    ('ativo', 'Ativo'),
+    ('data_criacao', 'Data de Criação'),
+    ('data_atualizacao', 'Data de Atualização'),
+]
+
+COLUNAS_MOVIMENTACAO = [
+    ('id', 'ID'),
+    ('data_movimentacao', 'Data da Movimentação'),
+    ('produto_id', 'ID do Produto'),
+    ('produto__nome', 'Produto'),
+    ('tipo_movimentacao', 'Tipo'),
+    ('quantidade', 'Quantidade'),
+    ('usuario__username', 'Usuário'),
+    ('observacao', 'Observação'),
+]
+
+FORMATOS = ('csv', 'xlsx')
+
+
+class _Eco:
+    """Arquivo falso: csv.writer devolve a linha formatada em vez de gravá-la."""
+
+    def write(self, valor):
+        return valor
+
+
+def escapar_formula(valor):
+    """Texto seguro para abrir no Excel: um apóstrofo antes de =, +, -, @, tab ou CR.
+
+    Textos que já começam com apóstrofos seguidos desses caracteres também
+    ganham um, para que desfazer_escape() devolva o original.
+    """
+    if isinstance(valor, str) and valor.lstrip("'").startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def desfazer_escape(valor):
+    """Inverso de escapar_formula(), para reimportar uma planilha exportada."""
+    if isinstance(valor, str) and valor.startswith("'") and valor.lstrip("'").startswith(INICIO_FORMULA):
+        return valor[1:]
+    return valor
+
+
+def _linhas(queryset, colunas):
+    campos = [campo for campo, _ in colunas]
+    return queryset.values_list(*campos).iterator(chunk_size=TAMANHO_CHUNK)
+
+
+def _gerar_csv(cabecalho, linhas):
+    escritor = csv.writer(_Eco())
+    # BOM para o Excel reconhecer o UTF-8 (acentos)
+    yield '\ufeff' + escritor.writerow(cabecalho)
+    bloco = []
+    for linha in linhas:
+        bloco.append(escritor.writerow([
+            valor.isoformat() if isinstance(valor, datetime) else escapar_formula(valor)
+            for valor in linha
+        ]))
+        if len(bloco) >= LINHAS_POR_BLOCO:
+            yield ''.join(bloco)
+            bloco = []
+    if bloco:
+        yield ''.join(bloco)
+
+
+def _gerar_xlsx(titulo, cabecalho, linhas):
+    # O modo write-only grava as linhas em disco à medida que chegam; o .xlsx é
+    # um zip e só fica completo no save(), por isso o envio começa ao final
+    # (e o número de linhas é limitado em exportar())
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet(titulo)
+    planilha.append(cabecalho)
+    for linha in linhas:
+        planilha.append([
+            # O Excel não guarda fuso horário: converte para o horário local
+            timezone.localtime(valor).replace(tzinfo=None) if isinstance(valor, datetime) else escapar_formula(valor)
+            for valor in linha
+        ])
+
+    with tempfile.TemporaryFile() as arquivo:
+        workbook.save(arquivo)
+        arquivo.seek(0)
+        while bloco := arquivo.read(TAMANHO_BLOCO_XLSX):
+            yield bloco
+
+
+def exportar(queryset, colunas, nome_arquivo, formato='csv'):
+    cabecalho = [rotulo for _, rotulo in colunas]
+    linhas = _linhas(queryset, colunas)
+
+    if formato == 'xlsx':
+        if queryset.count() > MAXIMO_LINHAS_XLSX:
+            raise ValidationError({
+                'formato': f'O XLSX aceita até {MAXIMO_LINHAS_XLSX} linhas; use formato=csv ou filtre o período'
+            })
+        response = StreamingHttpResponse(
+            _gerar_xlsx(nome_arquivo, cabecalho, linhas),
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
+    else:
+        response = StreamingHttpResponse(
+            _gerar_csv(cabecalho, linhas), content_type='text/csv; charset=utf-8'
+        )
+
+    data = timezone.localdate().isoformat()
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}_{data}.{formato}"'
+    return response
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class IndiceFTS(models.TextField):
+    """Coluna oculta de uma tabela FTS5, que tem o mesmo nome da tabela.
+
+    Só existe para permitir o lookup `match` (tabela MATCH 'consulta') pelo ORM.
+    """
+
+
+@IndiceFTS.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
@@ -0,0 +1,221 @@
+"""Importação de produtos a partir de planilhas XLSX ou CSV.
+
+A planilha é lida em streaming (ver api/planilhas.py), validada em lotes e
+gravada com um único INSERT ... ON CONFLICT (codigo) DO UPDATE por lote, via
+bulk_create(update_conflicts=True). O status do estoque é calculado em Python
+para o lote inteiro, já que bulk_create não chama Produto.save(). Quando a
+planilha muda a quantidade de um produto existente, a diferença é registrada
+como movimentação de ajuste (entrada ou saída), para que o histórico, o
+consumo diário e a previsão vejam a mudança; produtos novos começam com a
+quantidade da planilha, como no cadastro pela API. Linhas inválidas não
+interrompem a importação: elas são devolvidas no relatório com o número da
+linha na planilha.
+
+Só as colunas presentes no cabeçalho são gravadas nos produtos existentes, e
+uma célula em branco mantém o valor atual: uma planilha só com codigo e nome
+renomeia produtos sem tocar em estoque, preço ou descrição. Produtos novos
+recebem os valores padrão (PADROES) nas colunas ausentes ou em branco.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .alertas import sincronizar_alertas
+from .exportacao import COLUNAS_PRODUTO, desfazer_escape
+from .models import MovimentacaoEstoque, Produto
+from .planilhas import ler_planilha, normalizar
+
+TAMANHO_LOTE = 1000
+# Limite de Produto.preco (max_digits=10, decimal_places=2)
+PRECO_MAXIMO = Decimal('1e8')
+OBSERVACAO_AJUSTE = 'Ajuste de estoque pela importação de planilha'
+
+# Campos que a planilha pode alterar, e o valor de produtos novos quando a coluna falta ou está em branco
+PADROES = {
+    'descricao': None,
+    'quantidade': 0,
+    'estoque_minimo': 0,
+    'preco': Decimal('0.00'),
+    'ativo': True,
+}
+CAMPOS_OPCIONAIS = list(PADROES)
+
+VERDADEIRO = {'1', 'true', 'sim', 's', 'verdadeiro', 'yes'}
+FALSO = {'0', 'false', 'nao', 'n', 'falso', 'no'}
+
+# Aceita tanto o nome do campo quanto o rótulo usado na exportação
+COLUNAS = {
+    normalizar(nome): campo
+    for campo, rotulo in COLUNAS_PRODUTO
+    for nome in (campo, rotulo)
+}
+
+
+def ler_planilha_produtos(arquivo, nome_arquivo):
+    return ler_planilha(arquivo, nome_arquivo, colunas=COLUNAS, obrigatorias=('codigo', 'nome'))
+
+
+def _texto(valor):
+    # Textos exportados com apóstrofo contra fórmulas voltam ao original
+    return desfazer_escape(str(valor).strip()) if valor is not None else ''
+
+
+def _inteiro(valor, erros, campo):
+    try:
+        numero = Decimal(str(valor).strip())
+    except InvalidOperation:
+        numero = None
+    if numero is None or not numero.is_finite() or numero != numero.to_integral_value() or numero < 0:
+        erros[campo] = 'Informe um número inteiro maior ou igual a zero'
+        return None
+    return int(numero)
+
+
+def _em_branco(valor):
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def validar_linha(dados):
+    """Converte os valores de uma linha; devolve (valores, erros).
+
+    Colunas ausentes ou em branco não entram em `valores` (ver PADROES).
+    """
+    erros = {}
+    valores = {
+        'codigo': _texto(dados.get('codigo')),
+        'nome': _texto(dados.get('nome')),
+    }
+    if not valores['codigo']:
+        erros['codigo'] = 'Campo obrigatório'
+    elif len(valores['codigo']) > 64:
+        erros['codigo'] = 'Máximo de 64 caracteres'
+    if not valores['nome']:
+        erros['nome'] = 'Campo obrigatório'
+    elif len(valores['nome']) > 255:
+        erros['nome'] = 'Máximo de 255 caracteres'
+
+    informados = {campo: dados[campo] for campo in CAMPOS_OPCIONAIS if not _em_branco(dados.get(campo))}
+
+    if 'descricao' in informados:
+        valores['descricao'] = _texto(informados['descricao'])
+    for campo in ('quantidade', 'estoque_minimo'):
+        if campo in informados:
+            valores[campo] = _inteiro(informados[campo], erros, campo)
+
+    if 'preco' in informados:
+        try:
+            valores['preco'] = Decimal(str(informados['preco']).strip().replace(',', '.'))
+            if (
+                not valores['preco'].is_finite()
+                or not Decimal('0') <= valores['preco'] < PRECO_MAXIMO
+                or valores['preco'].as_tuple().exponent < -2
+            ):
+                raise InvalidOperation
+        except InvalidOperation:
+            erros['preco'] = 'Informe um valor maior ou igual a zero com até 2 casas decimais'
+
+    if 'ativo' in informados:
+        ativo = informados['ativo']
+        if isinstance(ativo, bool):
+            valores['ativo'] = ativo
+        elif normalizar(ativo) in VERDADEIRO:
+            valores['ativo'] = True
+        elif normalizar(ativo) in FALSO:
+            valores['ativo'] = False
+        else:
+            erros['ativo'] = 'Use sim/não ou true/false'
+
+    return valores, erros
+
+
+def _campos_gravados(colunas):
+    """Campos do UPDATE dos produtos existentes: só as colunas da planilha (e o que deriva delas)."""
+    campos = ['nome', *(campo for campo in CAMPOS_OPCIONAIS if campo in colunas), 'data_atualizacao']
+    if {'quantidade', 'estoque_minimo'} & set(colunas):
+        campos.append('status_estoque')
+    return campos
+
+
+def _gravar_lote(lote, usuario, colunas):
+    codigos = [valores['codigo'] for valores in lote]
+    anteriores = {
+        atuais['codigo']: atuais
+        for atuais in Produto.objects.filter(codigo__in=codigos).values('codigo', 'pk', *CAMPOS_OPCIONAIS)
+    }
+    produtos = []
+    for valores in lote:
+        # Coluna ausente ou célula em branco: o valor atual do produto, ou o padrão se ele é novo
+        atuais = anteriores.get(valores['codigo'], PADROES)
+        campos = {campo: atuais[campo] for campo in CAMPOS_OPCIONAIS}
+        campos.update(valores)
+        produtos.append(Produto(**campos, criado_por=usuario))
+
+    # O status_estoque é calculado pelo ProdutoQuerySet.bulk_create(), com a
+    # quantidade e o mínimo completos acima
+    Produto.objects.bulk_create(
+        produtos,
+        update_conflicts=True,
+        unique_fields=['codigo'],
+        update_fields=_campos_gravados(colunas),
+    )
+    # O pk das linhas atualizadas pelo ON CONFLICT não volta para os objetos
+    ids = dict(Produto.objects.filter(codigo__in=codigos).values_list('codigo', 'pk'))
+
+    # A diferença de estoque dos produtos existentes vira uma movimentação de ajuste
+    ajustes = []
+    for produto in produtos:
+        if produto.codigo not in anteriores or 'quantidade' not in colunas:
+            continue
+        atuais = anteriores[produto.codigo]
+        diferenca = produto.quantidade - atuais['quantidade']
+        if diferenca:
+            ajustes.append(MovimentacaoEstoque(
+                produto_id=atuais['pk'],
+                tipo_movimentacao='entrada' if diferenca > 0 else 'saida',
+                quantidade=abs(diferenca),
+                observacao=OBSERVACAO_AJUSTE,
+                usuario=usuario,
+            ))
+    MovimentacaoEstoque.objects.bulk_create(ajustes)
+    return len(produtos) - len(anteriores), len(anteriores), ids.values()
+
+
+def importar_produtos(linhas, usuario):
+    """Importa as linhas de ler_planilha_produtos() e devolve o relatório.
+
+    Códigos repetidos na mesma planilha são recusados (fora a primeira
+    ocorrência), para que o resultado não dependa da ordem das linhas.
+    """
+    relatorio = {'linhas': 0, 'criados': 0, 'atualizados': 0, 'erros': []}
+    vistos = set()
+    lote = []
+    gravados = []
+
+    def gravar(lote):
+        criados, atualizados, ids = _gravar_lote(lote, usuario, linhas.campos)
+        relatorio['criados'] += criados
+        relatorio['atualizados'] += atualizados
+        gravados.extend(ids)
+
+    with transaction.atomic():
+        for numero, dados in linhas:
+            relatorio['linhas'] += 1
+            valores, erros = validar_linha(dados)
+            if not erros and valores['codigo'] in vistos:
+                erros['codigo'] = 'Código repetido na planilha'
+            if erros:
+                relatorio['erros'].append({'linha': numero, 'codigo': valores['codigo'], 'erros': erros})
+                continue
+
+            vistos.add(valores['codigo'])
+            lote.append(valores)
+            if len(lote) >= TAMANHO_LOTE:
+                gravar(lote)
+                lote = []
+
+        if lote:
+            gravar(lote)
+        # Uma sincronização (e um evento 'estoque') para a planilha inteira
+        sincronizar_alertas(gravados)
+
+    return relatorio
@@ -0,0 +1,270 @@
+import json
+import platform
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api.benchmarks import SENHA_GERADA, banco_temporario, executar_em_threads, gerar_dados, resumir_latencias
+from api.models import Produto, Usuario
+from api.previsao import atualizar_previsoes
+from api.throttling import tentativas_por_email, tentativas_por_ip
+
+
+def _get(url, **params):
+    def gerar(contexto, indice, i):
+        return 'get', url, {'data': params} if params else {}
+    return gerar
+
+
+def _busca(contexto, indice, i):
+    # Nomes gerados são "Produto 0000123": busca pelo número de um produto existente
+    numero = (indice * 7919 + i) % len(contexto['ids_produtos'])
+    return 'get', '/api/produtos/', {'data': {'search': f'{numero:07d}'}}
+
+
+def _saida(contexto, indice, i):
+    # Saídas de uma unidade espalhadas pelo catálogo: disputa pela trava de escrita do SQLite
+    produtos = contexto['ids_produtos']
+    return 'post', '/api/movimentacoes/', {
+        'data': {
+            'produto': produtos[(indice * 7919 + i) % len(produtos)],
+            'tipo_movimentacao': 'entrada' if i % 2 else 'saida', 'quantidade': 1,
+        },
+        'content_type': 'application/json',
+    }
+
+
+def _lote_movimentacoes(contexto, indice, i):
+    produtos = contexto['ids_produtos']
+    inicio = (indice * 7919 + i * 50) % len(produtos)
+    return 'post', '/api/movimentacoes/lote/', {
+        'data': [
+            {'produto': produto_id, 'tipo_movimentacao': 'entrada', 'quantidade': 1}
+            for produto_id in produtos[inicio:inicio + 50]
+        ],
+        'content_type': 'application/json',
+    }
+
+
+def _lote_produtos(contexto, indice, i):
+    produtos = contexto['ids_produtos']
+    inicio = (indice * 7919 + i * 500) % len(produtos)
+    return 'patch', '/api/produtos/lote/', {
+        'data': {
+            'filtro': {'ids': produtos[inicio:inicio + 500]},
+            'alteracoes': {'estoque_minimo': {'somar': 1 if i % 2 else -1}},
+        },
+        'content_type': 'application/json',
+    }
+
+
+def _login(contexto, indice, i):
+    # Usuários e IPs diferentes a cada tentativa, para medir o login e não o limite de tentativas
+    usuario = (indice * 7919 + i) % len(contexto['ids_usuarios'])
+    return 'post', '/api/auth/login/', {
+        'data': {'email': f'usuario{usuario}@saep.local', 'password': SENHA_GERADA},
+        'content_type': 'application/json',
+        'REMOTE_ADDR': f'10.{indice % 256}.{i // 256 % 256}.{i % 256}',
+    }
+
+
+def _refresh(contexto, indice, i):
+    # Um refresh token novo por requisição: cada um é usado (e revogado) uma vez
+    ids = contexto['ids_usuarios']
+    refresh = RefreshToken.for_user(Usuario(pk=ids[(indice * 7919 + i) % len(ids)]))
+    return 'post', '/api/auth/token/refresh/', {
+        'data': {'refresh': str(refresh)}, 'content_type': 'application/json',
+    }
+
+
+# Cenários medidos, na ordem de execução: leituras primeiro, depois as escritas
+CENARIOS = {
+    'produtos': _get('/api/produtos/'),
+    'busca': _busca,
+    'movimentacoes': _get('/api/movimentacoes/'),
+    'alertas': _get('/api/alertas/'),
+    'dashboard': _get('/api/dashboard/'),
+    'produtos_async': _get('/api/async/produtos/'),
+    'alertas_async': _get('/api/async/alertas/'),
+    'dashboard_async': _get('/api/async/dashboard/'),
+    'alteracoes': _get('/api/produtos/alteracoes/'),
+    'consumo': _get('/api/movimentacoes/consumo/', agrupar='semana'),
+    'previsoes': _get('/api/produtos/previsoes/', ate=7),
+    'saida': _saida,
+    'lote_movimentacoes': _lote_movimentacoes,
+    'lote_produtos': _lote_produtos,
+    'login': _login,
+    'refresh': _refresh,
+}
+
+# Métricas comparadas com a base: (chave, maior é melhor)
+METRICAS = [
+    ('req_s', True),
+    ('p95_ms', False),
+    ('p99_ms', False),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Popula um banco temporário com dados sintéticos (semente fixa) e mede "
+        "cada cenário (leituras, escritas, login e refresh) com clientes "
+        "simultâneos: vazão, p50/p95/p99 e consultas SQL por requisição. Salva "
+        "o resultado em JSON e compara com uma base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--produtos', type=int, default=100_000)
+        parser.add_argument('--movimentacoes', type=int, default=1_000_000)
+        parser.add_argument('--usuarios', type=int, default=10_000)
+        parser.add_argument('--semente', type=int, default=0)
+        parser.add_argument('--threads', type=int, default=4, help='Clientes simultâneos')
+        parser.add_argument('--segundos', type=float, default=5, help='Duração da medição de cada cenário')
+        parser.add_argument(
+            '--cenarios', nargs='+', choices=list(CENARIOS), default=list(CENARIOS),
+            help='Cenários medidos (padrão: todos, na ordem de CENARIOS)',
+        )
+        parser.add_argument('--saida', help='Salva o resultado neste arquivo JSON')
+        parser.add_argument('--base', help='Resultado JSON anterior para comparação')
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.2,
+            help='Piora relativa tolerada em vazão e latência antes de acusar regressão (0.2 = 20%%)',
+        )
+
+    def handle(self, *args, **options):
+        base = None
+        if options['base']:
+            with open(options['base'], encoding='utf-8') as arquivo:
+                base = json.load(arquivo)
+
+        parametros = {
+            chave: options[chave]
+            for chave in ('produtos', 'movimentacoes', 'usuarios', 'semente', 'threads', 'segundos')
+        }
+        resultado = {
+            'data': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'parametros': parametros,
+            'cenarios': {},
+        }
+
+        # Host padrão dos clientes de teste
+        with banco_temporario(), override_settings(ALLOWED_HOSTS=['testserver']):
+            inicio = time.perf_counter()
+            ids_usuarios = gerar_dados(
+                options['produtos'], options['movimentacoes'], options['usuarios'], options['semente']
+            )
+            resultado['geracao_s'] = round(time.perf_counter() - inicio, 2)
+            self.stdout.write(f"Dados gerados em {resultado['geracao_s']}s")
+
+            # O cenário 'previsoes' lê o resultado do comando prever_estoque
+            inicio = time.perf_counter()
+            atualizar_previsoes()
+            resultado['previsao_s'] = round(time.perf_counter() - inicio, 2)
+            self.stdout.write(f"Previsões calculadas em {resultado['previsao_s']}s")
+
+            contexto = {
+                'token': str(AccessToken.for_user(Usuario.objects.get(pk=ids_usuarios[0]))),
+                'ids_usuarios': ids_usuarios,
+                'ids_produtos': list(Produto.objects.order_by('id').values_list('id', flat=True)),
+            }
+            for nome in options['cenarios']:
+                resultado['cenarios'][nome] = self.medir(nome, contexto, options)
+                self.escrever(nome, resultado['cenarios'][nome])
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultado, arquivo, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultado salvo em {options['saida']}")
+
+        if base is not None:
+            regressoes = self.comparar(base, resultado, options['tolerancia'])
+            if regressoes:
+                raise CommandError(f"{regressoes} regressão(ões) em relação a {options['base']}")
+            self.stdout.write(self.style.SUCCESS('Nenhuma regressão em relação à base.'))
+
+    def medir(self, nome, contexto, options):
+        gerar = CENARIOS[nome]
+        tentativas_por_ip.limpar_tudo()
+        tentativas_por_email.limpar_tudo()
+
+        def trabalho(indice):
+            client = Client(headers={'Authorization': f"Bearer {contexto['token']}"})
+            consultas = [0]
+
+            def contar(execute, sql, params, many, context):
+                consultas[0] += 1
+                return execute(sql, params, many, context)
+
+            latencias, n_consultas, erros, i = [], [], 0, 0
+            with connection.execute_wrapper(contar):
+                # Aquecimento: conexão, caches e autenticação
+                metodo, url, kwargs = gerar(contexto, indice, i)
+                getattr(client, metodo)(url, **kwargs)
+
+                fim = time.perf_counter() + options['segundos']
+                while time.perf_counter() < fim:
+                    i += 1
+                    metodo, url, kwargs = gerar(contexto, indice, i)
+                    consultas[0] = 0
+                    antes = time.perf_counter()
+                    response = getattr(client, metodo)(url, **kwargs)
+                    latencias.append(time.perf_counter() - antes)
+                    n_consultas.append(consultas[0])
+                    erros += response.status_code >= 400
+            return latencias, n_consultas, erros
+
+        inicio = time.perf_counter()
+        resultados = executar_em_threads(trabalho, options['threads'])
+        duracao = time.perf_counter() - inicio
+
+        latencias = [l for lat, _, _ in resultados for l in lat]
+        n_consultas = [n for _, consultas, _ in resultados for n in consultas]
+        medida = resumir_latencias(latencias, duracao)
+        medida['consultas_por_requisicao'] = sum(n_consultas) / len(n_consultas)
+        medida['erros'] = sum(erros for _, _, erros in resultados)
+        return {chave: round(valor, 3) if isinstance(valor, float) else valor for chave, valor in medida.items()}
+
+    def escrever(self, nome, medida):
+        estilo = self.style.ERROR if medida['erros'] else (lambda texto: texto)
+        self.stdout.write(estilo(
+            f"[{nome}] req/s={medida['req_s']:.1f} p50={medida['p50_ms']:.1f}ms "
+            f"p95={medida['p95_ms']:.1f}ms p99={medida['p99_ms']:.1f}ms "
+            f"consultas/req={medida['consultas_por_requisicao']:.1f} erros={medida['erros']}"
+        ))
+
+    def comparar(self, base, atual, tolerancia):
+        """Mostra a variação de cada métrica e devolve o número de regressões."""
+        if base.get('parametros') != atual['parametros']:
+            self.stdout.write(self.style.WARNING('A base foi medida com outros parâmetros; compare com cuidado.'))
+
+        regressoes = 0
+        for nome, medida in atual['cenarios'].items():
+            anterior = base.get('cenarios', {}).get(nome)
+            if anterior is None:
+                continue
+            linhas = []
+            for chave, maior_melhor in METRICAS:
+                variacao = medida[chave] / anterior[chave] - 1 if anterior[chave] else 0
+                piorou = -variacao if maior_melhor else variacao
+                regressao = piorou > tolerancia
+                regressoes += regressao
+                linhas.append(f"{chave} {anterior[chave]:.1f} -> {medida[chave]:.1f} ({variacao:+.0%})"
+                              + (' REGRESSÃO' if regressao else ''))
+            # Consultas por requisição não dependem da máquina: qualquer aumento conta
+            chave = 'consultas_por_requisicao'
+            regressao = medida[chave] > anterior[chave] + 0.01
+            regressoes += regressao
+            linhas.append(f"consultas/req {anterior[chave]:.1f} -> {medida[chave]:.1f}"
+                          + (' REGRESSÃO' if regressao else ''))
+
+            estilo = self.style.ERROR if any('REGRESSÃO' in linha for linha in linhas) else self.style.SUCCESS
+            self.stdout.write(estilo(f"[{nome}] " + '; '.join(linhas)))
+        return regressoes
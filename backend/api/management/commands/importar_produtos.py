@@ -0,0 +1,59 @@
+import csv
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importacao import importar_produtos, ler_planilha_produtos
+from api.planilhas import PlanilhaInvalida
+
+# Erros mostrados no terminal; o relatório completo pode ser salvo com --relatorio
+ERROS_EXIBIDOS = 20
+
+
+class Command(BaseCommand):
+    help = "Importa (cria ou atualiza pelo código) produtos de uma planilha XLSX ou CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument(
+            '--usuario', required=True,
+            help='Email ou username registrado como criador dos produtos novos',
+        )
+        parser.add_argument('--relatorio', help='Salva todos os erros em um arquivo CSV')
+
+    def handle(self, *args, **options):
+        Usuario = get_user_model()
+        usuario = (
+            Usuario.objects.filter(email=options['usuario']).first()
+            or Usuario.objects.filter(username=options['usuario']).first()
+        )
+        if usuario is None:
+            raise CommandError(f"Usuário não encontrado: {options['usuario']}")
+
+        inicio = time.perf_counter()
+        with open(options['arquivo'], 'rb') as arquivo:
+            try:
+                relatorio = importar_produtos(ler_planilha_produtos(arquivo, options['arquivo']), usuario)
+            except PlanilhaInvalida as e:
+                raise CommandError(str(e))
+        duracao = time.perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{relatorio['linhas']} linhas em {duracao:.1f}s: "
+            f"{relatorio['criados']} criados, {relatorio['atualizados']} atualizados, "
+            f"{len(relatorio['erros'])} com erro"
+        ))
+        for erro in relatorio['erros'][:ERROS_EXIBIDOS]:
+            detalhes = '; '.join(f'{campo}: {msg}' for campo, msg in erro['erros'].items())
+            self.stdout.write(f"  linha {erro['linha']} ({erro['codigo'] or 'sem código'}): {detalhes}")
+        if len(relatorio['erros']) > ERROS_EXIBIDOS:
+            self.stdout.write(f"  ... e mais {len(relatorio['erros']) - ERROS_EXIBIDOS} erro(s)")
+
+        if options['relatorio'] and relatorio['erros']:
+            with open(options['relatorio'], 'w', newline='', encoding='utf-8') as saida:
+                escritor = csv.writer(saida)
+                escritor.writerow(['linha', 'codigo', 'campo', 'erro'])
+                for erro in relatorio['erros']:
+                    for campo, msg in erro['erros'].items():
+                        escritor.writerow([erro['linha'], erro['codigo'], campo, msg])
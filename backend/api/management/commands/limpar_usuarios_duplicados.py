@@ -0,0 +1,66 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.duplicados import LOTE_DUPLICADOS, descartar_marcacao, marcar_duplicados, remover_duplicados, resumo_marcacao
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove usuários com e-mail duplicado (sem diferenciar maiúsculas nem "
+        "espaços), mantendo a conta mais recente: produtos, movimentações e "
+        "demais referências passam para ela."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--simular', action='store_true',
+            help='Só informa o que seria feito, sem alterar nada',
+        )
+        parser.add_argument('--lote', type=int, default=LOTE_DUPLICADOS, help='Contas removidas por transação')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        inicio = time.perf_counter()
+        try:
+            grupos, total = marcar_duplicados(using)
+            self.stdout.write(
+                f"{grupos} e-mail(s) duplicado(s), {total} conta(s) a remover "
+                f"(localizadas em {time.perf_counter() - inicio:.1f}s)"
+            )
+            if not total:
+                self.stdout.write(self.style.SUCCESS('Nenhum usuário duplicado.'))
+                return
+
+            if options['simular']:
+                self.simular(using)
+                return
+
+            def progresso(removidos, total):
+                self.stdout.write(f"  {removidos}/{total} removidas ({time.perf_counter() - inicio:.1f}s)")
+
+            remover_duplicados(total, using, lote=max(1, options['lote']), progresso=progresso)
+        finally:
+            descartar_marcacao(using)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} conta(s) duplicada(s) removida(s) em {time.perf_counter() - inicio:.1f}s."
+        ))
+
+    def simular(self, using):
+        afetadas, exemplos = resumo_marcacao(using)
+        self.stdout.write('Referências que passariam para a conta mantida:')
+        for relacao, (linhas, auto_now) in afetadas.items():
+            aviso = f" ({', '.join(auto_now)} passa a ser agora)" if linhas and auto_now else ''
+            self.stdout.write(f"  {relacao}: {linhas}{aviso}")
+        produtos = afetadas.get('api.Produto.criado_por', (0, []))[0]
+        if produtos:
+            self.stdout.write(self.style.WARNING(
+                f"{produtos} produto(s) reatribuído(s) entram no feed de alterações "
+                f"(GET /api/produtos/alteracoes/) e os clientes os recebem de novo na próxima sincronização."
+            ))
+        self.stdout.write('Primeiros grupos (e-mail, id mantido, contas removidas):')
+        for email, sobrevivente, removidas in exemplos:
+            self.stdout.write(f"  {email}: {sobrevivente}, {removidas}")
+        self.stdout.write(self.style.WARNING('Simulação: nada foi alterado.'))
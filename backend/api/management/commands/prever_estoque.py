@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import PrevisaoEstoque
+from api.previsao import DIAS_ANALISADOS, NIVEL_SERVICO, PRAZO_REPOSICAO, atualizar_previsoes
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula, para todos os produtos ativos, o consumo médio, os dias até "
+        "esgotar e o estoque mínimo sugerido (PrevisaoEstoque)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=DIAS_ANALISADOS, help='Dias de histórico analisados')
+        parser.add_argument('--prazo', type=int, default=PRAZO_REPOSICAO, help='Prazo de reposição, em dias')
+        parser.add_argument(
+            '--nivel-servico', type=float, default=NIVEL_SERVICO,
+            help='Probabilidade de não faltar estoque durante o prazo (0 a 1)',
+        )
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1 or options['prazo'] < 1:
+            raise CommandError('--dias e --prazo precisam ser maiores que zero')
+        if not 0 < options['nivel_servico'] < 1:
+            raise CommandError('--nivel-servico precisa estar entre 0 e 1')
+
+        inicio = time.perf_counter()
+        total = atualizar_previsoes(options['dias'], options['prazo'], options['nivel_servico'])
+        duracao = time.perf_counter() - inicio
+
+        no_prazo = PrevisaoEstoque.objects.filter(dias_ate_esgotar__lte=options['prazo']).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} previsões em {duracao:.2f}s; {no_prazo} produto(s) esgotam em até {options['prazo']} dias"
+        ))
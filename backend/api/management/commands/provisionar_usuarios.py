@@ -0,0 +1,54 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.planilhas import PlanilhaInvalida
+from api.provisionamento import ler_planilha_usuarios, provisionar_usuarios
+
+# Erros mostrados no terminal; o relatório completo pode ser salvo com --relatorio
+ERROS_EXIBIDOS = 20
+
+
+class Command(BaseCommand):
+    help = "Cadastra em massa os usuários de uma planilha XLSX ou CSV (email, senha, nome, sobrenome...)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivo')
+        parser.add_argument('--empresa', help='Empresa dos usuários cuja linha não informa uma')
+        parser.add_argument(
+            '--processos', type=int,
+            help='Processos usados no hash das senhas (padrão: número de CPUs)',
+        )
+        parser.add_argument('--relatorio', help='Salva todos os erros em um arquivo CSV')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        with open(options['arquivo'], 'rb') as arquivo:
+            try:
+                relatorio = provisionar_usuarios(
+                    ler_planilha_usuarios(arquivo, options['arquivo']),
+                    empresa=options['empresa'],
+                    processos=options['processos'],
+                )
+            except PlanilhaInvalida as e:
+                raise CommandError(str(e))
+        duracao = time.perf_counter() - inicio
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{relatorio['linhas']} linhas em {duracao:.1f}s: "
+            f"{relatorio['criados']} criados, {len(relatorio['erros'])} com erro"
+        ))
+        for erro in relatorio['erros'][:ERROS_EXIBIDOS]:
+            detalhes = '; '.join(f'{campo}: {msg}' for campo, msg in erro['erros'].items())
+            self.stdout.write(f"  linha {erro['linha']} ({erro['email'] or 'sem e-mail'}): {detalhes}")
+        if len(relatorio['erros']) > ERROS_EXIBIDOS:
+            self.stdout.write(f"  ... e mais {len(relatorio['erros']) - ERROS_EXIBIDOS} erro(s)")
+
+        if options['relatorio'] and relatorio['erros']:
+            with open(options['relatorio'], 'w', newline='', encoding='utf-8') as saida:
+                escritor = csv.writer(saida)
+                escritor.writerow(['linha', 'email', 'campo', 'erro'])
+                for erro in relatorio['erros']:
+                    for campo, msg in erro['erros'].items():
+                        escritor.writerow([erro['linha'], erro['email'], campo, msg])
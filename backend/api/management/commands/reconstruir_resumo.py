@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.resumo import reconstruir_resumo, resumo_disponivel
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula o ResumoEstoque a partir de Produto e AlertaEstoque e "
+        "informa as divergências em relação aos valores gravados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar', action='store_true',
+            help='Só informa as divergências, sem gravar',
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not resumo_disponivel(connections[using]):
+            self.stderr.write('O resumo só é mantido em bancos SQLite.')
+            return
+
+        divergencias = reconstruir_resumo(using, gravar=not options['verificar'])
+        if not divergencias:
+            self.stdout.write(self.style.SUCCESS('Resumo sem divergências.'))
+            return
+
+        for campo, (gravado, real) in divergencias.items():
+            self.stdout.write(f'  {campo}: gravado={gravado} real={real} (diferença {real - gravado:+})')
+        if options['verificar']:
+            self.stdout.write(self.style.WARNING(f'{len(divergencias)} campo(s) divergente(s).'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(divergencias)} campo(s) corrigido(s).'))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='produto',
+            name='api_produto_nome_55a825_idx',
+        ),
+        migrations.AddIndex(
+            model_name='movimentacaoestoque',
+            index=models.Index(fields=['-data_movimentacao', '-id'], name='api_movimen_data_mo_10704e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(fields=['nome', 'id'], name='api_produto_nome_3edb78_idx'),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2 on 2026-10-17 02:56
+
+import api.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+# SQL fixo desta migração: mudanças posteriores em api/search.py não a alteram
+SQL_CRIAR = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS api_produto_fts USING fts5(
+        nome, descricao,
+        content='api_produto', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_produto_fts_ai AFTER INSERT ON api_produto BEGIN
+        INSERT INTO api_produto_fts(rowid, nome, descricao)
+        VALUES (new.id, new.nome, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_produto_fts_ad AFTER DELETE ON api_produto BEGIN
+        INSERT INTO api_produto_fts(api_produto_fts, rowid, nome, descricao)
+        VALUES ('delete', old.id, old.nome, old.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_produto_fts_au AFTER UPDATE OF nome, descricao ON api_produto BEGIN
+        INSERT INTO api_produto_fts(api_produto_fts, rowid, nome, descricao)
+        VALUES ('delete', old.id, old.nome, old.descricao);
+        INSERT INTO api_produto_fts(rowid, nome, descricao)
+        VALUES (new.id, new.nome, new.descricao);
+    END
+    """,
+    "INSERT INTO api_produto_fts(api_produto_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    "INSERT INTO api_produto_fts(api_produto_fts) VALUES ('rebuild')",
+]
+
+SQL_REMOVER = [
+    'DROP TRIGGER IF EXISTS api_produto_fts_ai',
+    'DROP TRIGGER IF EXISTS api_produto_fts_ad',
+    'DROP TRIGGER IF EXISTS api_produto_fts_au',
+    'DROP TABLE IF EXISTS api_produto_fts',
+]
+
+
+def _executar(schema_editor, comandos):
+    # FTS5 e triggers só existem no SQLite
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in comandos:
+            cursor.execute(sql)
+
+
+def criar_indice(apps, schema_editor):
+    # Cria a tabela FTS5 e os triggers e indexa os produtos existentes
+    _executar(schema_editor, SQL_CRIAR)
+
+
+def remover_indice(apps, schema_editor):
+    _executar(schema_editor, SQL_REMOVER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_indices_paginacao_cursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProdutoBusca',
+            fields=[
+                ('produto', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='busca', serialize=False, to='api.produto')),
+                ('nome', models.TextField()),
+                ('descricao', models.TextField(null=True)),
+                ('rank', models.FloatField()),
+                ('indice', api.fields.IndiceFTS(db_column='api_produto_fts')),
+            ],
+            options={
+                'db_table': 'api_produto_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 5.2 on 2026-10-17 02:58
+
+from django.db import migrations, models
+
+# SQL fixo desta migração: mudanças posteriores em api/resumo.py não a alteram
+SQL_TRIGGERS = {
+    'api_resumo_produto_ai': """
+    CREATE TRIGGER IF NOT EXISTS api_resumo_produto_ai
+    AFTER INSERT ON api_produto
+    BEGIN
+        UPDATE api_resumoestoque SET
+            produtos_disponiveis = produtos_disponiveis + (new.ativo AND new.status_estoque = 'disponivel'),
+            produtos_baixo = produtos_baixo + (new.ativo AND new.status_estoque = 'baixo'),
+            produtos_critico = produtos_critico + (new.ativo AND new.status_estoque = 'critico'),
+            produtos_esgotado = produtos_esgotado + (new.ativo AND new.status_estoque = 'esgotado'),
+            valor_total_centavos = valor_total_centavos + (CASE WHEN new.ativo THEN new.quantidade * CAST(ROUND(COALESCE(new.preco, 0) * 100) AS INTEGER) ELSE 0 END)
+        WHERE id = 1;
+    END
+    """,
+    'api_resumo_produto_ad': """
+    CREATE TRIGGER IF NOT EXISTS api_resumo_produto_ad
+    AFTER DELETE ON api_produto
+    BEGIN
+        UPDATE api_resumoestoque SET
+            produtos_disponiveis = produtos_disponiveis - (old.ativo AND old.status_estoque = 'disponivel'),
+            produtos_baixo = produtos_baixo - (old.ativo AND old.status_estoque = 'baixo'),
+            produtos_critico = produtos_critico - (old.ativo AND old.status_estoque = 'critico'),
+            produtos_esgotado = produtos_esgotado - (old.ativo AND old.status_estoque = 'esgotado'),
+            valor_total_centavos = valor_total_centavos - (CASE WHEN old.ativo THEN old.quantidade * CAST(ROUND(COALESCE(old.preco, 0) * 100) AS INTEGER) ELSE 0 END)
+        WHERE id = 1;
+    END
+    """,
+    'api_resumo_produto_au': """
+    CREATE TRIGGER IF NOT EXISTS api_resumo_produto_au
+    AFTER UPDATE OF quantidade, preco, status_estoque, ativo ON api_produto
+    WHEN old.quantidade IS NOT new.quantidade OR old.preco IS NOT new.preco
+        OR old.status_estoque IS NOT new.status_estoque OR old.ativo IS NOT new.ativo
+    BEGIN
+        UPDATE api_resumoestoque SET
+            produtos_disponiveis = produtos_disponiveis + (new.ativo AND new.status_estoque = 'disponivel') - (old.ativo AND old.status_estoque = 'disponivel'),
+            produtos_baixo = produtos_baixo + (new.ativo AND new.status_estoque = 'baixo') - (old.ativo AND old.status_estoque = 'baixo'),
+            produtos_critico = produtos_critico + (new.ativo AND new.status_estoque = 'critico') - (old.ativo AND old.status_estoque = 'critico'),
+            produtos_esgotado = produtos_esgotado + (new.ativo AND new.status_estoque = 'esgotado') - (old.ativo AND old.status_estoque = 'esgotado'),
+            valor_total_centavos = valor_total_centavos + (CASE WHEN new.ativo THEN new.quantidade * CAST(ROUND(COALESCE(new.preco, 0) * 100) AS INTEGER) ELSE 0 END) - (CASE WHEN old.ativo THEN old.quantidade * CAST(ROUND(COALESCE(old.preco, 0) * 100) AS INTEGER) ELSE 0 END)
+        WHERE id = 1;
+    END
+    """,
+    'api_resumo_alerta_ai': """
+    CREATE TRIGGER IF NOT EXISTS api_resumo_alerta_ai
+    AFTER INSERT ON api_alertaestoque
+    WHEN NOT new.lido
+    BEGIN
+        UPDATE api_resumoestoque SET
+            alertas_nao_lidos = alertas_nao_lidos + 1
+        WHERE id = 1;
+    END
+    """,
+    'api_resumo_alerta_ad': """
+    CREATE TRIGGER IF NOT EXISTS api_resumo_alerta_ad
+    AFTER DELETE ON api_alertaestoque
+    WHEN NOT old.lido
+    BEGIN
+        UPDATE api_resumoestoque SET
+            alertas_nao_lidos = alertas_nao_lidos - 1
+        WHERE id = 1;
+    END
+    """,
+    'api_resumo_alerta_au': """
+    CREATE TRIGGER IF NOT EXISTS api_resumo_alerta_au
+    AFTER UPDATE OF lido ON api_alertaestoque
+    WHEN old.lido IS NOT new.lido
+    BEGIN
+        UPDATE api_resumoestoque SET
+            alertas_nao_lidos = alertas_nao_lidos + (NOT new.lido) - (NOT old.lido)
+        WHERE id = 1;
+    END
+    """,
+}
+
+# Carga inicial a partir das tabelas atuais
+SQL_CARGA = """
+    INSERT OR REPLACE INTO api_resumoestoque (
+        id, produtos_disponiveis, produtos_baixo, produtos_critico, produtos_esgotado,
+        valor_total_centavos, alertas_nao_lidos
+    )
+    SELECT
+        1,
+        COALESCE(SUM(ativo AND status_estoque = 'disponivel'), 0),
+        COALESCE(SUM(ativo AND status_estoque = 'baixo'), 0),
+        COALESCE(SUM(ativo AND status_estoque = 'critico'), 0),
+        COALESCE(SUM(ativo AND status_estoque = 'esgotado'), 0),
+        COALESCE(SUM(CASE WHEN ativo THEN quantidade * CAST(ROUND(COALESCE(preco, 0) * 100) AS INTEGER) ELSE 0 END), 0),
+        (SELECT COUNT(*) FROM api_alertaestoque WHERE NOT lido)
+    FROM api_produto
+"""
+
+
+def criar_resumo(apps, schema_editor):
+    # Triggers primeiro, depois a carga inicial a partir das tabelas atuais
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in SQL_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(SQL_CARGA)
+
+
+def remover_resumo(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for nome in SQL_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_busca_produto_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumoEstoque',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('produtos_disponiveis', models.IntegerField(default=0, verbose_name='Produtos Disponíveis')),
+                ('produtos_baixo', models.IntegerField(default=0, verbose_name='Produtos com Estoque Baixo')),
+                ('produtos_critico', models.IntegerField(default=0, verbose_name='Produtos com Estoque Crítico')),
+                ('produtos_esgotado', models.IntegerField(default=0, verbose_name='Produtos Esgotados')),
+                ('valor_total_centavos', models.BigIntegerField(default=0, verbose_name='Valor Total do Estoque (centavos)')),
+                ('alertas_nao_lidos', models.IntegerField(default=0, verbose_name='Alertas Não Lidos')),
+            ],
+            options={
+                'verbose_name': 'Resumo do Estoque',
+                'verbose_name_plural': 'Resumo do Estoque',
+            },
+        ),
+        migrations.RunPython(criar_resumo, remover_resumo),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_resumo_estoque'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertaestoque',
+            name='resolvido',
+            field=models.BooleanField(default=False, verbose_name='Resolvido'),
+        ),
+        migrations.AddIndex(
+            model_name='alertaestoque',
+            index=models.Index(condition=models.Q(('lido', False)), fields=['-data_criacao'], name='api_alerta_nao_lido_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='alertaestoque',
+            index=models.Index(condition=models.Q(('resolvido', False)), fields=['produto'], name='api_alerta_pendente_idx'),
+        ),
+    ]
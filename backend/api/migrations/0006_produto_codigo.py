@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_alertas_automaticos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='produto',
+            name='codigo',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True, verbose_name='Código (SKU)'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 03:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_produto_codigo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='produto',
+            index=models.Index(fields=['data_atualizacao'], name='api_produto_data_at_e187c4_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2 on 2026-10-17 03:21
+
+from django.db import migrations, models
+
+# SQL fixo desta migração: mudanças posteriores em api/alteracoes.py não a alteram
+SQL_TRIGGERS = {
+    'api_alteracao_produto_ai': """
+    CREATE TRIGGER IF NOT EXISTS api_alteracao_produto_ai AFTER INSERT ON api_produto BEGIN
+        DELETE FROM api_alteracaoproduto WHERE produto_id = new.id;
+        INSERT INTO api_alteracaoproduto (produto_id, removido) VALUES (new.id, 0);
+    END
+    """,
+    'api_alteracao_produto_au': """
+    CREATE TRIGGER IF NOT EXISTS api_alteracao_produto_au AFTER UPDATE ON api_produto BEGIN
+        DELETE FROM api_alteracaoproduto WHERE produto_id = new.id;
+        INSERT INTO api_alteracaoproduto (produto_id, removido) VALUES (new.id, 0);
+    END
+    """,
+    'api_alteracao_produto_ad': """
+    CREATE TRIGGER IF NOT EXISTS api_alteracao_produto_ad AFTER DELETE ON api_produto BEGIN
+        DELETE FROM api_alteracaoproduto WHERE produto_id = old.id;
+        INSERT INTO api_alteracaoproduto (produto_id, removido) VALUES (old.id, 1);
+    END
+    """,
+}
+
+# A tabela acabou de ser criada: todos os produtos entram como alterados agora
+SQL_CARGA = (
+    'INSERT INTO api_alteracaoproduto (produto_id, removido) '
+    'SELECT id, 0 FROM api_produto ORDER BY data_atualizacao, id'
+)
+
+
+def criar_alteracoes(apps, schema_editor):
+    # Os produtos existentes entram no feed como alterados agora
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in SQL_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(SQL_CARGA)
+
+
+def remover_alteracoes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for nome in SQL_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_indice_data_atualizacao'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlteracaoProduto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('produto_id', models.BigIntegerField(unique=True, verbose_name='Produto')),
+                ('removido', models.BooleanField(default=False, verbose_name='Removido')),
+            ],
+            options={
+                'verbose_name': 'Alteração de Produto',
+                'verbose_name_plural': 'Alterações de Produtos',
+            },
+        ),
+        migrations.RunPython(criar_alteracoes, remover_alteracoes),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 5.2 on 2026-10-17 03:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# SQL fixo desta migração: mudanças posteriores em api/consumo.py não a alteram
+SQL_TRIGGERS = {
+    'api_consumo_movimentacao_ai': """
+    CREATE TRIGGER IF NOT EXISTS api_consumo_movimentacao_ai
+    AFTER INSERT ON api_movimentacaoestoque BEGIN
+        INSERT INTO api_consumodiario (produto_id, data, tipo_movimentacao, quantidade, movimentacoes)
+        VALUES (new.produto_id, date(new.data_movimentacao), new.tipo_movimentacao, new.quantidade, 1)
+        ON CONFLICT (produto_id, data, tipo_movimentacao) DO UPDATE SET
+            quantidade = quantidade + excluded.quantidade,
+            movimentacoes = movimentacoes + 1;
+    END
+    """,
+    'api_consumo_movimentacao_ad': """
+    CREATE TRIGGER IF NOT EXISTS api_consumo_movimentacao_ad
+    AFTER DELETE ON api_movimentacaoestoque BEGIN
+        UPDATE api_consumodiario SET quantidade = quantidade - old.quantidade, movimentacoes = movimentacoes - 1
+        WHERE produto_id = old.produto_id AND data = date(old.data_movimentacao) AND tipo_movimentacao = old.tipo_movimentacao;
+        DELETE FROM api_consumodiario WHERE produto_id = old.produto_id AND data = date(old.data_movimentacao) AND tipo_movimentacao = old.tipo_movimentacao AND movimentacoes <= 0;
+    END
+    """,
+    'api_consumo_movimentacao_au': """
+    CREATE TRIGGER IF NOT EXISTS api_consumo_movimentacao_au
+    AFTER UPDATE OF produto_id, tipo_movimentacao, quantidade, data_movimentacao
+    ON api_movimentacaoestoque
+    WHEN old.produto_id IS NOT new.produto_id OR old.tipo_movimentacao IS NOT new.tipo_movimentacao
+        OR old.quantidade IS NOT new.quantidade OR old.data_movimentacao IS NOT new.data_movimentacao
+    BEGIN
+        UPDATE api_consumodiario SET quantidade = quantidade - old.quantidade, movimentacoes = movimentacoes - 1
+        WHERE produto_id = old.produto_id AND data = date(old.data_movimentacao) AND tipo_movimentacao = old.tipo_movimentacao;
+        DELETE FROM api_consumodiario WHERE produto_id = old.produto_id AND data = date(old.data_movimentacao) AND tipo_movimentacao = old.tipo_movimentacao AND movimentacoes <= 0;
+        INSERT INTO api_consumodiario (produto_id, data, tipo_movimentacao, quantidade, movimentacoes)
+        VALUES (new.produto_id, date(new.data_movimentacao), new.tipo_movimentacao, new.quantidade, 1)
+        ON CONFLICT (produto_id, data, tipo_movimentacao) DO UPDATE SET
+            quantidade = quantidade + excluded.quantidade,
+            movimentacoes = movimentacoes + 1;
+    END
+    """,
+}
+
+SQL_CARGA = """
+    INSERT INTO api_consumodiario (produto_id, data, tipo_movimentacao, quantidade, movimentacoes)
+    SELECT produto_id, date(data_movimentacao), tipo_movimentacao, SUM(quantidade), COUNT(*)
+    FROM api_movimentacaoestoque GROUP BY 1, 2, 3
+"""
+
+
+def criar_consumo(apps, schema_editor):
+    # O histórico existente é somado de uma vez
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in SQL_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(SQL_CARGA)
+
+
+def remover_consumo(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for nome in SQL_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_tokens_revogados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateField(verbose_name='Data')),
+                ('tipo_movimentacao', models.CharField(choices=[('entrada', 'Entrada'), ('saida', 'Saída')], max_length=10, verbose_name='Tipo de Movimentação')),
+                ('quantidade', models.BigIntegerField(default=0, verbose_name='Quantidade')),
+                ('movimentacoes', models.IntegerField(default=0, verbose_name='Movimentações')),
+            ],
+            options={
+                'verbose_name': 'Consumo Diário',
+                'verbose_name_plural': 'Consumo Diário',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='movimentacaoestoque',
+            index=models.Index(fields=['produto', 'data_movimentacao'], name='api_movimen_produto_b6b16c_idx'),
+        ),
+        migrations.AddField(
+            model_name='consumodiario',
+            name='produto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumo_diario', to='api.produto', verbose_name='Produto'),
+        ),
+        migrations.AddIndex(
+            model_name='consumodiario',
+            index=models.Index(fields=['data'], name='api_consumo_data_556790_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='consumodiario',
+            constraint=models.UniqueConstraint(fields=('produto', 'data', 'tipo_movimentacao'), name='unique_consumo_produto_dia_tipo'),
+        ),
+        migrations.RunPython(criar_consumo, remover_consumo),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-17 03:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_consumo_diario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrevisaoEstoque',
+            fields=[
+                ('produto', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='previsao', serialize=False, to='api.produto', verbose_name='Produto')),
+                ('consumo_medio', models.FloatField(verbose_name='Consumo Médio Diário')),
+                ('desvio_consumo', models.FloatField(verbose_name='Desvio Padrão do Consumo Diário')),
+                ('dias_ate_esgotar', models.FloatField(blank=True, null=True, verbose_name='Dias até Esgotar')),
+                ('estoque_minimo_sugerido', models.IntegerField(verbose_name='Estoque Mínimo Sugerido')),
+                ('dias_analisados', models.IntegerField(verbose_name='Dias Analisados')),
+                ('data_calculo', models.DateTimeField(verbose_name='Data do Cálculo')),
+            ],
+            options={
+                'verbose_name': 'Previsão de Estoque',
+                'verbose_name_plural': 'Previsões de Estoque',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='consumodiario',
+            name='api_consumo_data_556790_idx',
+        ),
+        migrations.AddIndex(
+            model_name='consumodiario',
+            index=models.Index(fields=['data', 'tipo_movimentacao', 'produto', 'quantidade', 'movimentacoes'], name='api_consumo_data_cobre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='previsaoestoque',
+            index=models.Index(fields=['dias_ate_esgotar'], name='api_previsa_dias_at_432727_idx'),
+        ),
+    ]
@@ -0,0 +1,184 @@
+# Generated by Django 5.2 on 2026-10-17 05:10
+# Triggers do resumo com upsert: sem a linha id=1 (ex.: após um flush) o
+# UPDATE dos triggers anteriores não alterava nada e as escritas se perdiam.
+
+from django.db import migrations
+
+# SQL fixo desta migração: mudanças posteriores em api/resumo.py não a alteram
+SQL_TRIGGERS = {
+    'api_resumo_produto_ai': """
+    CREATE TRIGGER api_resumo_produto_ai
+    AFTER INSERT ON api_produto
+    BEGIN
+        INSERT INTO api_resumoestoque (
+            id, produtos_disponiveis, produtos_baixo, produtos_critico, produtos_esgotado,
+            valor_total_centavos, alertas_nao_lidos
+        ) VALUES (
+            1,
+            (new.ativo AND new.status_estoque = 'disponivel'),
+            (new.ativo AND new.status_estoque = 'baixo'),
+            (new.ativo AND new.status_estoque = 'critico'),
+            (new.ativo AND new.status_estoque = 'esgotado'),
+            (CASE WHEN new.ativo THEN new.quantidade * CAST(ROUND(COALESCE(new.preco, 0) * 100) AS INTEGER) ELSE 0 END),
+            0
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            produtos_disponiveis = produtos_disponiveis + excluded.produtos_disponiveis,
+            produtos_baixo = produtos_baixo + excluded.produtos_baixo,
+            produtos_critico = produtos_critico + excluded.produtos_critico,
+            produtos_esgotado = produtos_esgotado + excluded.produtos_esgotado,
+            valor_total_centavos = valor_total_centavos + excluded.valor_total_centavos;
+    END
+    """,
+    'api_resumo_produto_ad': """
+    CREATE TRIGGER api_resumo_produto_ad
+    AFTER DELETE ON api_produto
+    BEGIN
+        INSERT INTO api_resumoestoque (
+            id, produtos_disponiveis, produtos_baixo, produtos_critico, produtos_esgotado,
+            valor_total_centavos, alertas_nao_lidos
+        ) VALUES (
+            1,
+            - (old.ativo AND old.status_estoque = 'disponivel'),
+            - (old.ativo AND old.status_estoque = 'baixo'),
+            - (old.ativo AND old.status_estoque = 'critico'),
+            - (old.ativo AND old.status_estoque = 'esgotado'),
+            - (CASE WHEN old.ativo THEN old.quantidade * CAST(ROUND(COALESCE(old.preco, 0) * 100) AS INTEGER) ELSE 0 END),
+            0
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            produtos_disponiveis = produtos_disponiveis + excluded.produtos_disponiveis,
+            produtos_baixo = produtos_baixo + excluded.produtos_baixo,
+            produtos_critico = produtos_critico + excluded.produtos_critico,
+            produtos_esgotado = produtos_esgotado + excluded.produtos_esgotado,
+            valor_total_centavos = valor_total_centavos + excluded.valor_total_centavos;
+    END
+    """,
+    'api_resumo_produto_au': """
+    CREATE TRIGGER api_resumo_produto_au
+    AFTER UPDATE OF quantidade, preco, status_estoque, ativo ON api_produto
+    WHEN old.quantidade IS NOT new.quantidade OR old.preco IS NOT new.preco
+        OR old.status_estoque IS NOT new.status_estoque OR old.ativo IS NOT new.ativo
+    BEGIN
+        INSERT INTO api_resumoestoque (
+            id, produtos_disponiveis, produtos_baixo, produtos_critico, produtos_esgotado,
+            valor_total_centavos, alertas_nao_lidos
+        ) VALUES (
+            1,
+            (new.ativo AND new.status_estoque = 'disponivel') - (old.ativo AND old.status_estoque = 'disponivel'),
+            (new.ativo AND new.status_estoque = 'baixo') - (old.ativo AND old.status_estoque = 'baixo'),
+            (new.ativo AND new.status_estoque = 'critico') - (old.ativo AND old.status_estoque = 'critico'),
+            (new.ativo AND new.status_estoque = 'esgotado') - (old.ativo AND old.status_estoque = 'esgotado'),
+            (CASE WHEN new.ativo THEN new.quantidade * CAST(ROUND(COALESCE(new.preco, 0) * 100) AS INTEGER) ELSE 0 END) - (CASE WHEN old.ativo THEN old.quantidade * CAST(ROUND(COALESCE(old.preco, 0) * 100) AS INTEGER) ELSE 0 END),
+            0
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            produtos_disponiveis = produtos_disponiveis + excluded.produtos_disponiveis,
+            produtos_baixo = produtos_baixo + excluded.produtos_baixo,
+            produtos_critico = produtos_critico + excluded.produtos_critico,
+            produtos_esgotado = produtos_esgotado + excluded.produtos_esgotado,
+            valor_total_centavos = valor_total_centavos + excluded.valor_total_centavos;
+    END
+    """,
+    'api_resumo_alerta_ai': """
+    CREATE TRIGGER api_resumo_alerta_ai
+    AFTER INSERT ON api_alertaestoque
+    WHEN NOT new.lido
+    BEGIN
+        INSERT INTO api_resumoestoque (
+            id, produtos_disponiveis, produtos_baixo, produtos_critico, produtos_esgotado,
+            valor_total_centavos, alertas_nao_lidos
+        ) VALUES (
+            1,
+            0,
+            0,
+            0,
+            0,
+            0,
+            1
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            alertas_nao_lidos = alertas_nao_lidos + excluded.alertas_nao_lidos;
+    END
+    """,
+    'api_resumo_alerta_ad': """
+    CREATE TRIGGER api_resumo_alerta_ad
+    AFTER DELETE ON api_alertaestoque
+    WHEN NOT old.lido
+    BEGIN
+        INSERT INTO api_resumoestoque (
+            id, produtos_disponiveis, produtos_baixo, produtos_critico, produtos_esgotado,
+            valor_total_centavos, alertas_nao_lidos
+        ) VALUES (
+            1,
+            0,
+            0,
+            0,
+            0,
+            0,
+            - 1
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            alertas_nao_lidos = alertas_nao_lidos + excluded.alertas_nao_lidos;
+    END
+    """,
+    'api_resumo_alerta_au': """
+    CREATE TRIGGER api_resumo_alerta_au
+    AFTER UPDATE OF lido ON api_alertaestoque
+    WHEN old.lido IS NOT new.lido
+    BEGIN
+        INSERT INTO api_resumoestoque (
+            id, produtos_disponiveis, produtos_baixo, produtos_critico, produtos_esgotado,
+            valor_total_centavos, alertas_nao_lidos
+        ) VALUES (
+            1,
+            0,
+            0,
+            0,
+            0,
+            0,
+            (NOT new.lido) - (NOT old.lido)
+        )
+        ON CONFLICT (id) DO UPDATE SET
+            alertas_nao_lidos = alertas_nao_lidos + excluded.alertas_nao_lidos;
+    END
+    """,
+}
+
+SQL_CARGA = """
+    INSERT OR REPLACE INTO api_resumoestoque (
+        id, produtos_disponiveis, produtos_baixo, produtos_critico, produtos_esgotado,
+        valor_total_centavos, alertas_nao_lidos
+    )
+    SELECT
+        1,
+        COALESCE(SUM(ativo AND status_estoque = 'disponivel'), 0),
+        COALESCE(SUM(ativo AND status_estoque = 'baixo'), 0),
+        COALESCE(SUM(ativo AND status_estoque = 'critico'), 0),
+        COALESCE(SUM(ativo AND status_estoque = 'esgotado'), 0),
+        COALESCE(SUM(CASE WHEN ativo THEN quantidade * CAST(ROUND(COALESCE(preco, 0) * 100) AS INTEGER) ELSE 0 END), 0),
+        (SELECT COUNT(*) FROM api_alertaestoque WHERE NOT lido)
+    FROM api_produto
+"""
+
+
+def trocar_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for nome, sql in SQL_TRIGGERS.items():
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+            cursor.execute(sql)
+        cursor.execute(SQL_CARGA)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_previsao_estoque'),
+    ]
+
+    operations = [
+        # Ao reverter os triggers com upsert ficam: funcionam também no esquema anterior
+        migrations.RunPython(trocar_triggers, migrations.RunPython.noop),
+    ]
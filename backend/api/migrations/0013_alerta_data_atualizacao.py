@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_resumo_upsert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alertaestoque',
+            name='data_atualizacao',
+            field=models.DateTimeField(auto_now=True, verbose_name='Data de Modificação'),
+        ),
+    ]
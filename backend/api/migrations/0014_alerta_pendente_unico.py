@@ -0,0 +1,68 @@
+# Generated by Django 5.2 on 2026-10-17 04:29
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Regras fixas desta migração: mudanças posteriores em api/alertas.py não a alteram
+TIPO_ALERTA_POR_STATUS = {
+    'baixo': 'atencao',
+    'critico': 'critico',
+    'esgotado': 'critico',
+}
+STATUS_DISPLAY = {
+    'baixo': 'estoque baixo',
+    'critico': 'estoque crítico',
+    'esgotado': 'esgotado',
+}
+TIPOS_AUTOMATICOS = ['atencao', 'critico']
+
+
+def resolver_duplicados(apps, schema_editor):
+    # Antes da restrição: fica só o alerta pendente mais recente de cada produto e tipo
+    AlertaEstoque = apps.get_model('api', 'AlertaEstoque')
+    pendentes = AlertaEstoque.objects.filter(resolvido=False, tipo_alerta__in=TIPOS_AUTOMATICOS)
+    manter = pendentes.values('produto_id', 'tipo_alerta').annotate(ultimo=models.Max('id')).values('ultimo')
+    pendentes.exclude(pk__in=manter).update(resolvido=True, lido=True, data_atualizacao=timezone.now())
+
+
+def criar_alertas_existentes(apps, schema_editor):
+    # Produtos que já estavam baixos ou esgotados quando os alertas automáticos entraram
+    Produto = apps.get_model('api', 'Produto')
+    AlertaEstoque = apps.get_model('api', 'AlertaEstoque')
+    pendentes = AlertaEstoque.objects.filter(
+        produto_id=models.OuterRef('pk'), resolvido=False, tipo_alerta__in=TIPOS_AUTOMATICOS
+    )
+    produtos = Produto.objects.filter(
+        ativo=True, status_estoque__in=TIPO_ALERTA_POR_STATUS
+    ).exclude(models.Exists(pendentes)).only('id', 'nome', 'quantidade', 'estoque_minimo', 'status_estoque')
+    AlertaEstoque.objects.bulk_create(
+        (
+            AlertaEstoque(
+                produto_id=produto.id,
+                tipo_alerta=TIPO_ALERTA_POR_STATUS[produto.status_estoque],
+                mensagem=(
+                    f"{produto.nome}: {STATUS_DISPLAY[produto.status_estoque]} "
+                    f"({produto.quantidade} em estoque, mínimo {produto.estoque_minimo})"
+                ),
+            )
+            for produto in produtos.iterator()
+        ),
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_alerta_data_atualizacao'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolver_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='alertaestoque',
+            constraint=models.UniqueConstraint(condition=models.Q(('resolvido', False), ('tipo_alerta__in', ['atencao', 'critico'])), fields=('produto', 'tipo_alerta'), name='api_alerta_pendente_unico'),
+        ),
+        migrations.RunPython(criar_alertas_existentes, migrations.RunPython.noop),
+    ]
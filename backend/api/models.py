@@ -1,7 +1,44 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.lookups import Exact, LessThanOrEqual
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from decimal import Decimal
+from .fields import IndiceFTS
+
+
+class EstoqueInsuficiente(ValueError):
+    """Saída maior que a quantidade disponível do produto"""
+
+
+def calcular_status_estoque(quantidade, estoque_minimo):
+    """Regra do status do estoque a partir da quantidade e do estoque mínimo"""
+    if quantidade == 0:
+        return 'esgotado'
+    if quantidade <= estoque_minimo:
+        return 'critico'
+    if quantidade <= estoque_minimo * 2:
+        return 'baixo'
+    return 'disponivel'
+
+
+def status_estoque_expression(quantidade=None, estoque_minimo=None):
+    """Mesma regra de calcular_status_estoque, como expressão SQL (Case/When).
+
+    Aceita expressões com os valores novos, porque dentro de um UPDATE as
+    colunas referenciadas ainda têm o valor antigo.
+    """
+    quantidade = F('quantidade') if quantidade is None else quantidade
+    estoque_minimo = F('estoque_minimo') if estoque_minimo is None else estoque_minimo
+    return Case(
+        When(Exact(quantidade, 0), then=Value('esgotado')),
+        When(LessThanOrEqual(quantidade, estoque_minimo), then=Value('critico')),
+        When(LessThanOrEqual(quantidade, estoque_minimo * 2), then=Value('baixo')),
+        default=Value('disponivel'),
+        output_field=models.CharField(),
+    )
+
 
 class Usuario(AbstractUser):
     empresa = models.CharField(max_length=255, blank=True, null=True, verbose_name="Empresa")
@@ -34,6 +71,44 @@ class Usuario(AbstractUser):
     )
 
 
+def _como_expressao(valor):
+    if valor is None or hasattr(valor, 'resolve_expression'):
+        return valor
+    return Value(valor, output_field=models.IntegerField())
+
+
+class ProdutoQuerySet(models.QuerySet):
+    """Operações em lote que mantêm status_estoque e data_atualizacao, como o save().
+
+    update() calcula o status no próprio UPDATE a partir dos valores novos
+    (o bulk_update do Django também passa por ele); bulk_create aplica a
+    regra em Python, porque os valores já estão nos objetos.
+    """
+
+    def update(self, **kwargs):
+        if ('quantidade' in kwargs or 'estoque_minimo' in kwargs) and 'status_estoque' not in kwargs:
+            kwargs['status_estoque'] = status_estoque_expression(
+                _como_expressao(kwargs.get('quantidade')),
+                _como_expressao(kwargs.get('estoque_minimo')),
+            )
+        kwargs.setdefault('data_atualizacao', timezone.now())
+        return super().update(**kwargs)
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, update_fields=None, **kwargs):
+        objs = list(objs)
+        for produto in objs:
+            produto.status_estoque = calcular_status_estoque(produto.quantidade, produto.estoque_minimo)
+        if update_fields and {'quantidade', 'estoque_minimo'} & set(update_fields):
+            update_fields = [*update_fields, *(
+                campo for campo in ('status_estoque', 'data_atualizacao') if campo not in update_fields
+            )]
+        return super().bulk_create(objs, *args, update_fields=update_fields, **kwargs)
+
+    bulk_create.alters_data = True
+
+
 class Produto(models.Model):
     STATUS_ESTOQUE_CHOICES = [
         ('disponivel', 'Disponível'),
@@ -42,6 +117,14 @@ class Produto(models.Model):
         ('esgotado', 'Esgotado'),
     ]
     
+    # Chave natural usada na importação de planilhas (upsert)
+    codigo = models.CharField(
+        max_length=64,
+        unique=True,
+        blank=True,
+        null=True,
+        verbose_name="Código (SKU)"
+    )
     nome = models.CharField(max_length=255, verbose_name="Nome do Produto")
     descricao = models.TextField(blank=True, null=True, verbose_name="Descrição")
     quantidade = models.IntegerField(
@@ -80,13 +163,18 @@ class Produto(models.Model):
         verbose_name="Criado por"
     )
     
+    objects = ProdutoQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Produto"
         verbose_name_plural = "Produtos"
         ordering = ['nome']
         indexes = [
-            models.Index(fields=['nome']),
+            # (nome, id) sustenta a paginação por cursor da listagem
+            models.Index(fields=['nome', 'id']),
             models.Index(fields=['status_estoque']),
+            # MAX(data_atualizacao) do validador de GET condicional (api/condicional.py)
+            models.Index(fields=['data_atualizacao']),
         ]
     
     def __str__(self):
@@ -94,15 +182,8 @@ class Produto(models.Model):
     
     def save(self, *args, **kwargs):
         # Atualiza automaticamente o status do estoque
-        if self.quantidade == 0:
-            self.status_estoque = 'esgotado'
-        elif self.quantidade <= self.estoque_minimo:
-            self.status_estoque = 'critico'
-        elif self.quantidade <= (self.estoque_minimo * 2):
-            self.status_estoque = 'baixo'
-        else:
-            self.status_estoque = 'disponivel'
-        
+        self.status_estoque = calcular_status_estoque(self.quantidade, self.estoque_minimo)
+
         super().save(*args, **kwargs)
     
     @property
@@ -110,6 +191,28 @@ class Produto(models.Model):
         """Verifica se o produto precisa de reposição"""
         return self.quantidade <= self.estoque_minimo
 
+class ProdutoBusca(models.Model):
+    """Índice de busca textual (tabela virtual FTS5) sobre nome e descrição do produto.
+
+    A tabela é criada e mantida por triggers no banco (ver api/search.py);
+    o modelo serve apenas para fazer o join com Produto e ordenar por relevância.
+    """
+    produto = models.OneToOneField(
+        Produto,
+        primary_key=True,
+        db_column='rowid',
+        on_delete=models.DO_NOTHING,
+        related_name='busca'
+    )
+    nome = models.TextField()
+    descricao = models.TextField(null=True)
+    rank = models.FloatField()
+    indice = IndiceFTS(db_column='api_produto_fts')
+    
+    class Meta:
+        managed = False
+        db_table = 'api_produto_fts'
+
 class MovimentacaoEstoque(models.Model):
     TIPO_MOVIMENTACAO_CHOICES = [
         ('entrada', 'Entrada'),
@@ -144,22 +247,48 @@ class MovimentacaoEstoque(models.Model):
         verbose_name = "Movimentação de Estoque"
         verbose_name_plural = "Movimentações de Estoque"
         ordering = ['-data_movimentacao']
+        indexes = [
+            models.Index(fields=['-data_movimentacao', '-id']),
+            # Histórico de um produto num período
+            models.Index(fields=['produto', 'data_movimentacao']),
+        ]
     
     def __str__(self):
         return f"{self.tipo_movimentacao.upper()} - {self.produto.nome} - {self.quantidade} unidades"
     
     def save(self, *args, **kwargs):
-        # Atualiza o estoque do produto baseado na movimentação
+        # Só a criação movimenta o estoque; editar o registro não reaplica a quantidade
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            self.aplicar_no_estoque()
+            super().save(*args, **kwargs)
+
+    def aplicar_no_estoque(self):
+        """Atualiza o estoque do produto com um único UPDATE condicional.
+
+        A conta é feita no banco (quantidade = quantidade +/- n, com a guarda
+        quantidade >= n nas saídas), então gravações concorrentes no mesmo
+        produto não perdem atualizações.
+        """
+        produtos = Produto.objects.filter(pk=self.produto_id)
         if self.tipo_movimentacao == 'entrada':
-            self.produto.quantidade += self.quantidade
+            nova_quantidade = F('quantidade') + self.quantidade
         elif self.tipo_movimentacao == 'saida':
-            if self.produto.quantidade >= self.quantidade:
-                self.produto.quantidade -= self.quantidade
-            else:
-                raise ValueError("Quantidade em estoque insuficiente para saída")
-        
-        self.produto.save()
-        super().save(*args, **kwargs)
+            produtos = produtos.filter(quantidade__gte=self.quantidade)
+            nova_quantidade = F('quantidade') - self.quantidade
+        else:
+            raise ValueError(f"Tipo de movimentação inválido: {self.tipo_movimentacao}")
+
+        # O status é recalculado pelo ProdutoQuerySet.update()
+        atualizados = produtos.update(quantidade=nova_quantidade)
+        if atualizados:
+            return
+        # Nenhuma linha: ou o produto não existe mais, ou a saída não passou na guarda
+        if not Produto.objects.filter(pk=self.produto_id).exists():
+            raise Produto.DoesNotExist(f"Produto {self.produto_id} não encontrado")
+        raise EstoqueInsuficiente("Quantidade em estoque insuficiente para saída")
 
 class AlertaEstoque(models.Model):
     TIPO_ALERTA_CHOICES = [
@@ -181,12 +310,181 @@ class AlertaEstoque(models.Model):
     )
     mensagem = models.TextField(verbose_name="Mensagem do Alerta")
     lido = models.BooleanField(default=False, verbose_name="Lido")
+    # Marcado pelo motor de alertas (api/alertas.py) quando o estoque se recupera
+    resolvido = models.BooleanField(default=False, verbose_name="Resolvido")
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de Atualização")
+    # Muda a cada edição; entra no ETag da listagem (ver api/condicional.py)
+    data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Data de Modificação")
     
     class Meta:
         verbose_name = "Alerta de Estoque"
         verbose_name_plural = "Alertas de Estoque"
         ordering = ['-data_criacao']
+        indexes = [
+            # Índices parciais: só cobrem as poucas linhas pendentes
+            models.Index(
+                fields=['-data_criacao'],
+                condition=models.Q(lido=False),
+                name='api_alerta_nao_lido_idx'
+            ),
+            models.Index(
+                fields=['produto'],
+                condition=models.Q(resolvido=False),
+                name='api_alerta_pendente_idx'
+            ),
+        ]
+        constraints = [
+            # Um alerta automático pendente por produto e tipo (ver api/alertas.py);
+            # alertas manuais ('info') podem se repetir
+            models.UniqueConstraint(
+                fields=['produto', 'tipo_alerta'],
+                condition=models.Q(resolvido=False, tipo_alerta__in=['atencao', 'critico']),
+                name='api_alerta_pendente_unico'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.tipo_alerta.upper()} - {self.produto.nome}"
+
+class ResumoEstoque(models.Model):
+    """Contadores do estoque em uma única linha, mantidos por triggers no banco.
+
+    Os triggers (ver api/resumo.py) atualizam a linha na mesma transação de
+    qualquer escrita em Produto ou AlertaEstoque, então dashboard e relatórios
+    leem os totais sem varrer as tabelas. Só produtos ativos entram na conta.
+    """
+    produtos_disponiveis = models.IntegerField(default=0, verbose_name="Produtos Disponíveis")
+    produtos_baixo = models.IntegerField(default=0, verbose_name="Produtos com Estoque Baixo")
+    produtos_critico = models.IntegerField(default=0, verbose_name="Produtos com Estoque Crítico")
+    produtos_esgotado = models.IntegerField(default=0, verbose_name="Produtos Esgotados")
+    # Em centavos para a soma ser exata (o SQLite faria a conta em ponto flutuante)
+    valor_total_centavos = models.BigIntegerField(default=0, verbose_name="Valor Total do Estoque (centavos)")
+    alertas_nao_lidos = models.IntegerField(default=0, verbose_name="Alertas Não Lidos")
+    
+    class Meta:
+        verbose_name = "Resumo do Estoque"
+        verbose_name_plural = "Resumo do Estoque"
+    
+    def __str__(self):
+        return f"Resumo do estoque ({self.total_produtos} produtos)"
+    
+    @property
+    def total_produtos(self):
+        return (
+            self.produtos_disponiveis + self.produtos_baixo
+            + self.produtos_critico + self.produtos_esgotado
+        )
+    
+    @property
+    def valor_total(self):
+        return Decimal(self.valor_total_centavos) / 100
+
+class ConsumoDiario(models.Model):
+    """Total movimentado por produto, dia e tipo, para os relatórios de consumo.
+
+    Mantido por triggers (ver api/consumo.py) na mesma transação de qualquer
+    escrita em MovimentacaoEstoque, então um relatório soma no máximo uma
+    linha por dia em vez de varrer o histórico. O dia é o de
+    data_movimentacao em UTC (TIME_ZONE do projeto).
+    """
+    produto = models.ForeignKey(
+        Produto,
+        on_delete=models.CASCADE,
+        related_name='consumo_diario',
+        verbose_name="Produto"
+    )
+    data = models.DateField(verbose_name="Data")
+    tipo_movimentacao = models.CharField(
+        max_length=10,
+        choices=MovimentacaoEstoque.TIPO_MOVIMENTACAO_CHOICES,
+        verbose_name="Tipo de Movimentação"
+    )
+    quantidade = models.BigIntegerField(default=0, verbose_name="Quantidade")
+    movimentacoes = models.IntegerField(default=0, verbose_name="Movimentações")
+    
+    class Meta:
+        verbose_name = "Consumo Diário"
+        verbose_name_plural = "Consumo Diário"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['produto', 'data', 'tipo_movimentacao'], name='unique_consumo_produto_dia_tipo'
+            )
+        ]
+        indexes = [
+            # Cobre os relatórios de todos os produtos num período e a leitura
+            # das saídas pela previsão, sem acessar a tabela
+            models.Index(
+                fields=['data', 'tipo_movimentacao', 'produto', 'quantidade', 'movimentacoes'],
+                name='api_consumo_data_cobre_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.produto_id} {self.data} {self.tipo_movimentacao}: {self.quantidade}"
+
+class PrevisaoEstoque(models.Model):
+    """Ritmo de consumo de um produto e a reposição sugerida, recalculados em lote.
+
+    Calculada para o catálogo inteiro por api/previsao.py (comando
+    prever_estoque) a partir das saídas diárias em ConsumoDiario.
+    """
+    produto = models.OneToOneField(
+        Produto,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='previsao',
+        verbose_name="Produto"
+    )
+    consumo_medio = models.FloatField(verbose_name="Consumo Médio Diário")
+    desvio_consumo = models.FloatField(verbose_name="Desvio Padrão do Consumo Diário")
+    # Nulo quando o produto não teve saídas no período
+    dias_ate_esgotar = models.FloatField(null=True, blank=True, verbose_name="Dias até Esgotar")
+    estoque_minimo_sugerido = models.IntegerField(verbose_name="Estoque Mínimo Sugerido")
+    dias_analisados = models.IntegerField(verbose_name="Dias Analisados")
+    data_calculo = models.DateTimeField(verbose_name="Data do Cálculo")
+    
+    class Meta:
+        verbose_name = "Previsão de Estoque"
+        verbose_name_plural = "Previsões de Estoque"
+        indexes = [
+            models.Index(fields=['dias_ate_esgotar']),
+        ]
+    
+    def __str__(self):
+        return f"Previsão de {self.produto_id}: {self.consumo_medio:.2f}/dia"
+
+class AlteracaoProduto(models.Model):
+    """Última alteração de cada produto, para o feed de sincronização incremental.
+
+    Mantida por triggers (ver api/alteracoes.py): a cada escrita em Produto a
+    linha do produto é recriada e recebe um id novo. O id (AUTOINCREMENT no
+    SQLite, nunca reutilizado) é o cursor do feed; como as escritas no SQLite
+    são serializadas, ele cresce na ordem em que as alterações são gravadas.
+    Produtos excluídos ficam com removido=True (tombstone).
+    """
+    # Sem ForeignKey: a linha precisa sobreviver à exclusão do produto
+    produto_id = models.BigIntegerField(unique=True, verbose_name="Produto")
+    removido = models.BooleanField(default=False, verbose_name="Removido")
+    
+    class Meta:
+        verbose_name = "Alteração de Produto"
+        verbose_name_plural = "Alterações de Produtos"
+    
+    def __str__(self):
+        return f"Produto {self.produto_id} (alteração {self.pk})"
+
+class TokenRevogado(models.Model):
+    """Refresh token já usado numa rotação (ou revogado), pelo jti.
+
+    Só os tokens revogados são gravados, e cada linha pode ser apagada quando
+    o token expira; a consulta no dia a dia é feita em memória (api/revogacao.py).
+    """
+    jti = models.CharField(max_length=255, unique=True, verbose_name="JTI")
+    expira_em = models.DateTimeField(db_index=True, verbose_name="Expira em")
+    
+    class Meta:
+        verbose_name = "Token Revogado"
+        verbose_name_plural = "Tokens Revogados"
     
     def __str__(self):
-        return f"{self.tipo_alerta.upper()} - {self.produto.nome}"
\ No newline at end of file
+        return self.jti
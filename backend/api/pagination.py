@@ -0,0 +1,157 @@
+"""Paginação por cursor (keyset) para as listagens da API."""
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Pagina por (campo de ordenação, id) em vez de OFFSET.
+
+    O cursor guarda os valores da última linha da página, e a próxima página
+    é buscada com WHERE (campo, id) > (valor, último id) sobre um índice
+    composto, então a página N custa o mesmo que a primeira. O total
+    (COUNT(*)) só é calculado quando o cliente pede ?count=true.
+    """
+    # Campo de ordenação; o prefixo '-' indica ordem decrescente. O id é o desempate.
+    ordering = None
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.preparar(queryset, request)
+        if self.contar:
+            self.count = queryset.count()
+        return self.recortar(list(self.pagina(queryset)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """Versão para views assíncronas, com o ORM assíncrono."""
+        queryset = self.preparar(queryset, request)
+        if self.contar:
+            self.count = await queryset.acount()
+        return self.recortar([instance async for instance in self.pagina(queryset)])
+
+    def preparar(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        ordering = self.get_ordering(queryset)
+        self.descending = ordering.startswith('-')
+        self.field_name = ordering.lstrip('-')
+        self.page_size = self.get_page_size(request)
+        self.count = None
+        self.contar = request.query_params.get(self.count_query_param) in ('1', 'true')
+        return queryset
+
+    def pagina(self, queryset):
+        prefixo = '-' if self.descending else ''
+        queryset = queryset.order_by(f'{prefixo}{self.field_name}', f'{prefixo}id')
+
+        cursor = self.decode_cursor(self.request, queryset)
+        if cursor is not None:
+            queryset = queryset.filter(self.after(*cursor))
+        # Uma linha a mais indica se existe próxima página
+        return queryset[:self.page_size + 1]
+
+    def recortar(self, results):
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_ordering(self, queryset):
+        return self.ordering
+
+    def after(self, valor, pk):
+        lookup = 'lt' if self.descending else 'gt'
+        return (
+            Q(**{f'{self.field_name}__{lookup}': valor})
+            | Q(**{self.field_name: valor, f'id__{lookup}': pk})
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_field(self, queryset):
+        annotation = queryset.query.annotations.get(self.field_name)
+        if annotation is not None:
+            return annotation.output_field
+        return queryset.model._meta.get_field(self.field_name)
+
+    def decode_cursor(self, request, queryset):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            valor, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            valor = self.get_field(queryset).to_python(valor)
+            pk = int(pk)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        # Os campos de ordenação não são nulos, e o filtro não aceita comparar com NULL
+        if valor is None:
+            raise NotFound(self.invalid_cursor_message)
+        return valor, pk
+
+    def encode_cursor(self, instance):
+        # A página pode ser de modelos ou de dicionários do values() (ver api/campos.py)
+        if isinstance(instance, dict):
+            valor, pk = instance[self.field_name], instance['id']
+        else:
+            valor, pk = getattr(instance, self.field_name), instance.pk
+        if hasattr(valor, 'isoformat'):
+            valor = valor.isoformat()
+        payload = json.dumps([valor, pk]).encode('utf-8')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            remove_query_param(self.base_url, self.count_query_param),
+            self.cursor_query_param,
+            self.encode_cursor(self.page[-1]),
+        )
+
+    def get_paginated_data(self, data):
+        response = {'next': self.get_next_link()}
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return response
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_response_schema(self, schema):
+        properties = {
+            'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+            'count': {'type': 'integer'},
+            'results': schema,
+        }
+        return {'type': 'object', 'required': ['next', 'results'], 'properties': properties}
+
+
+class ProdutoPagination(KeysetPagination):
+    ordering = 'nome'
+
+    def get_ordering(self, queryset):
+        # Resultados da busca textual seguem a relevância (ver api/search.py)
+        if 'relevancia' in queryset.query.annotations:
+            return 'relevancia'
+        return self.ordering
+
+
+class MovimentacaoPagination(KeysetPagination):
+    ordering = '-data_movimentacao'
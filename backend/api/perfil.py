@@ -0,0 +1,269 @@
+"""Perfil das requisições: consultas SQL, serialização, autenticação e tempo total.
+
+O PerfilMiddleware abre uma Medicao por requisição num ContextVar, que
+acompanha a requisição também nas views assíncronas e dentro do
+sync_to_async. Cada conexão do banco ganha, ao ser criada, um execute_wrapper
+que soma as consultas na Medicao atual; medir() soma o tempo de uma etapa
+(a autenticação JWT e o to_representation dos serializers usam). As etapas
+se sobrepõem: consultas feitas durante a serialização (N+1) contam nas duas.
+
+Ao fim da requisição os tempos vão para o header Server-Timing (aparecem no
+DevTools do navegador) e para o histograma em memória do processo, servido
+em GET /api/perfil/ para administradores.
+
+Views podem declarar `orcamento_consultas` (um número, ou um dicionário por
+action do viewset). O middleware registra um aviso no log quando a resposta
+passa do orçamento, e OrcamentoConsultasMixin transforma isso em falha nos
+testes.
+"""
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores (ms) das faixas do histograma de tempo total; a última faixa é aberta
+FAIXAS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+ETAPAS = ('autenticacao', 'serializacao')
+
+_medicao = ContextVar('medicao', default=None)
+
+
+class Medicao:
+    """Acumuladores de uma requisição."""
+
+    __slots__ = ('inicio', 'consultas', 'sql', 'etapas', 'abertas')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.sql = 0.0
+        self.etapas = dict.fromkeys(ETAPAS, 0.0)
+        self.abertas = set()
+
+
+@contextmanager
+def medir(etapa):
+    """Soma o tempo do bloco na etapa da requisição atual (sem requisição, não faz nada).
+
+    Chamadas aninhadas da mesma etapa (um serializer dentro de outro) contam
+    uma vez só.
+    """
+    medicao = _medicao.get()
+    if medicao is None or etapa in medicao.abertas:
+        yield
+        return
+    medicao.abertas.add(etapa)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicao.etapas[etapa] = medicao.etapas.get(etapa, 0.0) + time.perf_counter() - inicio
+        medicao.abertas.discard(etapa)
+
+
+def _contar_sql(execute, sql, params, many, context):
+    medicao = _medicao.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.consultas += 1
+        medicao.sql += time.perf_counter() - inicio
+
+
+def instalar_contador_sql(sender, connection, **kwargs):
+    """Coloca o contador de consultas na conexão recém-criada (sinal connection_created).
+
+    Entra no início da lista para não atrapalhar connection.execute_wrapper(),
+    que tira da lista o último wrapper ao sair.
+    """
+    if _contar_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _contar_sql)
+
+
+class SerializacaoMedida:
+    """Mixin de serializer: o to_representation conta na etapa 'serializacao'."""
+
+    def to_representation(self, instance):
+        with medir('serializacao'):
+            return super().to_representation(instance)
+
+
+class Histograma:
+    """Agregado por rota, em memória e protegido por lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rotas = {}
+
+    def registrar(self, rota, medicao, total):
+        faixa = bisect.bisect_left(FAIXAS_MS, total * 1000)
+        with self._lock:
+            dados = self._rotas.get(rota)
+            if dados is None:
+                dados = self._rotas[rota] = {
+                    'requisicoes': 0, 'total': 0.0, 'maximo': 0.0, 'consultas': 0, 'sql': 0.0,
+                    'etapas': dict.fromkeys(ETAPAS, 0.0), 'faixas': [0] * (len(FAIXAS_MS) + 1),
+                }
+            dados['requisicoes'] += 1
+            dados['total'] += total
+            dados['maximo'] = max(dados['maximo'], total)
+            dados['consultas'] += medicao.consultas
+            dados['sql'] += medicao.sql
+            for etapa, duracao in medicao.etapas.items():
+                dados['etapas'][etapa] = dados['etapas'].get(etapa, 0.0) + duracao
+            dados['faixas'][faixa] += 1
+
+    def limpar(self):
+        with self._lock:
+            self._rotas.clear()
+
+    def resumo(self):
+        """Médias, percentis aproximados pelas faixas e a contagem de cada faixa, por rota."""
+        with self._lock:
+            rotas = {
+                rota: {**dados, 'etapas': dict(dados['etapas']), 'faixas': list(dados['faixas'])}
+                for rota, dados in self._rotas.items()
+            }
+
+        resumo = {}
+        for rota, dados in sorted(rotas.items()):
+            n = dados['requisicoes']
+            resumo[rota] = {
+                'requisicoes': n,
+                'total_ms': {
+                    'media': round(dados['total'] / n * 1000, 2),
+                    **{f'p{p}': _percentil(dados, p / 100) for p in (50, 95, 99)},
+                    'maximo': round(dados['maximo'] * 1000, 2),
+                },
+                'consultas_media': round(dados['consultas'] / n, 2),
+                'sql_ms_media': round(dados['sql'] / n * 1000, 2),
+                **{f'{etapa}_ms_media': round(duracao / n * 1000, 2) for etapa, duracao in dados['etapas'].items()},
+                # Contagem por faixa de FAIXAS_MS, mais a faixa aberta no fim
+                'faixas': dados['faixas'],
+            }
+        return resumo
+
+
+def _percentil(dados, fracao):
+    """Limite superior da faixa onde cai o percentil (o máximo, na faixa aberta)."""
+    alvo = fracao * dados['requisicoes']
+    acumulado = 0
+    for limite, contagem in zip(FAIXAS_MS, dados['faixas']):
+        acumulado += contagem
+        if acumulado >= alvo:
+            return min(limite, round(dados['maximo'] * 1000, 2))
+    return round(dados['maximo'] * 1000, 2)
+
+
+estatisticas = Histograma()
+
+
+def _rota(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return f'{request.method} (sem rota)'
+    return f'{request.method} {match.view_name or match.route}'
+
+
+def orcamento_da_resposta(request, response):
+    """Orçamento de consultas declarado pela view que gerou a resposta, ou None."""
+    view = (getattr(response, 'renderer_context', None) or {}).get('view')
+    if view is None:
+        match = getattr(request, 'resolver_match', None)
+        view = match.func if match is not None else None
+    orcamento = getattr(view, 'orcamento_consultas', None)
+    if isinstance(orcamento, dict):
+        return orcamento.get(getattr(view, 'action', None))
+    return orcamento
+
+
+def _server_timing(medicao, total):
+    metricas = [f'sql;dur={medicao.sql * 1000:.2f};desc="{medicao.consultas} consultas"']
+    metricas += [f'{etapa};dur={duracao * 1000:.2f}' for etapa, duracao in medicao.etapas.items() if duracao]
+    metricas.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(metricas)
+
+
+class PerfilMiddleware:
+    """Mede cada requisição; deve ser o primeiro do MIDDLEWARE para o total incluir os demais."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        medicao = Medicao()
+        token = _medicao.set(medicao)
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicao.reset(token)
+        return self._concluir(request, response, medicao)
+
+    async def __acall__(self, request):
+        medicao = Medicao()
+        token = _medicao.set(medicao)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicao.reset(token)
+        return self._concluir(request, response, medicao)
+
+    def _concluir(self, request, response, medicao):
+        total = time.perf_counter() - medicao.inicio
+        rota = _rota(request)
+        estatisticas.registrar(rota, medicao, total)
+        response['Server-Timing'] = _server_timing(medicao, total)
+        response.perfil = medicao
+
+        orcamento = orcamento_da_resposta(request, response)
+        if orcamento is not None and medicao.consultas > orcamento:
+            logger.warning('%s fez %d consultas SQL (orçamento: %d)', rota, medicao.consultas, orcamento)
+        return response
+
+
+class OrcamentoConsultasMixin:
+    """Mixin de TestCase: falha quando uma resposta passa do orçamento de consultas da view.
+
+    O PerfilMiddleware precisa estar ativo (ele anexa a Medicao à resposta).
+    """
+
+    def assertDentroDoOrcamento(self, response, orcamento=None):
+        medicao = getattr(response, 'perfil', None)
+        if medicao is None:
+            self.fail('Resposta sem medição: o PerfilMiddleware está no MIDDLEWARE?')
+        if orcamento is None:
+            request = getattr(response, 'wsgi_request', None) or getattr(response, 'asgi_request', None)
+            orcamento = orcamento_da_resposta(request, response)
+        if orcamento is None:
+            self.fail('A view não declara orcamento_consultas para esta action')
+        if medicao.consultas > orcamento:
+            self.fail(f'{medicao.consultas} consultas SQL, acima do orçamento de {orcamento}')
+
+    @contextmanager
+    def assertConsultasAte(self, maximo, using='default'):
+        """Como assertNumQueries, mas aceita qualquer número até `maximo`."""
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connections[using]) as contexto:
+            yield contexto
+        if len(contexto) > maximo:
+            consultas = '\n'.join(consulta['sql'] for consulta in contexto.captured_queries)
+            self.fail(f'{len(contexto)} consultas SQL, acima do máximo de {maximo}:\n{consultas}')
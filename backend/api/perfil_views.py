@@ -0,0 +1,19 @@
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .perfil import FAIXAS_MS, estatisticas
+
+
+class PerfilView(APIView):
+    """Histograma das requisições deste processo, por rota (ver api/perfil.py), só para admins"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'faixas_ms': FAIXAS_MS, 'rotas': estatisticas.resumo()})
+
+    def delete(self, request):
+        # Zera as contagens, para medir a partir de agora
+        estatisticas.limpar()
+        return Response(status=status.HTTP_204_NO_CONTENT)
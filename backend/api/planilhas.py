@@ -0,0 +1,67 @@
+"""Leitura de planilhas XLSX ou CSV, comum à importação de produtos e ao cadastro de usuários.
+
+A planilha é lida em streaming (openpyxl em modo read-only ou csv.reader):
+só o cabeçalho é lido de início, e as linhas são entregues sob demanda. Cada
+módulo informa como as colunas do cabeçalho viram campos (ver
+importacao.COLUNAS e provisionamento.COLUNAS).
+"""
+import codecs
+import csv
+import unicodedata
+
+from openpyxl import load_workbook
+
+
+class PlanilhaInvalida(Exception):
+    """Arquivo que não pode ser lido (formato desconhecido ou sem cabeçalho)."""
+
+
+def normalizar(texto):
+    """Texto sem acentos, sem espaços nas pontas e em minúsculas (para comparar nomes de colunas e valores)."""
+    texto = unicodedata.normalize('NFKD', str(texto or '')).encode('ascii', 'ignore').decode()
+    return texto.strip().lower()
+
+
+class LinhasPlanilha:
+    """Iterável de (número da linha, {campo: valor}); `campos` são os campos do cabeçalho."""
+
+    def __init__(self, cabecalho, linhas):
+        self.cabecalho = cabecalho
+        self.campos = {campo for campo in cabecalho if campo is not None}
+        self._linhas = linhas
+
+    def __iter__(self):
+        for numero, linha in enumerate(self._linhas, start=2):
+            if not any(valor not in (None, '') for valor in linha):
+                continue
+            yield numero, {
+                campo: valor
+                for campo, valor in zip(self.cabecalho, linha)
+                if campo is not None
+            }
+
+
+def ler_planilha(arquivo, nome_arquivo, colunas, obrigatorias):
+    """Lê o cabeçalho e devolve as linhas como LinhasPlanilha.
+
+    `colunas` mapeia o nome normalizado de cada coluna para o campo; colunas
+    desconhecidas são ignoradas. Sem algum campo de `obrigatorias` no
+    cabeçalho, levanta PlanilhaInvalida.
+    """
+    if nome_arquivo.lower().endswith('.xlsx'):
+        workbook = load_workbook(arquivo, read_only=True, data_only=True)
+        linhas = workbook.active.iter_rows(values_only=True)
+    elif nome_arquivo.lower().endswith('.csv'):
+        linhas = csv.reader(codecs.getreader('utf-8-sig')(arquivo))
+    else:
+        raise PlanilhaInvalida('Envie um arquivo .xlsx ou .csv')
+
+    try:
+        cabecalho = [colunas.get(normalizar(coluna)) for coluna in next(linhas)]
+    except StopIteration:
+        raise PlanilhaInvalida('Planilha vazia')
+    if any(campo not in cabecalho for campo in obrigatorias):
+        nomes = ', '.join(f'"{campo}"' for campo in obrigatorias[:-1]) + f' e "{obrigatorias[-1]}"'
+        raise PlanilhaInvalida(f'A planilha precisa das colunas {nomes}')
+
+    return LinhasPlanilha(cabecalho, linhas)
@@ -0,0 +1,124 @@
+"""Previsão de consumo e reposição para o catálogo inteiro, com NumPy.
+
+As saídas diárias dos últimos `dias` (ConsumoDiario) viram uma matriz
+produtos x dias, com zero nos dias sem saída. Média, desvio padrão, dias até
+esgotar e estoque mínimo sugerido saem de operações sobre a matriz inteira,
+sem laço por produto. Dias anteriores ao cadastro do produto ficam fora da
+conta, para um produto novo não parecer parado.
+
+O estoque mínimo sugerido cobre o prazo de reposição com a margem de
+segurança usual: consumo_medio * prazo + z * desvio * sqrt(prazo), com z
+dado pelo nível de serviço (0,95 -> z ~ 1,645).
+"""
+import math
+from datetime import timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .consumo import saidas_por_dia
+from .models import PrevisaoEstoque, Produto
+
+DIAS_ANALISADOS = 90
+PRAZO_REPOSICAO = 7
+NIVEL_SERVICO = 0.95
+
+CAMPOS_PREVISAO = [
+    'consumo_medio', 'desvio_consumo', 'dias_ate_esgotar',
+    'estoque_minimo_sugerido', 'dias_analisados', 'data_calculo',
+]
+
+
+def carregar_series(hoje, dias=DIAS_ANALISADOS):
+    """Devolve (ids, quantidades, primeiro_dia, saidas) dos produtos ativos.
+
+    `saidas` é a matriz produtos x dias (o último dia é `hoje`) e
+    `primeiro_dia` o índice do primeiro dia em que cada produto existia.
+    """
+    inicio = hoje - timedelta(days=dias - 1)
+    produtos = list(
+        Produto.objects.filter(ativo=True)
+        .annotate(criado_em=TruncDate('data_criacao'))
+        .order_by('id')
+        .values_list('id', 'quantidade', 'criado_em')
+    )
+    if not produtos:
+        vazio = np.zeros(0, dtype=np.int64)
+        return vazio, vazio, vazio, np.zeros((0, dias))
+
+    ids, quantidades, criados_em = zip(*produtos)
+    ids = np.array(ids, dtype=np.int64)
+    quantidades = np.array(quantidades, dtype=np.int64)
+    origem = np.datetime64(inicio, 'D')
+    primeiro_dia = np.clip((np.array(criados_em, dtype='datetime64[D]') - origem).astype(np.int64), 0, dias - 1)
+
+    saidas = np.zeros((len(ids), dias))
+    linhas = list(saidas_por_dia(inicio, hoje))
+    if linhas:
+        produto_ids, datas, totais = zip(*linhas)
+        produto_ids = np.array(produto_ids, dtype=np.int64)
+        # Saídas de produtos inativos ficam de fora
+        posicoes = np.searchsorted(ids, produto_ids)
+        validos = (posicoes < len(ids)) & (ids[np.minimum(posicoes, len(ids) - 1)] == produto_ids)
+        colunas = (np.array(datas, dtype='datetime64[D]') - origem).astype(np.int64)
+        saidas[posicoes[validos], colunas[validos]] = np.array(totais, dtype=np.float64)[validos]
+    return ids, quantidades, primeiro_dia, saidas
+
+
+def prever(quantidades, primeiro_dia, saidas, prazo=PRAZO_REPOSICAO, nivel_servico=NIVEL_SERVICO):
+    """Estatísticas de consumo por produto (uma linha da matriz por produto).
+
+    Devolve um dicionário de arrays: consumo_medio, desvio_consumo,
+    dias_ate_esgotar (NaN sem consumo), estoque_minimo_sugerido e
+    dias_analisados.
+    """
+    dias = saidas.shape[1]
+    existentes = np.arange(dias) >= primeiro_dia[:, None]
+    n = existentes.sum(axis=1)
+
+    media = saidas.sum(axis=1) / n
+    desvios = np.where(existentes, saidas - media[:, None], 0.0)
+    desvio = np.sqrt((desvios ** 2).sum(axis=1) / np.maximum(n - 1, 1))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dias_ate_esgotar = np.where(media > 0, quantidades / media, np.nan)
+
+    z = NormalDist().inv_cdf(nivel_servico)
+    sugerido = np.ceil(media * prazo + z * desvio * math.sqrt(prazo)).clip(min=0)
+
+    return {
+        'consumo_medio': media,
+        'desvio_consumo': desvio,
+        'dias_ate_esgotar': dias_ate_esgotar,
+        'estoque_minimo_sugerido': sugerido.astype(np.int64),
+        'dias_analisados': n,
+    }
+
+
+def atualizar_previsoes(dias=DIAS_ANALISADOS, prazo=PRAZO_REPOSICAO, nivel_servico=NIVEL_SERVICO):
+    """Recalcula e grava a previsão de todos os produtos ativos; devolve quantas foram gravadas."""
+    agora = timezone.now()
+    ids, quantidades, primeiro_dia, saidas = carregar_series(agora.date(), dias)
+    resultado = prever(quantidades, primeiro_dia, saidas, prazo, nivel_servico)
+
+    # tolist() converte para tipos do Python de uma vez; NaN vira None
+    colunas = {campo: valores.tolist() for campo, valores in resultado.items()}
+    colunas['dias_ate_esgotar'] = [None if math.isnan(d) else d for d in colunas['dias_ate_esgotar']]
+    previsoes = [
+        PrevisaoEstoque(produto_id=produto_id, data_calculo=agora, **dict(zip(colunas, valores)))
+        for produto_id, *valores in zip(ids.tolist(), *colunas.values())
+    ]
+
+    with transaction.atomic():
+        PrevisaoEstoque.objects.exclude(produto_id__in=Produto.objects.filter(ativo=True)).delete()
+        PrevisaoEstoque.objects.bulk_create(
+            previsoes,
+            update_conflicts=True,
+            unique_fields=['produto'],
+            update_fields=CAMPOS_PREVISAO,
+            batch_size=1000,
+        )
+    return len(previsoes)
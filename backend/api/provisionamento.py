@@ -0,0 +1,207 @@
+"""Cadastro de usuários em massa a partir de planilhas XLSX ou CSV.
+
+Usado para cadastrar de uma vez os usuários de uma empresa. A planilha é
+lida com planilhas.ler_planilha e validada por inteiro antes de qualquer
+gravação: campos, validate_password e e-mails/usernames repetidos, tanto na
+própria planilha quanto já cadastrados (consultados em lotes). Só então as
+senhas das linhas válidas passam pelo hash, num pool de processos
+(api/senhas.py), e os usuários são gravados com bulk_create.
+
+Como na importação de produtos, linhas inválidas não impedem o cadastro das
+demais; elas voltam no relatório com o número da linha.
+
+Pela API o hash roda dentro da requisição, sem pool (nada de fork a partir
+de um servidor com threads ou ASGI), e a planilha é limitada a
+MAXIMO_LINHAS_HTTP usuários; arquivos maiores vão pelo comando
+provisionar_usuarios.
+"""
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .planilhas import PlanilhaInvalida, ler_planilha, normalizar
+from .models import Usuario
+from .senhas import hash_senhas
+
+TAMANHO_LOTE = 1000
+# Cerca de 0,4 s de PBKDF2 por senha: 50 usuários ficam em ~20 s por requisição
+MAXIMO_LINHAS_HTTP = 50
+MAXIMO_BYTES_HTTP = 256 * 1024
+
+COLUNAS_USUARIO = [
+    ('username', ('username', 'usuario')),
+    ('email', ('email', 'e-mail')),
+    ('first_name', ('first_name', 'nome')),
+    ('last_name', ('last_name', 'sobrenome')),
+    ('empresa', ('empresa',)),
+    ('password', ('password', 'senha')),
+]
+
+COLUNAS = {
+    normalizar(nome): campo
+    for campo, nomes in COLUNAS_USUARIO
+    for nome in nomes
+}
+
+TAMANHOS = {
+    'username': Usuario._meta.get_field('username').max_length,
+    'email': Usuario._meta.get_field('email').max_length,
+    'first_name': Usuario._meta.get_field('first_name').max_length,
+    'last_name': Usuario._meta.get_field('last_name').max_length,
+    'empresa': Usuario._meta.get_field('empresa').max_length,
+}
+
+
+def ler_planilha_usuarios(arquivo, nome_arquivo):
+    return ler_planilha(arquivo, nome_arquivo, colunas=COLUNAS, obrigatorias=('email', 'password'))
+
+
+def _texto(valor):
+    return str(valor).strip() if valor is not None else ''
+
+
+def validar_usuario(dados, empresa=None):
+    """Valida uma linha; devolve (valores, senha, erros).
+
+    Sem a coluna username, o e-mail é usado como username. `empresa` é o
+    valor usado quando a linha não informa a empresa.
+    """
+    erros = {}
+    email = Usuario.objects.normalize_email(_texto(dados.get('email')))
+    valores = {
+        'email': email,
+        'username': Usuario.normalize_username(_texto(dados.get('username')) or email),
+        'first_name': _texto(dados.get('first_name')),
+        'last_name': _texto(dados.get('last_name')),
+        'empresa': _texto(dados.get('empresa')) or empresa or None,
+    }
+    senha = '' if dados.get('password') is None else str(dados.get('password'))
+
+    for campo in ('email', 'username', 'first_name', 'last_name'):
+        if not valores[campo]:
+            erros[campo] = 'Campo obrigatório'
+    for campo, tamanho in TAMANHOS.items():
+        if campo not in erros and valores[campo] and len(valores[campo]) > tamanho:
+            erros[campo] = f'Máximo de {tamanho} caracteres'
+
+    if 'email' not in erros:
+        try:
+            validate_email(email)
+        except ValidationError:
+            erros['email'] = 'E-mail inválido'
+    if 'username' not in erros:
+        try:
+            Usuario.username_validator(valores['username'])
+        except ValidationError as e:
+            erros['username'] = ' '.join(e.messages)
+
+    if not senha:
+        erros['password'] = 'Campo obrigatório'
+    else:
+        try:
+            validate_password(senha, user=Usuario(**valores))
+        except ValidationError as e:
+            erros['password'] = ' '.join(e.messages)
+
+    return valores, senha, erros
+
+
+def _erro(relatorio, numero, valores, erros):
+    relatorio['erros'].append({'linha': numero, 'email': valores['email'], 'erros': erros})
+
+
+def _sem_cadastrados(lote, relatorio):
+    """Tira do lote (e reporta) as linhas cujo e-mail ou username já existe."""
+    emails = set(
+        Usuario.objects.filter(email__in=[valores['email'] for _, valores, _ in lote])
+        .values_list('email', flat=True)
+    )
+    usernames = set(
+        Usuario.objects.filter(username__in=[valores['username'] for _, valores, _ in lote])
+        .values_list('username', flat=True)
+    )
+    livres = []
+    for numero, valores, senha in lote:
+        erros = {}
+        if valores['email'] in emails:
+            erros['email'] = 'E-mail já cadastrado'
+        if valores['username'] in usernames:
+            erros['username'] = 'Username já cadastrado'
+        if erros:
+            _erro(relatorio, numero, valores, erros)
+        else:
+            livres.append((numero, valores, senha))
+    return livres
+
+
+def _gravar(validos, relatorio):
+    """Grava (numero, valores, hash) com bulk_create; devolve quantos usuários foram criados.
+
+    Um cadastro concorrente pode usar o mesmo e-mail ou username entre a
+    verificação e a gravação: o lote é conferido de novo, essas linhas vão
+    para o relatório como já cadastradas e o restante é gravado.
+    """
+    while validos:
+        try:
+            with transaction.atomic():
+                Usuario.objects.bulk_create(
+                    [Usuario(**valores, password=hash_) for _, valores, hash_ in validos],
+                    batch_size=TAMANHO_LOTE,
+                )
+            return len(validos)
+        except IntegrityError:
+            livres = []
+            for inicio in range(0, len(validos), TAMANHO_LOTE):
+                livres.extend(_sem_cadastrados(validos[inicio:inicio + TAMANHO_LOTE], relatorio))
+            if len(livres) == len(validos):
+                raise
+            validos = livres
+    return 0
+
+
+def provisionar_usuarios(linhas, empresa=None, processos=None, maximo_linhas=None):
+    """Cadastra os usuários das linhas de ler_planilha_usuarios() e devolve o relatório.
+
+    E-mails e usernames repetidos na mesma planilha são recusados (fora a
+    primeira ocorrência). `processos` é o tamanho do pool de hash. Com
+    `maximo_linhas`, planilhas maiores são recusadas com PlanilhaInvalida
+    antes de qualquer hash.
+    """
+    relatorio = {'linhas': 0, 'criados': 0, 'erros': []}
+    emails, usernames = set(), set()
+    validos, lote = [], []
+
+    for numero, dados in linhas:
+        relatorio['linhas'] += 1
+        if maximo_linhas is not None and relatorio['linhas'] > maximo_linhas:
+            raise PlanilhaInvalida(
+                f'A planilha tem mais de {maximo_linhas} usuários; '
+                f'use o comando provisionar_usuarios para arquivos maiores'
+            )
+        valores, senha, erros = validar_usuario(dados, empresa)
+        if 'email' not in erros and valores['email'] in emails:
+            erros['email'] = 'E-mail repetido na planilha'
+        if 'username' not in erros and valores['username'] in usernames:
+            erros['username'] = 'Username repetido na planilha'
+        if erros:
+            _erro(relatorio, numero, valores, erros)
+            continue
+
+        emails.add(valores['email'])
+        usernames.add(valores['username'])
+        lote.append((numero, valores, senha))
+        if len(lote) >= TAMANHO_LOTE:
+            validos.extend(_sem_cadastrados(lote, relatorio))
+            lote = []
+    if lote:
+        validos.extend(_sem_cadastrados(lote, relatorio))
+
+    if validos:
+        hashes = hash_senhas([senha for _, _, senha in validos], processos)
+        relatorio['criados'] = _gravar(
+            [(numero, valores, hash_) for (numero, valores, _), hash_ in zip(validos, hashes)],
+            relatorio,
+        )
+    relatorio['erros'].sort(key=lambda erro: erro['linha'])
+    return relatorio
@@ -1,7 +1,12 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser
 from django.contrib.auth import get_user_model
+from .planilhas import PlanilhaInvalida
+from .provisionamento import (
+    MAXIMO_BYTES_HTTP, MAXIMO_LINHAS_HTTP, ler_planilha_usuarios, provisionar_usuarios,
+)
 from .serializers import UsuarioRegistrationSerializer
 import logging
 
@@ -14,8 +19,7 @@ class RegisterView(generics.GenericAPIView):
     serializer_class = UsuarioRegistrationSerializer
     
     def post(self, request, *args, **kwargs):
-        logger.info(f"Recebendo requisição de registro: {request.data}")
-        
+        # request.data não é registrado no log: contém as senhas
         serializer = self.get_serializer(data=request.data)
         
         if serializer.is_valid():
@@ -43,4 +47,34 @@ class RegisterView(generics.GenericAPIView):
                 return Response({'error': 'Erro ao criar usuário'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         else:
             logger.error(f"Erros do serializer: {serializer.errors}")
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class ProvisionamentoView(generics.GenericAPIView):
+    """Cadastro em massa a partir de planilha (ver api/provisionamento.py), só para admins"""
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is None:
+            return Response({'arquivo': 'Envie a planilha no campo "arquivo"'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if arquivo.size > MAXIMO_BYTES_HTTP:
+            return Response(
+                {'arquivo': 'Arquivo grande demais; use o comando provisionar_usuarios'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        try:
+            # Hash aqui mesmo (processos=1): nada de pool de processos dentro do servidor
+            relatorio = provisionar_usuarios(
+                ler_planilha_usuarios(arquivo, arquivo.name),
+                empresa=request.data.get('empresa') or None,
+                processos=1,
+                maximo_linhas=MAXIMO_LINHAS_HTTP,
+            )
+        except PlanilhaInvalida as e:
+            return Response({'arquivo': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.info(f"Cadastro em massa por {request.user}: {relatorio['criados']} usuários criados")
+        return Response(relatorio)
@@ -0,0 +1,193 @@
+"""Manutenção do ResumoEstoque por triggers do SQLite.
+
+Cada escrita em api_produto ou api_alertaestoque soma a diferença (linha nova
+menos linha antiga) na única linha de api_resumoestoque, dentro da mesma
+transação, criando a linha se ela não existir. Vale para save(), update(),
+bulk_create() e SQL direto.
+"""
+from decimal import Decimal
+
+from django.apps import apps as global_apps
+from django.db import connections, models, transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Round
+
+RESUMO_ID = 1
+
+CAMPOS_STATUS = {
+    'disponivel': 'produtos_disponiveis',
+    'baixo': 'produtos_baixo',
+    'critico': 'produtos_critico',
+    'esgotado': 'produtos_esgotado',
+}
+
+
+def _contribuicao_produto(linha):
+    """Parcelas de uma linha de api_produto (new/old) em cada contador."""
+    parcelas = {
+        campo: f"({linha}.ativo AND {linha}.status_estoque = '{status}')"
+        for status, campo in CAMPOS_STATUS.items()
+    }
+    parcelas['valor_total_centavos'] = (
+        f"(CASE WHEN {linha}.ativo THEN {linha}.quantidade * "
+        f"CAST(ROUND(COALESCE({linha}.preco, 0) * 100) AS INTEGER) ELSE 0 END)"
+    )
+    return parcelas
+
+
+def _somar_no_resumo(somar=None, subtrair=None):
+    """Upsert que soma a diferença na linha do resumo (ou a cria, ex.: após um flush)."""
+    somar = somar or {}
+    subtrair = subtrair or {}
+    campos = [*CAMPOS_STATUS.values(), 'valor_total_centavos', 'alertas_nao_lidos']
+    diferencas = {}
+    for campo in campos:
+        partes = []
+        if campo in somar:
+            partes.append(somar[campo])
+        if campo in subtrair:
+            partes.append(f'- {subtrair[campo]}')
+        diferencas[campo] = ' '.join(partes) or '0'
+    atribuicoes = [f'{campo} = {campo} + excluded.{campo}' for campo in campos if diferencas[campo] != '0']
+    return (
+        f"INSERT INTO api_resumoestoque (id, {', '.join(campos)}) "
+        f"VALUES ({RESUMO_ID}, {', '.join(diferencas.values())}) "
+        f"ON CONFLICT (id) DO UPDATE SET {', '.join(atribuicoes)};"
+    )
+
+
+SQL_TRIGGERS = {
+    'api_resumo_produto_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS api_resumo_produto_ai AFTER INSERT ON api_produto BEGIN
+            {_somar_no_resumo(somar=_contribuicao_produto('new'))}
+        END
+    """,
+    'api_resumo_produto_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS api_resumo_produto_ad AFTER DELETE ON api_produto BEGIN
+            {_somar_no_resumo(subtrair=_contribuicao_produto('old'))}
+        END
+    """,
+    'api_resumo_produto_au': f"""
+        CREATE TRIGGER IF NOT EXISTS api_resumo_produto_au
+        AFTER UPDATE OF quantidade, preco, status_estoque, ativo ON api_produto
+        WHEN old.quantidade IS NOT new.quantidade OR old.preco IS NOT new.preco
+            OR old.status_estoque IS NOT new.status_estoque OR old.ativo IS NOT new.ativo
+        BEGIN
+            {_somar_no_resumo(somar=_contribuicao_produto('new'), subtrair=_contribuicao_produto('old'))}
+        END
+    """,
+    'api_resumo_alerta_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS api_resumo_alerta_ai AFTER INSERT ON api_alertaestoque
+        WHEN NOT new.lido BEGIN
+            {_somar_no_resumo(somar={'alertas_nao_lidos': '1'})}
+        END
+    """,
+    'api_resumo_alerta_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS api_resumo_alerta_ad AFTER DELETE ON api_alertaestoque
+        WHEN NOT old.lido BEGIN
+            {_somar_no_resumo(subtrair={'alertas_nao_lidos': '1'})}
+        END
+    """,
+    'api_resumo_alerta_au': f"""
+        CREATE TRIGGER IF NOT EXISTS api_resumo_alerta_au AFTER UPDATE OF lido ON api_alertaestoque
+        WHEN old.lido IS NOT new.lido BEGIN
+            {_somar_no_resumo(somar={'alertas_nao_lidos': '(NOT new.lido)'}, subtrair={'alertas_nao_lidos': '(NOT old.lido)'})}
+        END
+    """,
+}
+
+
+def resumo_disponivel(connection):
+    return connection.vendor == 'sqlite'
+
+
+def criar_triggers_resumo(connection):
+    with connection.cursor() as cursor:
+        for sql in SQL_TRIGGERS.values():
+            cursor.execute(sql)
+
+
+def remover_triggers_resumo(connection):
+    with connection.cursor() as cursor:
+        for nome in SQL_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+
+
+def calcular_resumo(using='default', apps=global_apps):
+    """Recalcula os contadores varrendo as tabelas (duas agregações).
+
+    `apps` permite usar os modelos históricos dentro de uma migração.
+    """
+    Produto = apps.get_model('api', 'Produto')
+    AlertaEstoque = apps.get_model('api', 'AlertaEstoque')
+
+    centavos = Cast(
+        Round(Coalesce(F('preco'), Value(Decimal('0'))) * 100),
+        output_field=models.BigIntegerField(),
+    )
+    valores = Produto.objects.using(using).filter(ativo=True).aggregate(
+        **{
+            campo: Count('id', filter=Q(status_estoque=status))
+            for status, campo in CAMPOS_STATUS.items()
+        },
+        valor_total_centavos=Coalesce(Sum(F('quantidade') * centavos), 0),
+    )
+    valores['alertas_nao_lidos'] = AlertaEstoque.objects.using(using).filter(lido=False).count()
+    return valores
+
+
+def reconstruir_resumo(using='default', gravar=True, apps=global_apps):
+    """Recalcula o resumo do zero e devolve as divergências {campo: (gravado, real)}."""
+    ResumoEstoque = apps.get_model('api', 'ResumoEstoque')
+    with transaction.atomic(using=using):
+        resumo, _ = ResumoEstoque.objects.using(using).get_or_create(pk=RESUMO_ID)
+        valores = calcular_resumo(using, apps)
+        divergencias = {
+            campo: (getattr(resumo, campo), valor)
+            for campo, valor in valores.items()
+            if getattr(resumo, campo) != valor
+        }
+        if gravar and divergencias:
+            ResumoEstoque.objects.using(using).filter(pk=RESUMO_ID).update(**valores)
+    return divergencias
+
+
+def obter_resumo():
+    """Linha do resumo, ou None se ele não é mantido neste banco."""
+    ResumoEstoque = global_apps.get_model('api', 'ResumoEstoque')
+    if not resumo_disponivel(connections[ResumoEstoque.objects.db]):
+        return None
+    return ResumoEstoque.objects.filter(pk=RESUMO_ID).first()
+
+
+async def aobter_resumo():
+    """obter_resumo() para código assíncrono."""
+    ResumoEstoque = global_apps.get_model('api', 'ResumoEstoque')
+    if not resumo_disponivel(connections[ResumoEstoque.objects.db]):
+        return None
+    return await ResumoEstoque.objects.filter(pk=RESUMO_ID).afirst()
+
+
+def garantir_resumo(sender, using='default', **kwargs):
+    """Recria os triggers que faltarem e confere o resumo (post_migrate).
+
+    Migrações que reconstroem as tabelas apagam os triggers, e o flush apaga
+    a linha do resumo: escritas feitas nesse meio tempo não foram contadas,
+    então o resumo é recalculado.
+    """
+    apps = kwargs.get('apps') or global_apps
+    try:
+        apps.get_model('api', 'ResumoEstoque')
+    except LookupError:
+        # Migração do resumo não aplicada (ou revertida)
+        return
+
+    connection = connections[using]
+    if not resumo_disponivel(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existentes = {row[0] for row in cursor.fetchall()}
+    if not set(SQL_TRIGGERS) <= existentes:
+        criar_triggers_resumo(connection)
+    reconstruir_resumo(using, apps=apps)
@@ -0,0 +1,104 @@
+"""Revogação de refresh tokens (rotação com BLACKLIST_AFTER_ROTATION).
+
+O app token_blacklist do SimpleJWT grava todo token emitido e consulta o
+banco a cada refresh. Aqui só os tokens revogados são guardados, pelo jti:
+
+- a consulta é feita num conjunto em memória, carregado uma vez do banco;
+- a revogação é um INSERT em api_tokenrevogado, cujo jti é único. Se o
+  mesmo refresh token for usado duas vezes (em paralelo ou em outro
+  processo, que ainda não o tem em memória), o segundo INSERT falha e o
+  token é recusado, então o banco continua sendo a fonte da verdade;
+- linhas de tokens já expirados são apagadas periodicamente, então a tabela
+  fica do tamanho das revogações dentro de REFRESH_TOKEN_LIFETIME.
+"""
+import threading
+import time
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .models import TokenRevogado
+
+# Intervalo mínimo (segundos) entre duas limpezas de tokens expirados
+INTERVALO_PODA = 3600
+
+
+class Revogacoes:
+    """Conjunto de jtis revogados em memória, com o banco como registro durável."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jtis = {}
+        self._carregado = False
+        self._proxima_poda = 0
+
+    def _carregar(self):
+        if self._carregado:
+            return
+        linhas = TokenRevogado.objects.filter(expira_em__gt=timezone.now()).values_list('jti', 'expira_em')
+        with self._lock:
+            for jti, expira_em in linhas:
+                self._jtis[jti] = expira_em.timestamp()
+            self._carregado = True
+
+    def _guardar(self, jti, exp):
+        with self._lock:
+            self._jtis[jti] = exp
+
+    def revogado(self, jti):
+        self._carregar()
+        return jti in self._jtis
+
+    def revogar(self, jti, exp):
+        """Revoga o token; devolve False se ele já estava revogado."""
+        try:
+            with transaction.atomic():
+                TokenRevogado.objects.create(jti=jti, expira_em=datetime_from_epoch(exp))
+        except IntegrityError:
+            self._guardar(jti, exp)
+            return False
+        transaction.on_commit(lambda: self._guardar(jti, exp))
+
+        if time.monotonic() >= self._proxima_poda:
+            self._proxima_poda = time.monotonic() + INTERVALO_PODA
+            self.podar()
+        return True
+
+    def podar(self):
+        """Apaga os tokens que já expiraram (não passariam na verificação de exp)."""
+        agora = timezone.now()
+        removidos, _ = TokenRevogado.objects.filter(expira_em__lte=agora).delete()
+        with self._lock:
+            self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > agora.timestamp()}
+        return removidos
+
+    def limpar(self):
+        with self._lock:
+            self._jtis = {}
+            self._carregado = False
+
+
+revogacoes = Revogacoes()
+
+
+class RefreshTokenRevogavel(RefreshToken):
+    """RefreshToken que consulta e grava as revogações em `revogacoes`."""
+
+    def verify(self):
+        super().verify()
+        if revogacoes.revogado(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        # Chamado pelo TokenRefreshSerializer quando BLACKLIST_AFTER_ROTATION está ativo
+        if not revogacoes.revogar(self.payload[api_settings.JTI_CLAIM], self.payload['exp']):
+            raise TokenError(_('Token is blacklisted'))
+
+    def outstand(self):
+        # Os tokens emitidos não são registrados, só os revogados
+        return None
@@ -0,0 +1,121 @@
+"""Busca textual de produtos com SQLite FTS5.
+
+A tabela virtual api_produto_fts indexa nome e descricao de api_produto como
+"external content" (não duplica o texto) e é mantida por triggers, então
+save(), update() e bulk_create() ficam sincronizados sem código extra. O
+tokenizer remove acentos ("acucar" encontra "açúcar") e os índices de prefixo
+deixam a busca enquanto o usuário digita barata.
+"""
+import re
+
+from django.db import connections
+from django.db.models import F, Q
+
+FTS_TABELA = 'api_produto_fts'
+
+# Peso da coluna nome x descrição no bm25 usado para ordenar por relevância
+PESOS_RANK = 'bm25(10.0, 1.0)'
+
+SQL_TABELA = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABELA} USING fts5(
+        nome, descricao,
+        content='api_produto', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+SQL_TRIGGERS = {
+    f'{FTS_TABELA}_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABELA}_ai AFTER INSERT ON api_produto BEGIN
+            INSERT INTO {FTS_TABELA}(rowid, nome, descricao)
+            VALUES (new.id, new.nome, new.descricao);
+        END
+    """,
+    f'{FTS_TABELA}_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABELA}_ad AFTER DELETE ON api_produto BEGIN
+            INSERT INTO {FTS_TABELA}({FTS_TABELA}, rowid, nome, descricao)
+            VALUES ('delete', old.id, old.nome, old.descricao);
+        END
+    """,
+    # Só reindexa quando o texto muda; movimentações de estoque não tocam o índice
+    f'{FTS_TABELA}_au': f"""
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABELA}_au AFTER UPDATE OF nome, descricao ON api_produto BEGIN
+            INSERT INTO {FTS_TABELA}({FTS_TABELA}, rowid, nome, descricao)
+            VALUES ('delete', old.id, old.nome, old.descricao);
+            INSERT INTO {FTS_TABELA}(rowid, nome, descricao)
+            VALUES (new.id, new.nome, new.descricao);
+        END
+    """,
+}
+
+
+def busca_disponivel(connection):
+    return connection.vendor == 'sqlite'
+
+
+def criar_indice_busca(connection):
+    """Cria a tabela FTS5 e os triggers e reconstrói o índice a partir de api_produto."""
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_TABELA)
+        for sql in SQL_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABELA}({FTS_TABELA}, rank) VALUES ('rank', %s)", [PESOS_RANK])
+        cursor.execute(f"INSERT INTO {FTS_TABELA}({FTS_TABELA}) VALUES ('rebuild')")
+
+
+def remover_indice_busca(connection):
+    with connection.cursor() as cursor:
+        for nome in SQL_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {nome}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABELA}')
+
+
+def garantir_indice_busca(sender, using='default', **kwargs):
+    """Recria o índice se os triggers tiverem sumido (post_migrate).
+
+    Migrações que reconstroem api_produto no SQLite (ALTER TABLE emulado)
+    apagam os triggers junto com a tabela antiga.
+    """
+    apps = kwargs.get('apps')
+    if apps is not None:
+        try:
+            apps.get_model('api', 'ProdutoBusca')
+        except LookupError:
+            # Migração 0003 não aplicada (ou revertida)
+            return
+
+    connection = connections[using]
+    if not busca_disponivel(connection):
+        return
+    tabelas = connection.introspection.table_names()
+    if 'api_produto' not in tabelas:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_produto'"
+        )
+        existentes = {row[0] for row in cursor.fetchall()}
+    if FTS_TABELA not in tabelas or not set(SQL_TRIGGERS) <= existentes:
+        criar_indice_busca(connection)
+
+
+def montar_consulta(termo):
+    """Converte o texto digitado em consulta FTS5: cada palavra vira um prefixo.
+
+    "acucar ref" -> '"acucar"* "ref"*' (todas as palavras precisam aparecer).
+    Aspas e operadores do FTS5 digitados pelo usuário não chegam à consulta.
+    """
+    palavras = re.findall(r'\w+', termo)
+    return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+
+def buscar_produtos(queryset, termo):
+    """Filtra o queryset de Produto pelo termo e anota `relevancia` (menor = melhor)."""
+    if not busca_disponivel(connections[queryset.db]):
+        return queryset.filter(Q(nome__icontains=termo) | Q(descricao__icontains=termo))
+
+    consulta = montar_consulta(termo)
+    if not consulta:
+        return queryset.none()
+    return queryset.filter(busca__indice__match=consulta).annotate(relevancia=F('busca__rank'))
@@ -0,0 +1,35 @@
+"""Hash de muitas senhas em paralelo, num pool de processos.
+
+O hash de senha (PBKDF2) é CPU puro e segura o GIL, então threads não
+ajudam: cada processo do pool calcula uma fatia. Este módulo não importa
+modelos, para que os processos filhos precisem apenas das settings (herdadas
+via DJANGO_SETTINGS_MODULE), qualquer que seja o método de início do
+multiprocessing.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+
+# Senhas por tarefa enviada ao pool (~50 hashes amortizam o envio entre processos)
+TAMANHO_FATIA = 50
+
+
+def _hash_fatia(senhas):
+    return [make_password(senha) for senha in senhas]
+
+
+def hash_senhas(senhas, processos=None):
+    """Devolve os hashes de `senhas`, na mesma ordem.
+
+    `processos` é o tamanho do pool (padrão: número de CPUs). Com um
+    processo, ou poucas senhas, o hash é feito aqui mesmo.
+    """
+    senhas = list(senhas)
+    processos = processos or os.cpu_count() or 1
+    if processos == 1 or len(senhas) <= TAMANHO_FATIA:
+        return _hash_fatia(senhas)
+
+    fatias = [senhas[i:i + TAMANHO_FATIA] for i in range(0, len(senhas), TAMANHO_FATIA)]
+    with ProcessPoolExecutor(max_workers=min(processos, len(fatias))) as pool:
+        return [hash_ for fatia in pool.map(_hash_fatia, fatias) for hash_ in fatia]
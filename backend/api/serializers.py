@@ -1,10 +1,18 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
-from .models import Usuario, Produto, MovimentacaoEstoque, AlertaEstoque
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .models import Usuario, Produto, MovimentacaoEstoque, AlertaEstoque, PrevisaoEstoque
+from .alertas import TIPOS_AUTOMATICOS
+from .campos import CamposEsparsosMixin
+from .perfil import SerializacaoMedida
+from .revogacao import RefreshTokenRevogavel
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Limite de produtos em PATCH /api/produtos/lote/ com valores por produto
+PRODUTOS_LOTE_MAXIMO = 10000
+
 class UsuarioRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
     password2 = serializers.CharField(write_only=True, required=True)
@@ -20,7 +28,6 @@ class UsuarioRegistrationSerializer(serializers.ModelSerializer):
         }
     
     def validate(self, attrs):
-        logger.info(f"Validando dados: {attrs}")
         if attrs['password'] != attrs['password2']:
             logger.error("Senhas não coincidem")
             raise serializers.ValidationError({"password": "As senhas não coincidem."})
@@ -31,14 +38,18 @@ class UsuarioRegistrationSerializer(serializers.ModelSerializer):
         user = Usuario.objects.create_user(**validated_data)
         return user
 
-class UsuarioSerializer(serializers.ModelSerializer):
+class RefreshRevogavelSerializer(TokenRefreshSerializer):
+    """Refresh com rotação: o token usado é revogado (ver api/revogacao.py)"""
+    token_class = RefreshTokenRevogavel
+
+class UsuarioSerializer(SerializacaoMedida, serializers.ModelSerializer):
     class Meta:
         model = Usuario
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'empresa', 'data_criacao')
         read_only_fields = ('id', 'data_criacao')
 
 
-class ProdutoSerializer(serializers.ModelSerializer):
+class ProdutoSerializer(SerializacaoMedida, serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_estoque_display', read_only=True)
     precisa_reposicao = serializers.BooleanField(read_only=True)
     
@@ -46,8 +57,12 @@ class ProdutoSerializer(serializers.ModelSerializer):
         model = Produto
         fields = '__all__'
         read_only_fields = ('status_estoque', 'data_criacao', 'data_atualizacao', 'criado_por')
+    
+    def validate_codigo(self, value):
+        # Código em branco vira nulo para não colidir com a restrição de unicidade
+        return value or None
 
-class MovimentacaoEstoqueSerializer(serializers.ModelSerializer):
+class MovimentacaoEstoqueSerializer(CamposEsparsosMixin, SerializacaoMedida, serializers.ModelSerializer):
     produto_nome = serializers.CharField(source='produto.nome', read_only=True)
     usuario_nome = serializers.CharField(source='usuario.get_full_name', read_only=True)
     tipo_display = serializers.CharField(source='get_tipo_movimentacao_display', read_only=True)
@@ -56,8 +71,99 @@ class MovimentacaoEstoqueSerializer(serializers.ModelSerializer):
         model = MovimentacaoEstoque
         fields = '__all__'
         read_only_fields = ('data_movimentacao', 'usuario')
+        # Fontes calculadas, para a leitura por colunas (ver api/campos.py)
+        leituras = {
+            'usuario_nome': (
+                ('usuario__first_name', 'usuario__last_name'),
+                lambda linha: f"{linha['usuario__first_name']} {linha['usuario__last_name']}".strip(),
+            ),
+        }
+
+class MovimentacaoLoteSerializer(serializers.Serializer):
+    """Item do lote de movimentações; o produto é conferido em uma única consulta"""
+    produto = serializers.IntegerField()
+    tipo_movimentacao = serializers.ChoiceField(choices=MovimentacaoEstoque.TIPO_MOVIMENTACAO_CHOICES)
+    quantidade = serializers.IntegerField(min_value=1)
+    observacao = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+class _AlteracaoLoteSerializer(serializers.Serializer):
+    """Uma só operação: valor novo, soma ou ajuste percentual"""
+    def validate(self, attrs):
+        if len(attrs) != 1:
+            raise serializers.ValidationError('Informe exatamente uma operação: valor, somar ou percentual')
+        return attrs
+
+class AlteracaoPrecoSerializer(_AlteracaoLoteSerializer):
+    valor = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    somar = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    percentual = serializers.DecimalField(max_digits=7, decimal_places=2, min_value=-100, required=False)
+
+class AlteracaoEstoqueMinimoSerializer(_AlteracaoLoteSerializer):
+    valor = serializers.IntegerField(min_value=0, required=False)
+    somar = serializers.IntegerField(required=False)
+    percentual = serializers.DecimalField(max_digits=7, decimal_places=2, min_value=-100, required=False)
+
+class ProdutoLoteItemSerializer(serializers.Serializer):
+    """Valores próprios de um produto no PATCH em lote"""
+    id = serializers.IntegerField()
+    preco = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False, allow_null=True)
+    estoque_minimo = serializers.IntegerField(min_value=0, required=False)
+    ativo = serializers.BooleanField(required=False)
+    
+    def validate(self, attrs):
+        if len(attrs) == 1:
+            raise serializers.ValidationError('Informe ao menos um campo a alterar')
+        return attrs
+
+class ProdutoLoteFiltroSerializer(serializers.Serializer):
+    """Critérios do PATCH em lote; o catálogo inteiro só com "todos": true explícito"""
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
+    search = serializers.CharField(required=False)
+    status = serializers.ListField(
+        child=serializers.ChoiceField(choices=Produto.STATUS_ESTOQUE_CHOICES), required=False, allow_empty=False
+    )
+    ativo = serializers.BooleanField(required=False)
+    todos = serializers.BooleanField(required=False)
+    
+    def validate(self, attrs):
+        todos = attrs.pop('todos', False)
+        if todos and attrs:
+            raise serializers.ValidationError('Use "todos" sem outros critérios')
+        if not todos and not attrs:
+            raise serializers.ValidationError(
+                'Informe ao menos um critério (ids, search, status ou ativo), '
+                'ou "todos": true para alterar o catálogo inteiro'
+            )
+        return attrs
 
-class AlertaEstoqueSerializer(serializers.ModelSerializer):
+class ProdutoLoteAlteracoesSerializer(serializers.Serializer):
+    preco = AlteracaoPrecoSerializer(required=False)
+    estoque_minimo = AlteracaoEstoqueMinimoSerializer(required=False)
+    ativo = serializers.BooleanField(required=False)
+    
+    def validate(self, attrs):
+        if not attrs:
+            raise serializers.ValidationError('Informe ao menos um campo a alterar')
+        return attrs
+
+class ProdutoLoteSerializer(serializers.Serializer):
+    """PATCH em lote: valores por produto (produtos) ou as mesmas alterações para um filtro"""
+    produtos = ProdutoLoteItemSerializer(many=True, required=False, allow_empty=False, max_length=PRODUTOS_LOTE_MAXIMO)
+    filtro = ProdutoLoteFiltroSerializer(required=False)
+    alteracoes = ProdutoLoteAlteracoesSerializer(required=False)
+    
+    def validate(self, attrs):
+        if 'produtos' in attrs:
+            if 'filtro' in attrs or 'alteracoes' in attrs:
+                raise serializers.ValidationError('Use "produtos" ou "filtro" com "alteracoes", não os dois')
+            ids = [item['id'] for item in attrs['produtos']]
+            if len(ids) != len(set(ids)):
+                raise serializers.ValidationError({'produtos': 'Cada produto só pode aparecer uma vez'})
+        elif 'filtro' not in attrs or 'alteracoes' not in attrs:
+            raise serializers.ValidationError('Envie "produtos" ou "filtro" com "alteracoes"')
+        return attrs
+
+class AlertaEstoqueSerializer(CamposEsparsosMixin, SerializacaoMedida, serializers.ModelSerializer):
     produto_nome = serializers.CharField(source='produto.nome', read_only=True)
     produto_quantidade = serializers.IntegerField(source='produto.quantidade', read_only=True)
     produto_estoque_minimo = serializers.IntegerField(source='produto.estoque_minimo', read_only=True)
@@ -66,10 +172,38 @@ class AlertaEstoqueSerializer(serializers.ModelSerializer):
     class Meta:
         model = AlertaEstoque
         fields = '__all__'
+        # O validador gerado para a restrição condicional api_alerta_pendente_unico
+        # quebra em PATCH parcial (KeyError no campo da condição); ver validate()
+        validators = []
+    
+    def validate(self, attrs):
+        # Em PATCH parcial, os campos ausentes vêm do alerta atual
+        produto, tipo_alerta, resolvido = (
+            attrs.get(campo, getattr(self.instance, campo, None))
+            for campo in ('produto', 'tipo_alerta', 'resolvido')
+        )
+        if produto is None or resolvido or tipo_alerta not in TIPOS_AUTOMATICOS:
+            return attrs
+        pendentes = AlertaEstoque.objects.filter(produto=produto, tipo_alerta=tipo_alerta, resolvido=False)
+        if self.instance is not None:
+            pendentes = pendentes.exclude(pk=self.instance.pk)
+        if pendentes.exists():
+            raise serializers.ValidationError('Já existe um alerta pendente deste tipo para o produto.')
+        return attrs
+
+class PrevisaoEstoqueSerializer(SerializacaoMedida, serializers.ModelSerializer):
+    produto_nome = serializers.CharField(source='produto.nome', read_only=True)
+    produto_quantidade = serializers.IntegerField(source='produto.quantidade', read_only=True)
+    produto_estoque_minimo = serializers.IntegerField(source='produto.estoque_minimo', read_only=True)
+    
+    class Meta:
+        model = PrevisaoEstoque
+        fields = '__all__'
 
-class DashboardSerializer(serializers.Serializer):
+class DashboardSerializer(SerializacaoMedida, serializers.Serializer):
     total_produtos = serializers.IntegerField()
     produtos_em_estoque = serializers.IntegerField()
     produtos_criticos = serializers.IntegerField()
     alertas_nao_lidos = serializers.IntegerField()
+    valor_total_estoque = serializers.DecimalField(max_digits=20, decimal_places=2)
     ultimos_alertas = AlertaEstoqueSerializer(many=True)
\ No newline at end of file
@@ -0,0 +1,27 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .alertas import sincronizar_alertas
+from .authentication import usuarios_em_cache
+from .models import MovimentacaoEstoque, Produto, Usuario
+
+
+@receiver(post_save, sender=Produto)
+def produto_salvo(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sincronizar_alertas([instance.pk])
+
+
+@receiver(post_save, sender=MovimentacaoEstoque)
+def movimentacao_salva(sender, instance, created, raw=False, **kwargs):
+    # A movimentação altera o produto com update(), que não dispara post_save
+    if created and not raw:
+        sincronizar_alertas([instance.produto_id])
+
+
+@receiver([post_save, post_delete], sender=Usuario)
+def usuario_alterado(sender, instance, **kwargs):
+    # De novo após o commit: uma requisição concorrente pode ter lido a versão antiga
+    usuarios_em_cache.descartar(instance.pk)
+    transaction.on_commit(lambda: usuarios_em_cache.descartar(instance.pk))
@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..authentication import usuarios_em_cache
+from ..models import MovimentacaoEstoque, Produto, Usuario
+from ..revogacao import revogacoes
+from ..throttling import tentativas_por_email, tentativas_por_ip
+
+SENHA = 'senha-de-teste-123'
+
+
+class ApiTestCase(TestCase):
+    """Usuário autenticado por JWT e três produtos: em estoque (20), no mínimo (5) e abaixo dele (2)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user('estoquista', email='estoquista@example.com', password=SENHA)
+        cls.produtos = [
+            cls.criar_produto(f'P{indice:03d}', f'Produto {indice}', quantidade)
+            for indice, quantidade in enumerate([20, 5, 2])
+        ]
+
+    @classmethod
+    def criar_produto(cls, codigo, nome, quantidade, estoque_minimo=5, **campos):
+        return Produto.objects.create(
+            codigo=codigo, nome=nome, preco=campos.pop('preco', Decimal('10.00')), quantidade=quantidade,
+            estoque_minimo=estoque_minimo, criado_por=cls.usuario, **campos,
+        )
+
+    def setUp(self):
+        # Estado em memória do processo, que o rollback do TestCase não desfaz
+        usuarios_em_cache.limpar()
+        revogacoes.limpar()
+        tentativas_por_ip.limpar_tudo()
+        tentativas_por_email.limpar_tudo()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.usuario)}')
+
+    def movimentar(self, produto, tipo, quantidade):
+        return MovimentacaoEstoque.objects.create(
+            produto=produto, tipo_movimentacao=tipo, quantidade=quantidade, usuario=self.usuario
+        )
@@ -0,0 +1,123 @@
+from importlib import import_module
+from io import BytesIO
+from unittest import mock
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+
+from .. import alertas
+from ..events import broadcaster
+from ..importacao import TAMANHO_LOTE, importar_produtos, ler_planilha_produtos
+from ..models import AlertaEstoque, Produto
+from .base import ApiTestCase
+
+migracao_0014 = import_module('api.migrations.0014_alerta_pendente_unico')
+
+
+class AlertaTests(ApiTestCase):
+
+    def pendentes(self, produto):
+        return list(AlertaEstoque.objects.filter(produto=produto, resolvido=False).values_list('tipo_alerta', flat=True))
+
+    def test_cria_e_resolve_conforme_o_status(self):
+        produto = self.produtos[0]
+        self.assertEqual(self.pendentes(produto), [])
+
+        self.movimentar(produto, 'saida', 12)
+        self.assertEqual(self.pendentes(produto), ['atencao'])
+        self.movimentar(produto, 'saida', 8)
+        self.assertEqual(self.pendentes(produto), ['critico'])
+
+        self.movimentar(produto, 'entrada', 30)
+        self.assertEqual(self.pendentes(produto), [])
+        resolvidos = AlertaEstoque.objects.filter(produto=produto, resolvido=True)
+        self.assertEqual(resolvidos.count(), 2)
+        self.assertFalse(resolvidos.filter(lido=False).exists())
+
+    def test_produto_desativado_resolve(self):
+        produto = self.produtos[2]
+        produto.ativo = False
+        produto.save()
+        self.assertEqual(self.pendentes(produto), [])
+
+    def test_alertas_manuais_nao_sao_tocados(self):
+        produto = self.produtos[0]
+        for _ in range(2):
+            AlertaEstoque.objects.create(produto=produto, tipo_alerta='info', mensagem='Conferir lote')
+        alertas.sincronizar_alertas([produto.pk])
+        self.assertEqual(self.pendentes(produto), ['info', 'info'])
+
+    def test_banco_recusa_segundo_alerta_pendente(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AlertaEstoque.objects.create(produto=self.produtos[2], tipo_alerta='critico', mensagem='duplicado')
+
+    def test_api_recusa_segundo_alerta_pendente(self):
+        alerta = AlertaEstoque.objects.get(produto=self.produtos[2], resolvido=False)
+        edicao = self.client.patch(f'/api/alertas/{alerta.pk}/', {'mensagem': 'Repor hoje'}, format='json')
+        self.assertEqual(edicao.status_code, 200)
+
+        dados = {'produto': self.produtos[2].pk, 'tipo_alerta': 'critico', 'mensagem': 'duplicado'}
+        self.assertEqual(self.client.post('/api/alertas/', dados, format='json').status_code, 400)
+        self.assertEqual(self.client.post('/api/alertas/', {**dados, 'tipo_alerta': 'info'}, format='json').status_code, 201)
+
+    def test_alerta_criado_por_outra_transacao_nao_duplica(self):
+        produto = self.produtos[0]
+        Produto.objects.filter(pk=produto.pk).update(quantidade=0)
+        # Outra transação cria o alerta entre a leitura dos pendentes e o INSERT
+        outro = AlertaEstoque.objects.create(produto=produto, tipo_alerta='critico', mensagem='concorrente')
+        leitura_antiga = AlertaEstoque.objects.none()
+        with mock.patch.object(alertas, '_pendentes', side_effect=[leitura_antiga, alertas._pendentes([produto.pk])]):
+            alertas.sincronizar_alertas([produto.pk])
+
+        self.assertEqual(list(AlertaEstoque.objects.filter(produto=produto, resolvido=False)), [outro])
+
+    def test_migracao_cria_alertas_dos_produtos_ja_baixos(self):
+        AlertaEstoque.objects.all().delete()
+        migracao_0014.criar_alertas_existentes(apps, None)
+        self.assertEqual(self.pendentes(self.produtos[1]), ['critico'])
+        self.assertEqual(self.pendentes(self.produtos[2]), ['critico'])
+        self.assertEqual(self.pendentes(self.produtos[0]), [])
+
+
+class EventosEstoqueTests(ApiTestCase):
+
+    def publicados(self, requisicao):
+        with mock.patch.object(broadcaster, 'publicar') as publicar, self.captureOnCommitCallbacks(execute=True):
+            requisicao()
+        return [chamada.args for chamada in publicar.call_args_list]
+
+    def test_lote_publica_um_evento_de_estoque(self):
+        eventos = self.publicados(lambda: self.client.post('/api/movimentacoes/lote/', [
+            {'produto': self.produtos[0].pk, 'tipo_movimentacao': 'saida', 'quantidade': 20},
+            {'produto': self.produtos[1].pk, 'tipo_movimentacao': 'entrada', 'quantidade': 1},
+            {'produto': self.produtos[2].pk, 'tipo_movimentacao': 'entrada', 'quantidade': 1},
+        ], format='json'))
+
+        estoque = [dados for tipo, dados in eventos if tipo == 'estoque']
+        self.assertEqual(len(estoque), 1)
+        self.assertEqual(
+            sorted(item['produto'] for item in estoque[0]['produtos']), sorted(p.pk for p in self.produtos)
+        )
+        # Produto 0 esgotou; o 1 passou de crítico a baixo (alerta novo, o antigo resolvido)
+        self.assertEqual(
+            sorted(dados['produto'] for tipo, dados in eventos if tipo == 'alerta'),
+            [self.produtos[0].pk, self.produtos[1].pk],
+        )
+        self.assertEqual([tipo for tipo, _ in eventos].count('alerta_resolvido'), 1)
+
+    def test_patch_em_lote_publica_um_evento_de_estoque(self):
+        eventos = self.publicados(lambda: self.client.patch('/api/produtos/lote/', {
+            'filtro': {'ativo': True}, 'alteracoes': {'estoque_minimo': {'valor': 0}},
+        }, format='json'))
+
+        self.assertEqual([tipo for tipo, _ in eventos].count('estoque'), 1)
+        self.assertEqual([tipo for tipo, _ in eventos].count('alerta_resolvido'), 2)
+
+    def test_importacao_publica_um_evento_de_estoque(self):
+        linhas = ['codigo,nome,quantidade'] + [f'I{indice},Importado,{indice % 3}' for indice in range(TAMANHO_LOTE + 5)]
+        arquivo = BytesIO('\n'.join(linhas).encode())
+        eventos = self.publicados(lambda: importar_produtos(ler_planilha_produtos(arquivo, 'produtos.csv'), self.usuario))
+
+        estoque = [dados for tipo, dados in eventos if tipo == 'estoque']
+        self.assertEqual(len(estoque), 1)
+        self.assertEqual(len(estoque[0]['produtos']), TAMANHO_LOTE + 5)
@@ -0,0 +1,44 @@
+from ..models import Produto
+from .base import ApiTestCase
+
+
+class AlteracoesTests(ApiTestCase):
+
+    def sincronizar(self, desde='', **params):
+        resposta = self.client.get('/api/produtos/alteracoes/', {'desde': desde, **params})
+        self.assertEqual(resposta.status_code, 200)
+        return resposta.json()
+
+    def test_catalogo_inteiro_e_depois_so_o_que_mudou(self):
+        inicial = self.sincronizar()
+        self.assertEqual([produto['codigo'] for produto in inicial['produtos']], ['P000', 'P001', 'P002'])
+        self.assertEqual((inicial['removidos'], inicial['mais']), ([], False))
+
+        self.assertEqual(self.sincronizar(inicial['cursor'])['produtos'], [])
+
+        self.movimentar(self.produtos[1], 'entrada', 1)
+        novo = self.criar_produto('P100', 'Novo', 1)
+        delta = self.sincronizar(inicial['cursor'])
+        self.assertEqual([produto['id'] for produto in delta['produtos']], [self.produtos[1].pk, novo.pk])
+        self.assertEqual(delta['produtos'][0]['quantidade'], 6)
+
+    def test_exclusao_e_desativacao_viram_tombstones(self):
+        cursor = self.sincronizar()['cursor']
+        excluido = self.produtos[0].pk
+        Produto.objects.filter(pk=excluido).delete()
+        Produto.objects.filter(pk=self.produtos[2].pk).update(ativo=False)
+
+        delta = self.sincronizar(cursor)
+        self.assertEqual(delta['produtos'], [])
+        self.assertEqual(delta['removidos'], [excluido, self.produtos[2].pk])
+        # Um cliente novo também recebe o tombstone do excluído
+        self.assertIn(excluido, self.sincronizar()['removidos'])
+
+    def test_paginas_pelo_cursor(self):
+        primeira = self.sincronizar(page_size=2)
+        self.assertTrue(primeira['mais'])
+        segunda = self.sincronizar(primeira['cursor'], page_size=2)
+        self.assertFalse(segunda['mais'])
+        self.assertEqual(len(primeira['produtos']) + len(segunda['produtos']), 3)
+
+        self.assertEqual(self.client.get('/api/produtos/alteracoes/', {'desde': 'abc'}).status_code, 400)
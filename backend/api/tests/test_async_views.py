@@ -0,0 +1,50 @@
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..alertas import sincronizar_alertas
+from .base import ApiTestCase
+
+
+class AsyncViewsTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        sincronizar_alertas([produto.pk for produto in cls.produtos])
+
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient()
+        self.autorizacao = {'Authorization': f'Bearer {AccessToken.for_user(self.usuario)}'}
+
+    async def test_mesmo_corpo_das_views_do_drf(self):
+        for sincrona, assincrona in (
+            ('/api/produtos/', '/api/async/produtos/'),
+            ('/api/produtos/?search=produto', '/api/async/produtos/?search=produto'),
+            ('/api/alertas/', '/api/async/alertas/'),
+            ('/api/dashboard/', '/api/async/dashboard/'),
+        ):
+            with self.subTest(url=assincrona):
+                esperado = await self.async_client.get(sincrona, headers=self.autorizacao)
+                resposta = await self.async_client.get(assincrona, headers=self.autorizacao)
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(resposta.json(), esperado.json())
+
+    async def test_exige_token(self):
+        resposta = await self.async_client.get('/api/async/produtos/')
+        self.assertEqual(resposta.status_code, 401)
+        self.assertEqual(resposta['WWW-Authenticate'], 'Bearer realm="api"')
+        resposta = await self.async_client.get('/api/async/alertas/', headers={'Authorization': 'Bearer x'})
+        self.assertEqual(resposta.status_code, 401)
+
+    async def test_get_condicional_e_metodo(self):
+        for url in ('/api/async/produtos/', '/api/async/alertas/', '/api/async/dashboard/'):
+            with self.subTest(url=url):
+                resposta = await self.async_client.get(url, headers=self.autorizacao)
+                repetida = await self.async_client.get(
+                    url, headers={**self.autorizacao, 'If-None-Match': resposta['ETag']}
+                )
+                self.assertEqual(repetida.status_code, 304)
+                self.assertEqual(
+                    (await self.async_client.post(url, headers=self.autorizacao)).status_code, 405
+                )
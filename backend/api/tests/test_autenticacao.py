@@ -0,0 +1,46 @@
+from unittest import mock
+
+from ..authentication import CacheUsuarios, usuarios_em_cache
+from ..models import Usuario
+from .base import ApiTestCase
+
+
+class CacheUsuariosTests(ApiTestCase):
+
+    def test_segunda_requisicao_nao_consulta_o_usuario(self):
+        self.client.get('/api/dashboard/')
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(usuarios_em_cache.obter(self.usuario.pk))
+
+        usuario = usuarios_em_cache.obter(self.usuario.pk)
+        # Cada leitura monta uma instância nova
+        self.assertIsNot(usuario, usuarios_em_cache.obter(self.usuario.pk))
+        self.assertEqual(usuario.username, 'estoquista')
+
+    def test_usuario_salvo_sai_do_cache(self):
+        self.client.get('/api/dashboard/')
+        self.usuario.is_active = False
+        self.usuario.save()
+
+        self.assertIsNone(usuarios_em_cache.obter(self.usuario.pk))
+        self.assertEqual(self.client.get('/api/dashboard/').status_code, 401)
+
+    def test_update_vale_depois_do_ttl(self):
+        self.client.get('/api/dashboard/')
+        # update() não dispara o sinal: o cache continua com a versão antiga até expirar
+        Usuario.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/dashboard/').status_code, 200)
+
+        with mock.patch('api.authentication.time.monotonic', return_value=10**9):
+            self.assertEqual(self.client.get('/api/dashboard/').status_code, 401)
+
+    def test_lru_e_ttl(self):
+        cache = CacheUsuarios(tamanho=1, ttl=60)
+        outro = Usuario.objects.create_user('outro', email='outro@example.com', password='x')
+        cache.guardar(self.usuario)
+        cache.guardar(outro)
+        self.assertIsNone(cache.obter(self.usuario.pk))
+        self.assertEqual(cache.obter(outro.pk).pk, outro.pk)
+
+        with mock.patch('api.authentication.time.monotonic', return_value=10**9):
+            self.assertIsNone(cache.obter(outro.pk))
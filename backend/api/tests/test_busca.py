@@ -0,0 +1,52 @@
+from django.db import connection
+from django.test import TransactionTestCase
+
+from ..models import Produto, Usuario
+from ..search import SQL_TRIGGERS, buscar_produtos, garantir_indice_busca, montar_consulta, remover_indice_busca
+from .base import SENHA, ApiTestCase
+
+
+class BuscaTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.acucar = cls.criar_produto('A1', 'Açúcar refinado', 10, descricao='Pacote de 1kg')
+        cls.martelo = cls.criar_produto('M1', 'Martelo de unha', 10, descricao='Cabo de madeira, serve para açúcar')
+
+    def buscar(self, termo):
+        return [item['id'] for item in self.client.get('/api/produtos/', {'search': termo}).json()['results']]
+
+    def test_sem_acento_e_por_prefixo(self):
+        self.assertEqual(self.buscar('acucar ref'), [self.acucar.pk])
+        self.assertEqual(self.buscar('mart'), [self.martelo.pk])
+
+    def test_nome_pesa_mais_que_descricao(self):
+        self.assertEqual(self.buscar('açúcar'), [self.acucar.pk, self.martelo.pk])
+
+    def test_indice_acompanha_update_e_delete(self):
+        Produto.objects.filter(pk=self.martelo.pk).update(nome='Marreta')
+        self.assertEqual(self.buscar('marreta'), [self.martelo.pk])
+        self.assertEqual(self.buscar('martelo'), [])
+
+        self.acucar.delete()
+        self.assertEqual(self.buscar('refinado'), [])
+
+    def test_operadores_do_fts_nao_chegam_a_consulta(self):
+        self.assertEqual(montar_consulta('"martelo" OR NEAR(x'), '"martelo"* "OR"* "NEAR"* "x"*')
+        self.assertEqual(self.client.get('/api/produtos/', {'search': '*"()'}).json()['results'], [])
+
+
+class IndiceBuscaTests(TransactionTestCase):
+    """DDL da tabela virtual fora da transação do TestCase."""
+
+    def test_post_migrate_recria_os_triggers(self):
+        usuario = Usuario.objects.create_user('busca', email='busca@example.com', password=SENHA)
+        martelo = Produto.objects.create(codigo='M1', nome='Martelo', quantidade=1, criado_por=usuario)
+        remover_indice_busca(connection)
+        garantir_indice_busca(sender=None)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'api_produto'")
+            self.assertLessEqual(set(SQL_TRIGGERS), {linha[0] for linha in cursor.fetchall()})
+        self.assertEqual(list(buscar_produtos(Produto.objects.all(), 'mart')), [martelo])
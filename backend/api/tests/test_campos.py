@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ..alertas import sincronizar_alertas
+from ..models import AlertaEstoque, MovimentacaoEstoque
+from ..serializers import AlertaEstoqueSerializer, MovimentacaoEstoqueSerializer
+from .base import ApiTestCase
+
+
+class CamposTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        sincronizar_alertas([produto.pk for produto in cls.produtos])
+
+    def setUp(self):
+        super().setUp()
+        self.movimentar(self.produtos[0], 'saida', 3)
+        self.movimentar(self.produtos[1], 'entrada', 10)
+        self.client.get('/api/dashboard/')  # usuário em cache
+
+    def test_leitura_rapida_igual_ao_serializer(self):
+        for url, queryset, serializer in (
+            ('/api/movimentacoes/', MovimentacaoEstoque.objects.all(), MovimentacaoEstoqueSerializer),
+            ('/api/alertas/', AlertaEstoque.objects.filter(lido=False), AlertaEstoqueSerializer),
+        ):
+            with self.subTest(url=url):
+                resposta = self.client.get(url).json()
+                itens = resposta['results'] if isinstance(resposta, dict) else resposta
+                esperado = {item['id']: item for item in serializer(queryset, many=True).data}
+                self.assertEqual({item['id']: item for item in itens}, esperado)
+
+    def test_fields_recorta_e_evita_join(self):
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/api/movimentacoes/', {'fields': 'quantidade,tipo_movimentacao'})
+        itens = resposta.json()['results']
+        self.assertEqual([set(item) for item in itens], [{'quantidade', 'tipo_movimentacao'}] * 2)
+        self.assertEqual(len(consultas), 1)
+        self.assertNotIn('JOIN', consultas[0]['sql'])
+
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.client.get('/api/movimentacoes/', {'fields': 'produto_nome,usuario_nome'})
+        self.assertEqual(
+            sorted(item['produto_nome'] for item in resposta.json()['results']), ['Produto 0', 'Produto 1']
+        )
+        self.assertEqual(resposta.json()['results'][0]['usuario_nome'], self.usuario.get_full_name())
+        self.assertEqual(len(consultas), 1)
+
+    def test_fields_no_detalhe_e_campo_desconhecido(self):
+        alerta = AlertaEstoque.objects.filter(lido=False).first()
+        resposta = self.client.get(f'/api/alertas/{alerta.pk}/', {'fields': 'produto_nome,tipo_display'})
+        self.assertEqual(resposta.json(), {'produto_nome': alerta.produto.nome, 'tipo_display': 'Crítico'})
+
+        resposta = self.client.get('/api/alertas/', {'fields': 'id,senha'})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('senha', resposta.json()['fields'])
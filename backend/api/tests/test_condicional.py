@@ -0,0 +1,51 @@
+from ..alertas import sincronizar_alertas
+from ..models import AlertaEstoque, Produto
+from .base import ApiTestCase
+
+
+class CondicionalTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        sincronizar_alertas([produto.pk for produto in cls.produtos])
+
+    def test_produtos_304_ate_a_colecao_mudar(self):
+        resposta = self.client.get('/api/produtos/')
+        etag = resposta['ETag']
+        self.assertEqual(resposta['Cache-Control'], 'private, no-cache')
+
+        # Só a agregação do validador (o usuário já está em cache): nada é serializado
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/produtos/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Outra página ou outro filtro é outra versão
+        self.assertEqual(self.client.get('/api/produtos/?search=produto', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.client.patch(f'/api/produtos/{self.produtos[0].pk}/', {'nome': 'Renomeado'}, format='json')
+        resposta = self.client.get('/api/produtos/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        etag = resposta['ETag']
+
+        # A exclusão não muda a última data, mas muda o total
+        Produto.objects.filter(pk=self.produtos[2].pk).delete()
+        self.assertEqual(self.client.get('/api/produtos/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_alertas_304_ate_o_alerta_mudar(self):
+        resposta = self.client.get('/api/alertas/')
+        etag = resposta['ETag']
+
+        self.assertEqual(self.client.get('/api/alertas/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        alerta = AlertaEstoque.objects.get(produto=self.produtos[2])
+        edicao = self.client.patch(f'/api/alertas/{alerta.pk}/', {'mensagem': 'Repor hoje'}, format='json')
+        self.assertEqual(edicao.status_code, 200)
+        resposta = self.client.get('/api/alertas/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotEqual(resposta['ETag'], etag)
+
+    def test_dashboard_304_ate_o_estoque_mudar(self):
+        etag = self.client.get('/api/dashboard/')['ETag']
+        self.assertEqual(self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.movimentar(self.produtos[0], 'saida', 20)
+        self.assertEqual(self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
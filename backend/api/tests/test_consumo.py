@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from ..consumo import reconstruir_consumo, relatorio_consumo, saidas_por_dia
+from ..models import ConsumoDiario, MovimentacaoEstoque
+from .base import ApiTestCase
+
+
+class ConsumoTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.hoje = timezone.now().date()
+        self.ontem = self.hoje - timedelta(days=1)
+        self.movimentar(self.produtos[0], 'saida', 3)
+        self.movimentar(self.produtos[0], 'saida', 2)
+        self.movimentar(self.produtos[1], 'entrada', 7)
+        antiga = self.movimentar(self.produtos[0], 'entrada', 4)
+        MovimentacaoEstoque.objects.filter(pk=antiga.pk).update(
+            data_movimentacao=antiga.data_movimentacao - timedelta(days=1)
+        )
+
+    def linhas(self):
+        return sorted(ConsumoDiario.objects.values_list('produto_id', 'data', 'tipo_movimentacao', 'quantidade', 'movimentacoes'))
+
+    def test_triggers_mantem_uma_linha_por_produto_dia_e_tipo(self):
+        p0, p1 = self.produtos[0].pk, self.produtos[1].pk
+        self.assertEqual(self.linhas(), [
+            (p0, self.ontem, 'entrada', 4, 1),
+            (p0, self.hoje, 'saida', 5, 2),
+            (p1, self.hoje, 'entrada', 7, 1),
+        ])
+
+        MovimentacaoEstoque.objects.filter(produto=p0, quantidade=3).update(quantidade=1)
+        MovimentacaoEstoque.objects.filter(produto=p1).delete()
+        self.assertEqual(self.linhas(), [
+            (p0, self.ontem, 'entrada', 4, 1),
+            (p0, self.hoje, 'saida', 3, 2),
+        ])
+
+    def test_reconstrucao_igual_aos_triggers(self):
+        antes = self.linhas()
+        ConsumoDiario.objects.all().delete()
+        reconstruir_consumo(connection)
+        self.assertEqual(self.linhas(), antes)
+
+    def test_relatorio_igual_a_varredura_do_historico(self):
+        inicio = self.hoje - timedelta(days=40)
+        for agrupar in ('dia', 'semana', 'mes'):
+            for produto in (None, self.produtos[0].pk):
+                with self.subTest(agrupar=agrupar, produto=produto):
+                    self.assertEqual(
+                        relatorio_consumo(inicio, self.hoje, produto, agrupar),
+                        relatorio_consumo(inicio, self.hoje, produto, agrupar, historico=True),
+                    )
+        relatorio = relatorio_consumo(self.ontem, self.hoje)
+        self.assertEqual(relatorio['totais'], {'entrada': 11, 'saida': 5, 'movimentacoes': 4})
+        self.assertEqual(
+            sorted(saidas_por_dia(self.ontem, self.hoje)),
+            sorted(saidas_por_dia(self.ontem, self.hoje, historico=True)),
+        )
+
+    def test_endpoint(self):
+        resposta = self.client.get('/api/movimentacoes/consumo/', {'inicio': str(self.hoje), 'agrupar': 'dia'})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['serie'], [{'periodo': str(self.hoje), 'entrada': 7, 'saida': 5}])
+
+        for parametros in ({'agrupar': 'ano'}, {'produto': 'x'}, {'inicio': str(self.hoje), 'fim': str(self.ontem)}):
+            with self.subTest(parametros=parametros):
+                self.assertEqual(self.client.get('/api/movimentacoes/consumo/', parametros).status_code, 400)
@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+from ..models import Produto
+from .base import ApiTestCase
+
+
+class DashboardTests(ApiTestCase):
+
+    def test_contadores(self):
+        dados = self.client.get('/api/dashboard/').json()
+
+        self.assertEqual(dados['total_produtos'], 3)
+        self.assertEqual(dados['produtos_em_estoque'], 1)
+        self.assertEqual(dados['produtos_criticos'], 2)
+        self.assertEqual(Decimal(dados['valor_total_estoque']), Decimal('270.00'))
+        self.assertEqual(dados['alertas_nao_lidos'], len(dados['ultimos_alertas']))
+
+    def test_sem_cache_entre_requisicoes(self):
+        self.client.get('/api/dashboard/')
+        self.movimentar(self.produtos[2], 'saida', 2)
+        Produto.objects.filter(pk=self.produtos[0].pk).update(preco=Decimal('1.00'))
+
+        dados = self.client.get('/api/dashboard/').json()
+        self.assertEqual(Decimal(dados['valor_total_estoque']), Decimal('70.00'))
+        self.assertEqual(dados['produtos_criticos'], 2)
+
+    def test_304_enquanto_nada_muda(self):
+        etag = self.client.get('/api/dashboard/')['ETag']
+        self.assertEqual(self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.movimentar(self.produtos[0], 'saida', 1)
+        self.assertEqual(self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,55 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.utils import timezone
+
+from ..models import MovimentacaoEstoque, Produto, Usuario
+from .base import ApiTestCase
+
+
+class UsuariosDuplicadosTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        antes = timezone.now() - timedelta(days=30)
+        # O e-mail é único no banco: duplicados só diferem em maiúsculas e espaços
+        cls.antiga = Usuario.objects.create_user('antiga', email='Estoquista@Example.com ', password='x')
+        Usuario.objects.filter(pk=cls.antiga.pk).update(date_joined=antes)
+        cls.antiga.groups.add(Group.objects.create(name='compras'))
+        cls.produto = cls.criar_produto('P100', 'Da conta antiga', 3)
+        Produto.objects.filter(pk=cls.produto.pk).update(criado_por=cls.antiga, data_atualizacao=antes)
+        Usuario.objects.create_user('outro', email='outro@example.com', password='x')
+
+    def limpar(self, *argumentos):
+        saida = StringIO()
+        call_command('limpar_usuarios_duplicados', *argumentos, stdout=saida)
+        return saida.getvalue()
+
+    def test_simulacao_avisa_e_nao_altera(self):
+        saida = self.limpar('--simular')
+
+        self.assertIn('1 e-mail(s) duplicado(s), 1 conta(s) a remover', saida)
+        self.assertIn('api.Produto.criado_por: 1 (data_atualizacao passa a ser agora)', saida)
+        self.assertIn('feed de alterações', saida)
+        self.assertTrue(Usuario.objects.filter(pk=self.antiga.pk).exists())
+        self.assertEqual(Produto.objects.get(pk=self.produto.pk).criado_por_id, self.antiga.pk)
+
+    def test_reatribui_e_remove_a_conta_mais_antiga(self):
+        self.movimentar(self.produtos[0], 'saida', 1)
+        MovimentacaoEstoque.objects.update(usuario=self.antiga)
+        antes = timezone.now()
+
+        self.limpar()
+
+        self.assertFalse(Usuario.objects.filter(pk=self.antiga.pk).exists())
+        self.assertEqual(Usuario.objects.count(), 2)
+        produto = Produto.objects.get(pk=self.produto.pk)
+        self.assertEqual(produto.criado_por_id, self.usuario.pk)
+        self.assertGreaterEqual(produto.data_atualizacao, antes)
+        self.assertEqual(set(MovimentacaoEstoque.objects.values_list('usuario', flat=True)), {self.usuario.pk})
+        self.assertFalse(Usuario.groups.through.objects.filter(group__name='compras').exists())
+
+        self.assertIn('Nenhum usuário duplicado', self.limpar())
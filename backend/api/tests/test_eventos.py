@@ -0,0 +1,71 @@
+import asyncio
+
+from django.test import AsyncClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ..events import Broadcaster, TicketsEventos, tickets_eventos
+from .base import ApiTestCase
+
+
+class BroadcasterTests(ApiTestCase):
+
+    async def test_entrega_e_retomada_pelo_ultimo_id(self):
+        broadcaster = Broadcaster(tamanho_historico=2)
+        assinatura = broadcaster.assinar()
+        primeiro = broadcaster.publicar('estoque', {'produtos': []})
+        evento = await asyncio.wait_for(assinatura.fila.get(), 1)
+        self.assertEqual(evento, primeiro)
+        self.assertIn('event: estoque\n', evento.formatar())
+
+        segundo = broadcaster.publicar('alerta', {'id': 1})
+        retomada = broadcaster.assinar(primeiro.id)
+        self.assertEqual((retomada.pendentes, retomada.lacuna), ([segundo], False))
+
+        for indice in range(3):
+            broadcaster.publicar('alerta', {'id': indice})
+        # O evento pedido já saiu do histórico: o cliente precisa recarregar tudo
+        self.assertTrue(broadcaster.assinar(primeiro.id).lacuna)
+
+
+class TicketTests(ApiTestCase):
+
+    def test_uso_unico_e_validade(self):
+        tickets = TicketsEventos(validade=30)
+        ticket = tickets.emitir(self.usuario)
+        self.assertEqual(tickets.consumir(ticket), self.usuario.pk)
+        self.assertIsNone(tickets.consumir(ticket))
+        self.assertIsNone(tickets.consumir(ticket[:-2] + 'xx'))
+        self.assertIsNone(TicketsEventos(validade=-1).consumir(TicketsEventos().emitir(self.usuario)))
+
+
+class EventosViewTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient()
+        self.autorizacao = {'Authorization': f'Bearer {AccessToken.for_user(self.usuario)}'}
+
+    def test_indisponivel_no_wsgi(self):
+        self.assertEqual(self.client.post('/api/eventos/ticket/').status_code, 503)
+        ticket = tickets_eventos.emitir(self.usuario)
+        self.assertEqual(self.client.get('/api/eventos/', {'ticket': ticket}).status_code, 503)
+
+    async def test_fluxo_com_ticket_no_asgi(self):
+        resposta = await self.async_client.post('/api/eventos/ticket/', headers=self.autorizacao)
+        self.assertEqual(resposta.status_code, 200)
+        ticket = resposta.json()['ticket']
+
+        fluxo = await AsyncClient().get('/api/eventos/', {'ticket': ticket})
+        self.assertEqual(fluxo.status_code, 200)
+        self.assertEqual(fluxo['Content-Type'], 'text/event-stream')
+        conteudo = fluxo.streaming_content
+        self.assertEqual(await anext(conteudo), b'retry: 3000\n\n')
+        await conteudo.aclose()
+
+        # O mesmo ticket não abre uma segunda conexão
+        self.assertEqual((await AsyncClient().get('/api/eventos/', {'ticket': ticket})).status_code, 401)
+
+    async def test_access_token_na_url_nao_e_aceito(self):
+        token = str(AccessToken.for_user(self.usuario))
+        self.assertEqual((await AsyncClient().get('/api/eventos/', {'token': token})).status_code, 401)
+        self.assertEqual((await AsyncClient().post('/api/eventos/ticket/')).status_code, 401)
@@ -0,0 +1,74 @@
+import csv
+from io import BytesIO, StringIO
+from unittest import mock
+
+from openpyxl import load_workbook
+
+from .. import exportacao
+from ..exportacao import COLUNAS_PRODUTO, desfazer_escape, escapar_formula
+from ..models import Produto
+from .base import ApiTestCase
+
+
+def ler_csv(resposta):
+    texto = b''.join(resposta.streaming_content).decode('utf-8-sig')
+    return list(csv.reader(StringIO(texto)))
+
+
+def ler_xlsx(resposta):
+    planilha = load_workbook(BytesIO(b''.join(resposta.streaming_content)), read_only=True).active
+    return [list(linha) for linha in planilha.iter_rows(values_only=True)]
+
+
+class ExportacaoTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.perigoso = cls.criar_produto('X1', '=HYPERLINK("http://exemplo")', 20, descricao='@SUM(A1)')
+
+    def test_csv_de_produtos(self):
+        resposta = self.client.get('/api/produtos/exportar/')
+        self.assertEqual(resposta['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="produtos_', resposta['Content-Disposition'])
+
+        linhas = ler_csv(resposta)
+        self.assertEqual(linhas[0], [rotulo for _, rotulo in COLUNAS_PRODUTO])
+        self.assertEqual(len(linhas), 5)
+
+    def test_xlsx_de_produtos(self):
+        linhas = ler_xlsx(self.client.get('/api/produtos/exportar/', {'formato': 'xlsx', 'status': 'disponivel'}))
+        self.assertEqual(linhas[0][:3], ['ID', 'Código (SKU)', 'Nome'])
+        self.assertEqual(sorted(linha[1] for linha in linhas[1:]), ['P000', 'X1'])
+
+    def test_textos_nao_viram_formula(self):
+        for formato, ler in (('csv', ler_csv), ('xlsx', ler_xlsx)):
+            with self.subTest(formato=formato):
+                linhas = ler(self.client.get('/api/produtos/exportar/', {'formato': formato}))
+                linha = next(linha for linha in linhas if linha[1] == 'X1')
+                self.assertEqual(linha[2], '\'=HYPERLINK("http://exemplo")')
+                self.assertEqual(linha[3], "'@SUM(A1)")
+
+    def test_escape_reversivel(self):
+        for texto in ('=1+1', '+55 11', '-', '@x', '\tx', 'normal', "'texto", "'=ja escapado", '', None, 7):
+            with self.subTest(texto=texto):
+                self.assertEqual(desfazer_escape(escapar_formula(texto)), texto)
+
+    def test_xlsx_limitado(self):
+        with mock.patch.object(exportacao, 'MAXIMO_LINHAS_XLSX', 3):
+            resposta = self.client.get('/api/produtos/exportar/', {'formato': 'xlsx'})
+            self.assertEqual(resposta.status_code, 400)
+            self.assertIn('formato', resposta.json())
+            # O CSV não tem limite
+            self.assertEqual(self.client.get('/api/produtos/exportar/', {'formato': 'csv'}).status_code, 200)
+
+    def test_movimentacoes_filtradas(self):
+        self.movimentar(self.produtos[0], 'saida', 3)
+        self.movimentar(self.produtos[1], 'entrada', 4)
+
+        linhas = ler_csv(self.client.get('/api/movimentacoes/exportar/', {'tipo': 'entrada'}))
+        self.assertEqual(len(linhas), 2)
+        self.assertEqual(linhas[1][2:6], [str(self.produtos[1].pk), 'Produto 1', 'entrada', '4'])
+        self.assertEqual(self.client.get('/api/movimentacoes/exportar/', {'produto': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/produtos/exportar/', {'formato': 'pdf'}).status_code, 400)
+        self.assertEqual(Produto.objects.count(), 4)
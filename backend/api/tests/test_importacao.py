@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..importacao import OBSERVACAO_AJUSTE
+from ..models import MovimentacaoEstoque, Produto
+from .base import ApiTestCase
+
+
+class ImportacaoTests(ApiTestCase):
+
+    def importar(self, texto, nome='produtos.csv'):
+        arquivo = SimpleUploadedFile(nome, texto.encode('utf-8'), content_type='text/csv')
+        resposta = self.client.post('/api/produtos/importar/', {'arquivo': arquivo}, format='multipart')
+        self.assertEqual(resposta.status_code, 200, resposta.content)
+        return resposta.json()
+
+    def ajustes(self):
+        return MovimentacaoEstoque.objects.filter(observacao=OBSERVACAO_AJUSTE)
+
+    def test_planilha_parcial_nao_altera_outras_colunas(self):
+        Produto.objects.filter(pk=self.produtos[0].pk).update(descricao='Caixa com 12')
+
+        relatorio = self.importar('codigo,nome\nP000,Produto renomeado\n')
+
+        self.assertEqual(relatorio['atualizados'], 1)
+        produto = Produto.objects.get(pk=self.produtos[0].pk)
+        self.assertEqual(produto.nome, 'Produto renomeado')
+        self.assertEqual(
+            (produto.quantidade, produto.estoque_minimo, produto.preco, produto.descricao, produto.status_estoque),
+            (20, 5, Decimal('10.00'), 'Caixa com 12', 'disponivel'),
+        )
+        self.assertFalse(self.ajustes().exists())
+
+    def test_celula_em_branco_mantem_valor(self):
+        relatorio = self.importar(
+            'codigo,nome,quantidade,preco,descricao\n'
+            'P000,Produto 0,,12.50,\n'
+            'P001,Produto 1,0,,\n'
+        )
+
+        self.assertEqual(relatorio['erros'], [])
+        p0, p1 = Produto.objects.filter(pk__in=[self.produtos[0].pk, self.produtos[1].pk]).order_by('codigo')
+        self.assertEqual((p0.quantidade, p0.preco), (20, Decimal('12.50')))
+        self.assertEqual((p1.quantidade, p1.preco, p1.status_estoque), (0, Decimal('10.00'), 'esgotado'))
+        # Só a quantidade informada gera ajuste
+        self.assertEqual(
+            list(self.ajustes().values_list('produto_id', 'tipo_movimentacao', 'quantidade')),
+            [(self.produtos[1].pk, 'saida', 5)],
+        )
+
+    def test_produto_novo_recebe_padroes(self):
+        relatorio = self.importar('codigo,nome,preco\nN1,Novo,\nN2,Outro,3\n')
+
+        self.assertEqual(relatorio['criados'], 2)
+        novo = Produto.objects.get(codigo='N1')
+        self.assertEqual(
+            (novo.quantidade, novo.estoque_minimo, novo.preco, novo.descricao, novo.ativo),
+            (0, 0, Decimal('0.00'), None, True),
+        )
+        self.assertEqual(Produto.objects.get(codigo='N2').preco, Decimal('3'))
+        self.assertFalse(self.ajustes().exists())
+
+    def test_erros_por_linha(self):
+        relatorio = self.importar('codigo,nome,quantidade,ativo\nP000,Produto 0,-1,\n,Sem codigo,1,\nP001,Produto 1,,talvez\n')
+
+        self.assertEqual(relatorio['linhas'], 3)
+        self.assertEqual(
+            [(erro['linha'], sorted(erro['erros'])) for erro in relatorio['erros']],
+            [(2, ['quantidade']), (3, ['codigo']), (4, ['ativo'])],
+        )
+        self.assertEqual(Produto.objects.get(pk=self.produtos[0].pk).quantidade, 20)
+
+    def test_exportacao_reimportada_nao_muda_nada(self):
+        Produto.objects.filter(pk=self.produtos[2].pk).update(nome='=1+1', descricao='@nota')
+        antes = list(Produto.objects.order_by('codigo').values_list(
+            'codigo', 'nome', 'descricao', 'quantidade', 'estoque_minimo', 'preco', 'ativo', 'status_estoque',
+        ))
+
+        exportado = b''.join(self.client.get('/api/produtos/exportar/').streaming_content).decode('utf-8-sig')
+        relatorio = self.importar(exportado)
+
+        self.assertEqual((relatorio['atualizados'], relatorio['criados'], relatorio['erros']), (3, 0, []))
+        depois = list(Produto.objects.order_by('codigo').values_list(
+            'codigo', 'nome', 'descricao', 'quantidade', 'estoque_minimo', 'preco', 'ativo', 'status_estoque',
+        ))
+        self.assertEqual(depois, antes)
+        self.assertFalse(self.ajustes().exists())
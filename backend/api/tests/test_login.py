@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.contrib.auth.hashers import get_hasher
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from .. import auth_views
+from ..throttling import JanelaDeslizante
+from .base import SENHA, ApiTestCase
+
+EMAIL = 'estoquista@example.com'
+
+
+# Hasher rápido: os testes de limite fazem dezenas de tentativas
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def login(self, email=EMAIL, password=SENHA, **extra):
+        return self.client.post('/api/auth/login/', {'email': email, 'password': password}, format='json', **extra)
+
+    def contar_hashes(self):
+        hasher = type(get_hasher())
+        return mock.patch.object(hasher, 'encode', autospec=True, side_effect=hasher.encode)
+
+    def test_login_devolve_tokens(self):
+        resposta = self.login()
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(set(resposta.json()), {'refresh', 'access', 'user'})
+        self.assertEqual(self.login(password='errada').status_code, 401)
+
+    def test_corpo_invalido_da_400(self):
+        for corpo in ([EMAIL, SENHA], 7, {'email': [EMAIL], 'password': SENHA}, {'email': EMAIL}):
+            with self.subTest(corpo=corpo):
+                resposta = self.client.post('/api/auth/login/', corpo, format='json')
+                self.assertEqual(resposta.status_code, 400)
+
+    def test_um_hash_por_tentativa(self):
+        with mock.patch.object(auth_views, '_hash_ficticio', None):
+            for email in ('ninguem@example.com', 'ninguem@example.com', EMAIL):
+                with self.subTest(email=email), self.contar_hashes() as encode:
+                    self.login(email=email, password='errada')
+                    self.assertEqual(encode.call_count, 1)
+
+    def test_limite_por_email_antes_do_hash(self):
+        for _ in range(5):
+            self.assertEqual(self.login(password='errada').status_code, 401)
+        with self.contar_hashes() as encode:
+            resposta = self.login()
+        self.assertEqual(resposta.status_code, 429)
+        self.assertIn('Retry-After', resposta)
+        encode.assert_not_called()
+        # O limite é por e-mail (normalizado), não pelo resto das tentativas
+        self.assertEqual(self.login(email=' Estoquista@Example.com ').status_code, 429)
+        self.assertEqual(self.login(email='outro@example.com').status_code, 401)
+
+    def test_login_bem_sucedido_zera_o_contador(self):
+        for _ in range(4):
+            self.login(password='errada')
+        self.assertEqual(self.login().status_code, 200)
+        for _ in range(4):
+            self.assertEqual(self.login(password='errada').status_code, 401)
+
+    def test_limite_por_ip(self):
+        for indice in range(30):
+            self.login(email=f'usuario{indice}@example.com')
+        self.assertEqual(self.login().status_code, 429)
+        self.assertEqual(self.login(REMOTE_ADDR='10.0.0.2').status_code, 200)
+        # X-Forwarded-For não é confiável sem NUM_PROXIES
+        self.assertEqual(self.login(HTTP_X_FORWARDED_FOR='10.0.0.3').status_code, 429)
+
+
+class JanelaDeslizanteTests(ApiTestCase):
+
+    def test_janela_anterior_pesa_proporcionalmente(self):
+        janela = JanelaDeslizante(limite=4, janela=10)
+        for _ in range(4):
+            self.assertEqual(janela.registrar('a', agora=5), 0)
+        self.assertAlmostEqual(janela.registrar('a', agora=9), 1)
+
+        # Na metade da janela seguinte as 4 anteriores contam como 2
+        self.assertEqual(janela.registrar('a', agora=15), 0)
+        self.assertEqual(janela.registrar('a', agora=15), 0)
+        self.assertAlmostEqual(janela.registrar('a', agora=15), 2.5)
+        # Duas janelas depois, nada do passado conta
+        self.assertEqual(janela.registrar('a', agora=30), 0)
+
+    def test_descarta_as_chaves_menos_usadas(self):
+        janela = JanelaDeslizante(limite=1, janela=10, maximo_chaves=2)
+        for chave in ('a', 'b', 'c'):
+            janela.registrar(chave, agora=0)
+        self.assertEqual(janela.registrar('a', agora=1), 0)
+        self.assertNotEqual(janela.registrar('c', agora=1), 0)
@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from ..alertas import sincronizar_alertas
+from ..models import AlertaEstoque, Produto, calcular_status_estoque
+from .base import ApiTestCase
+
+
+class ProdutoLoteTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        sincronizar_alertas([produto.pk for produto in cls.produtos])
+
+    def lote(self, corpo):
+        return self.client.patch('/api/produtos/lote/', corpo, format='json')
+
+    def assertStatusRecalculado(self):
+        for produto in Produto.objects.all():
+            self.assertEqual(
+                produto.status_estoque, calcular_status_estoque(produto.quantidade, produto.estoque_minimo), produto.codigo
+            )
+
+    def test_lote_por_produto_recalcula_status(self):
+        resposta = self.lote({'produtos': [
+            {'id': self.produtos[0].pk, 'estoque_minimo': 30},
+            {'id': self.produtos[2].pk, 'estoque_minimo': 0},
+        ]})
+
+        self.assertEqual(resposta.json(), {'atualizados': 2})
+        self.assertStatusRecalculado()
+
+    def test_lote_por_filtro_recalcula_status(self):
+        estoque_baixo = Produto.objects.get(pk=self.produtos[2].pk).status_estoque
+        resposta = self.lote({
+            'filtro': {'status': [estoque_baixo]},
+            'alteracoes': {'estoque_minimo': {'valor': 0}},
+        })
+
+        self.assertEqual(resposta.json(), {'atualizados': 2})
+        self.assertStatusRecalculado()
+        # Os produtos saíram do filtro, mas os alertas deles foram resolvidos
+        self.assertFalse(AlertaEstoque.objects.filter(resolvido=False).exists())
+
+    def test_percentual_em_decimal(self):
+        self.lote({
+            'filtro': {'ids': [self.produtos[0].pk]},
+            'alteracoes': {'preco': {'percentual': '12.5'}, 'estoque_minimo': {'percentual': 50}},
+        })
+
+        produto = Produto.objects.get(pk=self.produtos[0].pk)
+        self.assertEqual(produto.preco, Decimal('11.25'))
+        self.assertEqual(produto.estoque_minimo, 8)
+        self.assertStatusRecalculado()
+
+    def test_filtro_vazio_nao_altera_o_catalogo(self):
+        alteracoes = {'preco': {'valor': '1.00'}}
+        for filtro in ({}, {'search': ''}, {'search': '   '}, {'todos': False}, {'todos': True, 'ativo': True}):
+            with self.subTest(filtro=filtro):
+                resposta = self.lote({'filtro': filtro, 'alteracoes': alteracoes})
+                self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(Produto.objects.filter(preco=Decimal('1.00')).exists())
+
+        # Termo sem nenhuma palavra: nada casa com a busca
+        self.assertEqual(self.lote({'filtro': {'search': '***'}, 'alteracoes': alteracoes}).json(), {'atualizados': 0})
+
+    def test_catalogo_inteiro_com_todos(self):
+        resposta = self.lote({'filtro': {'todos': True}, 'alteracoes': {'preco': {'somar': '1.50'}}})
+
+        self.assertEqual(resposta.json(), {'atualizados': 3})
+        self.assertEqual(set(Produto.objects.values_list('preco', flat=True)), {Decimal('11.50')})
@@ -0,0 +1,79 @@
+from ..models import EstoqueInsuficiente, MovimentacaoEstoque, Produto
+from .base import ApiTestCase
+
+
+class MovimentacaoTests(ApiTestCase):
+
+    def test_entrada_e_saida_atualizam_estoque_e_status(self):
+        produto = self.produtos[0]
+        self.movimentar(produto, 'saida', 18)
+        produto.refresh_from_db()
+        self.assertEqual((produto.quantidade, produto.status_estoque), (2, 'critico'))
+
+        self.movimentar(produto, 'entrada', 8)
+        produto.refresh_from_db()
+        self.assertEqual((produto.quantidade, produto.status_estoque), (10, 'baixo'))
+
+    def test_saida_concorrente_nao_deixa_estoque_negativo(self):
+        # As duas saídas leram quantidade=20; a segunda chega depois da primeira gravar
+        produto = Produto.objects.get(pk=self.produtos[0].pk)
+        self.movimentar(self.produtos[0], 'saida', 15)
+
+        with self.assertRaises(EstoqueInsuficiente):
+            self.movimentar(produto, 'saida', 15)
+
+        produto.refresh_from_db()
+        self.assertEqual(produto.quantidade, 5)
+        self.assertEqual(MovimentacaoEstoque.objects.filter(produto=produto).count(), 1)
+
+    def test_produto_inexistente_nao_e_estoque_insuficiente(self):
+        for tipo in ('entrada', 'saida'):
+            with self.subTest(tipo=tipo), self.assertRaises(Produto.DoesNotExist):
+                MovimentacaoEstoque.objects.create(
+                    produto_id=999999, tipo_movimentacao=tipo, quantidade=1, usuario=self.usuario
+                )
+        self.assertFalse(MovimentacaoEstoque.objects.exists())
+
+    def test_saida_maior_que_o_estoque_pela_api(self):
+        resposta = self.client.post('/api/movimentacoes/', {
+            'produto': self.produtos[2].pk, 'tipo_movimentacao': 'saida', 'quantidade': 3,
+        }, format='json')
+
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('quantidade', resposta.json())
+        self.assertEqual(Produto.objects.get(pk=self.produtos[2].pk).quantidade, 2)
+
+
+class MovimentacaoLoteTests(ApiTestCase):
+
+    def test_lote_soma_por_produto(self):
+        resposta = self.client.post('/api/movimentacoes/lote/', [
+            {'produto': self.produtos[0].pk, 'tipo_movimentacao': 'saida', 'quantidade': 15},
+            {'produto': self.produtos[0].pk, 'tipo_movimentacao': 'entrada', 'quantidade': 4},
+            {'produto': self.produtos[2].pk, 'tipo_movimentacao': 'entrada', 'quantidade': 10},
+        ], format='json')
+
+        self.assertEqual(resposta.status_code, 201)
+        self.assertEqual(len(resposta.json()), 3)
+        self.assertEqual(
+            dict(Produto.objects.filter(pk__in=[self.produtos[0].pk, self.produtos[2].pk]).values_list('pk', 'quantidade')),
+            {self.produtos[0].pk: 9, self.produtos[2].pk: 12},
+        )
+        self.assertEqual(MovimentacaoEstoque.objects.count(), 3)
+
+    def test_lote_informa_todas_as_linhas_com_erro(self):
+        resposta = self.client.post('/api/movimentacoes/lote/', [
+            {'produto': self.produtos[0].pk, 'tipo_movimentacao': 'saida', 'quantidade': 5},
+            {'produto': self.produtos[1].pk, 'tipo_movimentacao': 'saida', 'quantidade': 9},
+            {'produto': 999999, 'tipo_movimentacao': 'entrada', 'quantidade': 1},
+            {'produto': self.produtos[0].pk, 'tipo_movimentacao': 'saida', 'quantidade': 16},
+        ], format='json')
+
+        self.assertEqual(resposta.status_code, 400)
+        self.assertEqual([erro['indice'] for erro in resposta.json()['erros']], [1, 2, 3])
+        # Nada é gravado quando alguma linha falha
+        self.assertFalse(MovimentacaoEstoque.objects.exists())
+        self.assertEqual(Produto.objects.get(pk=self.produtos[0].pk).quantidade, 20)
+
+    def test_lote_vazio(self):
+        self.assertEqual(self.client.post('/api/movimentacoes/lote/', [], format='json').status_code, 400)
@@ -0,0 +1,53 @@
+import base64
+import json
+
+from .base import ApiTestCase
+
+
+def cursor(valor, pk):
+    return base64.urlsafe_b64encode(json.dumps([valor, pk]).encode()).decode()
+
+
+class PaginacaoTests(ApiTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Nomes repetidos: o id desempata a ordem
+        for indice in range(7):
+            cls.criar_produto(f'R{indice}', 'Repetido', 10)
+
+    def paginas(self, url, **params):
+        nomes, resposta = [], self.client.get(url, params)
+        while True:
+            dados = resposta.json()
+            nomes += [(item['nome'], item['id']) for item in dados['results']]
+            if not dados['next']:
+                return nomes
+            resposta = self.client.get(dados['next'])
+
+    def test_percorre_todas_as_paginas_sem_repetir(self):
+        nomes = self.paginas('/api/produtos/', page_size=3)
+        self.assertEqual(len(nomes), 10)
+        self.assertEqual(nomes, sorted(nomes))
+
+    def test_contagem_so_quando_pedida(self):
+        self.assertNotIn('count', self.client.get('/api/produtos/').json())
+        dados = self.client.get('/api/produtos/', {'count': 'true', 'page_size': 2}).json()
+        self.assertEqual(dados['count'], 10)
+        self.assertNotIn('count=', dados['next'])
+
+    def test_cursor_invalido(self):
+        for valor in ('nao-e-base64', cursor(None, 1), cursor('Produto', 'x'), base64.urlsafe_b64encode(b'[1]').decode()):
+            with self.subTest(cursor=valor):
+                self.assertEqual(self.client.get('/api/produtos/', {'cursor': valor}).status_code, 404)
+
+    def test_movimentacoes_mais_recentes_primeiro(self):
+        for quantidade in (1, 2, 3):
+            self.movimentar(self.produtos[0], 'entrada', quantidade)
+        primeira = self.client.get('/api/movimentacoes/', {'page_size': 2}).json()
+        segunda = self.client.get(primeira['next']).json()
+
+        quantidades = [item['quantidade'] for item in primeira['results'] + segunda['results']]
+        self.assertEqual(quantidades, [3, 2, 1])
+        self.assertIsNone(segunda['next'])
@@ -0,0 +1,55 @@
+from ..models import AlertaEstoque
+from ..perfil import OrcamentoConsultasMixin, estatisticas
+from .base import ApiTestCase
+
+
+class OrcamentoConsultasTests(OrcamentoConsultasMixin, ApiTestCase):
+    """Listagens e detalhes dentro do orcamento_consultas declarado em cada view."""
+
+    def test_produtos(self):
+        self.assertDentroDoOrcamento(self.client.get('/api/produtos/'))
+        self.assertDentroDoOrcamento(self.client.get(f'/api/produtos/{self.produtos[0].pk}/'))
+
+    def test_movimentacoes(self):
+        movimentacao = self.movimentar(self.produtos[0], 'saida', 1)
+        self.assertDentroDoOrcamento(self.client.get('/api/movimentacoes/'))
+        self.assertDentroDoOrcamento(self.client.get(f'/api/movimentacoes/{movimentacao.pk}/'))
+
+    def test_movimentacoes_uma_consulta_por_pagina(self):
+        # Produto e usuário vêm no mesmo SELECT: cada página é uma consulta, com o usuário já no cache
+        for produto in self.produtos:
+            for _ in range(5):
+                self.movimentar(produto, 'entrada', 1)
+        self.client.get('/api/movimentacoes/')
+
+        with self.assertNumQueries(1):
+            primeira = self.client.get('/api/movimentacoes/', {'page_size': 5})
+        with self.assertNumQueries(1):
+            segunda = self.client.get(primeira.json()['next'])
+        with self.assertNumQueries(1):
+            self.client.get('/api/movimentacoes/', {'page_size': 500})
+        self.assertEqual(len(segunda.json()['results']), 5)
+
+    def test_alertas(self):
+        alerta = AlertaEstoque.objects.get(produto=self.produtos[2])
+        self.assertDentroDoOrcamento(self.client.get('/api/alertas/'))
+        self.assertDentroDoOrcamento(self.client.get(f'/api/alertas/{alerta.pk}/'))
+
+    def test_dashboard(self):
+        self.assertDentroDoOrcamento(self.client.get('/api/dashboard/'))
+
+    def test_acima_do_orcamento_falha(self):
+        resposta = self.client.get('/api/produtos/')
+        with self.assertRaises(AssertionError):
+            self.assertDentroDoOrcamento(resposta, orcamento=0)
+
+
+class PerfilMiddlewareTests(ApiTestCase):
+
+    def test_server_timing_e_histograma(self):
+        estatisticas.limpar()
+        resposta = self.client.get('/api/produtos/')
+
+        self.assertIn(f'desc="{resposta.perfil.consultas} consultas"', resposta['Server-Timing'])
+        self.assertIn('total;dur=', resposta['Server-Timing'])
+        self.assertEqual(estatisticas.resumo()['GET produto-list']['requisicoes'], 1)
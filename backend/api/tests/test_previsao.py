@@ -0,0 +1,63 @@
+import math
+import statistics
+
+import numpy as np
+
+from ..models import PrevisaoEstoque
+from ..previsao import atualizar_previsoes, prever
+from .base import ApiTestCase
+
+
+class PrevisaoTests(ApiTestCase):
+
+    def test_prever_igual_ao_calculo_por_produto(self):
+        saidas = np.array([
+            [0, 2, 4, 0, 6],
+            [0, 0, 3, 3, 3],
+            [0, 0, 0, 0, 0],
+        ], dtype=np.float64)
+        quantidades = np.array([20, 9, 5])
+        # O segundo produto só existe a partir do terceiro dia
+        primeiro_dia = np.array([0, 2, 0])
+
+        resultado = prever(quantidades, primeiro_dia, saidas, prazo=4, nivel_servico=0.95)
+
+        z = statistics.NormalDist().inv_cdf(0.95)
+        for indice, dias in enumerate([[0, 2, 4, 0, 6], [3, 3, 3], [0, 0, 0, 0, 0]]):
+            with self.subTest(produto=indice):
+                media, desvio = statistics.mean(dias), statistics.stdev(dias)
+                self.assertAlmostEqual(resultado['consumo_medio'][indice], media)
+                self.assertAlmostEqual(resultado['desvio_consumo'][indice], desvio)
+                self.assertEqual(resultado['dias_analisados'][indice], len(dias))
+                self.assertEqual(
+                    resultado['estoque_minimo_sugerido'][indice], math.ceil(media * 4 + z * desvio * 2)
+                )
+        self.assertAlmostEqual(resultado['dias_ate_esgotar'][0], 20 / 2.4)
+        self.assertAlmostEqual(resultado['dias_ate_esgotar'][1], 3)
+        self.assertTrue(math.isnan(resultado['dias_ate_esgotar'][2]))
+
+    def test_atualizar_e_listar(self):
+        self.movimentar(self.produtos[0], 'saida', 5)
+        self.movimentar(self.produtos[1], 'saida', 4)
+        inativo = self.criar_produto('P999', 'Inativo', 3, ativo=False)
+
+        self.assertEqual(atualizar_previsoes(), 3)
+        self.assertFalse(PrevisaoEstoque.objects.filter(produto=inativo).exists())
+        previsao = PrevisaoEstoque.objects.get(produto=self.produtos[0])
+        # Produto cadastrado hoje: só o dia de hoje entra na conta
+        self.assertEqual((previsao.dias_analisados, previsao.consumo_medio, previsao.dias_ate_esgotar), (1, 5, 3))
+
+        resposta = self.client.get('/api/produtos/previsoes/')
+        self.assertEqual(
+            [item['produto'] for item in resposta.json()],
+            [self.produtos[1].pk, self.produtos[0].pk, self.produtos[2].pk],
+        )
+        resposta = self.client.get('/api/produtos/previsoes/', {'ate': 2})
+        self.assertEqual([item['produto'] for item in resposta.json()], [self.produtos[1].pk])
+        self.assertEqual(self.client.get('/api/produtos/previsoes/', {'ate': 'x'}).status_code, 400)
+
+        # Produto desativado depois perde a previsão no próximo cálculo
+        self.produtos[2].ativo = False
+        self.produtos[2].save()
+        self.assertEqual(atualizar_previsoes(), 2)
+        self.assertFalse(PrevisaoEstoque.objects.filter(produto=self.produtos[2]).exists())
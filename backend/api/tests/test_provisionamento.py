@@ -0,0 +1,72 @@
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from ..models import Usuario
+from ..planilhas import PlanilhaInvalida, normalizar
+from ..provisionamento import ler_planilha_usuarios, provisionar_usuarios
+from .base import ApiTestCase
+
+SENHA_FORTE = 'Cadastro-em-massa-2026'
+
+
+def planilha(*linhas):
+    return BytesIO('\n'.join(linhas).encode('utf-8'))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProvisionamentoTests(ApiTestCase):
+
+    def provisionar(self, *linhas, **opcoes):
+        return provisionar_usuarios(ler_planilha_usuarios(planilha(*linhas), 'usuarios.csv'), processos=1, **opcoes)
+
+    def test_cria_e_reporta_as_linhas_invalidas(self):
+        relatorio = self.provisionar(
+            'E-mail,Senha,Nome,Sobrenome,Empresa',
+            f'ana@example.com,{SENHA_FORTE},Ana,Souza,',
+            f'estoquista@example.com,{SENHA_FORTE},Outra,Pessoa,',
+            'bia@example.com,123,Bia,Lima,',
+            f'ana@example.com,{SENHA_FORTE},Ana,Repetida,',
+            f'nao-e-email,{SENHA_FORTE},Sem,Email,',
+            empresa='ACME',
+        )
+
+        self.assertEqual((relatorio['linhas'], relatorio['criados']), (5, 1))
+        self.assertEqual(
+            [(erro['linha'], sorted(erro['erros'])) for erro in relatorio['erros']],
+            [(3, ['email']), (4, ['password']), (5, ['email', 'username']), (6, ['email'])],
+        )
+        ana = Usuario.objects.get(email='ana@example.com')
+        self.assertEqual((ana.username, ana.empresa), ('ana@example.com', 'ACME'))
+        self.assertTrue(ana.check_password(SENHA_FORTE))
+
+    def test_email_ja_cadastrado(self):
+        relatorio = self.provisionar('email,password,nome,sobrenome', f'estoquista@example.com,{SENHA_FORTE},A,B')
+        self.assertEqual(relatorio['erros'][0]['erros'], {'email': 'E-mail já cadastrado'})
+
+    def test_limite_de_linhas_antes_de_qualquer_hash(self):
+        linhas = [f'u{indice}@example.com,{SENHA_FORTE},U,{indice}' for indice in range(3)]
+        with self.assertRaises(PlanilhaInvalida):
+            self.provisionar('email,password,nome,sobrenome', *linhas, maximo_linhas=2)
+        self.assertEqual(Usuario.objects.count(), 1)
+
+    def test_colunas_normalizadas(self):
+        self.assertEqual(normalizar('  Código (SKU) '), 'codigo (sku)')
+        with self.assertRaisesMessage(PlanilhaInvalida, '"email" e "password"'):
+            ler_planilha_usuarios(planilha('nome,sobrenome'), 'usuarios.csv')
+        with self.assertRaises(PlanilhaInvalida):
+            ler_planilha_usuarios(planilha('email,senha'), 'usuarios.txt')
+
+    def test_endpoint_so_para_admins(self):
+        arquivo = SimpleUploadedFile('usuarios.csv', f'email,senha,nome,sobrenome\nc@example.com,{SENHA_FORTE},C,D'.encode())
+        self.assertEqual(self.client.post('/api/usuarios/lote/', {'arquivo': arquivo}).status_code, 403)
+
+        admin = Usuario.objects.create_superuser('admin', email='admin@example.com', password=SENHA_FORTE)
+        client = APIClient()
+        client.force_authenticate(admin)
+        arquivo.seek(0)
+        resposta = client.post('/api/usuarios/lote/', {'arquivo': arquivo})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['criados'], 1)
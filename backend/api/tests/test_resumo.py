@@ -0,0 +1,52 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+
+from ..models import AlertaEstoque, Produto, ResumoEstoque
+from ..resumo import RESUMO_ID, calcular_resumo, reconstruir_resumo
+from .base import ApiTestCase
+
+
+class ResumoTests(ApiTestCase):
+
+    def assertSemDivergencia(self):
+        self.assertEqual(reconstruir_resumo(gravar=False), {})
+
+    def test_triggers_acompanham_todas_as_escritas(self):
+        self.movimentar(self.produtos[0], 'saida', 20)
+        Produto.objects.filter(pk=self.produtos[1].pk).update(preco=Decimal('3.33'), quantidade=7)
+        Produto.objects.bulk_create([
+            Produto(codigo=f'B{indice}', nome='Lote', quantidade=indice, preco=Decimal('0.10'), criado_por=self.usuario)
+            for indice in range(3)
+        ])
+        Produto.objects.filter(pk=self.produtos[2].pk).update(ativo=False)
+        AlertaEstoque.objects.filter(lido=False).update(lido=True)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM api_alertaestoque')
+            cursor.execute("UPDATE api_produto SET status_estoque = 'baixo' WHERE codigo = 'B2'")
+        self.assertSemDivergencia()
+
+    def test_linha_recriada_pelo_proximo_trigger(self):
+        ResumoEstoque.objects.all().delete()
+        Produto.objects.filter(pk=self.produtos[0].pk).delete()
+
+        resumo = ResumoEstoque.objects.get(pk=RESUMO_ID)
+        # A linha nova só tem a diferença da escrita; reconstruir_resumo acerta o resto
+        self.assertEqual(resumo.produtos_disponiveis, -1)
+        reconstruir_resumo()
+        self.assertSemDivergencia()
+
+    def test_divergencia_corrigida_pelo_comando(self):
+        ResumoEstoque.objects.filter(pk=RESUMO_ID).update(produtos_esgotado=99, alertas_nao_lidos=-3)
+
+        saida = StringIO()
+        call_command('reconstruir_resumo', '--verificar', stdout=saida)
+        self.assertIn('produtos_esgotado: gravado=99', saida.getvalue())
+        self.assertEqual(ResumoEstoque.objects.get(pk=RESUMO_ID).produtos_esgotado, 99)
+
+        call_command('reconstruir_resumo', stdout=StringIO())
+        self.assertSemDivergencia()
+        resumo = ResumoEstoque.objects.get(pk=RESUMO_ID)
+        self.assertEqual(resumo.alertas_nao_lidos, calcular_resumo()['alertas_nao_lidos'])
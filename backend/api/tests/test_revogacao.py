@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import TokenRevogado
+from ..revogacao import revogacoes
+from .base import SENHA, ApiTestCase
+
+
+class RevogacaoTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        login = self.client.post(
+            '/api/auth/login/', {'email': 'estoquista@example.com', 'password': SENHA}, format='json'
+        )
+        self.refresh = login.json()['refresh']
+
+    def renovar(self, refresh):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': refresh}, format='json')
+
+    def test_refresh_rotacionado_nao_pode_ser_reusado(self):
+        rotacao = self.renovar(self.refresh)
+        self.assertEqual(rotacao.status_code, 200)
+        self.assertNotEqual(rotacao.json()['refresh'], self.refresh)
+
+        self.assertEqual(self.renovar(self.refresh).status_code, 401)
+        # O token novo continua válido
+        self.assertEqual(self.renovar(rotacao.json()['refresh']).status_code, 200)
+
+    def test_outro_processo_carrega_as_revogacoes_do_banco(self):
+        self.renovar(self.refresh)
+        # Um processo novo começa com o conjunto em memória vazio
+        revogacoes.limpar()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.renovar(self.refresh).status_code, 401)
+
+    def test_poda_apaga_so_os_expirados(self):
+        agora = timezone.now()
+        TokenRevogado.objects.create(jti='expirado', expira_em=agora - timedelta(minutes=1))
+        TokenRevogado.objects.create(jti='valido', expira_em=agora + timedelta(days=1))
+
+        self.assertEqual(revogacoes.podar(), 1)
+        self.assertEqual(list(TokenRevogado.objects.values_list('jti', flat=True)), ['valido'])
+        self.assertTrue(revogacoes.revogado('valido'))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase
+
+
+class PerfilSqliteTests(SimpleTestCase):
+    databases = {'default'}
+
+    def pragma(self, nome):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {nome}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_em_cada_conexao(self):
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('temp_store'), 2)  # MEMORY
+        self.assertEqual(self.pragma('cache_size'), -20000)
+
+    def test_transacoes_imediatas_e_sem_conexoes_persistentes(self):
+        banco = settings.DATABASES['default']
+        self.assertEqual(banco['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertEqual(banco['CONN_MAX_AGE'], 0)
+        # WAL só em produção: o banco versionado não muda de journal_mode
+        if not settings.PRODUCAO:
+            self.assertNotIn('journal_mode', banco['OPTIONS']['init_command'])
@@ -0,0 +1,126 @@
+"""Limite de tentativas de login por IP e por e-mail, em memória.
+
+O contador usa janela deslizante aproximada: guarda só as contagens da
+janela fixa atual e da anterior, e a anterior pesa proporcionalmente ao
+quanto dela ainda cai dentro da janela deslizante. São dois inteiros por
+chave, e a verificação roda antes de qualquer hash de senha, então um
+ataque de força bruta é recusado a custo quase zero.
+
+O estado é local ao processo: com N workers o limite efetivo é até N vezes
+maior, o que ainda corta a taxa de tentativas por ordens de grandeza.
+"""
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
+
+# Chaves guardadas por contador; as menos usadas são descartadas primeiro
+MAXIMO_CHAVES = 100_000
+
+
+class JanelaDeslizante:
+    """Contador de eventos por chave: no máximo `limite` a cada `janela` segundos."""
+
+    def __init__(self, limite, janela, maximo_chaves=MAXIMO_CHAVES):
+        self.limite = limite
+        self.janela = janela
+        self.maximo_chaves = maximo_chaves
+        self._lock = threading.Lock()
+        self._contagens = OrderedDict()
+
+    def registrar(self, chave, agora=None):
+        """Conta um evento; devolve 0 se permitido ou os segundos de espera se recusado.
+
+        Eventos recusados não entram na conta.
+        """
+        agora = time.monotonic() if agora is None else agora
+        numero, fracao = divmod(agora / self.janela, 1)
+        with self._lock:
+            janela, atual, anterior = self._contagens.get(chave, (numero, 0, 0))
+            if numero == janela + 1:
+                atual, anterior = 0, atual
+            elif numero > janela + 1:
+                atual, anterior = 0, 0
+
+            estimativa = anterior * (1 - fracao) + atual
+            if estimativa + 1 > self.limite:
+                self._contagens[chave] = (numero, atual, anterior)
+                return self._espera(atual, anterior, fracao)
+
+            self._contagens[chave] = (numero, atual + 1, anterior)
+            self._contagens.move_to_end(chave)
+            while len(self._contagens) > self.maximo_chaves:
+                self._contagens.popitem(last=False)
+        return 0
+
+    def _espera(self, atual, anterior, fracao):
+        if atual + 1 > self.limite or not anterior:
+            # Só a virada da janela libera; depois a atual passa a ser a anterior
+            return (1 - fracao) * self.janela
+        # Tempo até o peso da janela anterior cair o suficiente
+        fracao_livre = 1 - (self.limite - 1 - atual) / anterior
+        return max(fracao_livre - fracao, 0) * self.janela
+
+    def limpar(self, chave):
+        with self._lock:
+            self._contagens.pop(chave, None)
+
+    def limpar_tudo(self):
+        with self._lock:
+            self._contagens.clear()
+
+
+tentativas_por_ip = JanelaDeslizante(limite=30, janela=60)
+tentativas_por_email = JanelaDeslizante(limite=5, janela=300)
+
+
+class LoginBloqueado(Throttled):
+    default_detail = 'Muitas tentativas de login.'
+    extra_detail_singular = 'Tente novamente em {wait} segundo.'
+    extra_detail_plural = 'Tente novamente em {wait} segundos.'
+
+
+class _LimiteLogin(BaseThrottle, ABC):
+    contador = None
+
+    @abstractmethod
+    def chave(self, request):
+        """Chave contada no `contador`, ou None para não limitar a requisição."""
+
+    def allow_request(self, request, view):
+        chave = self.chave(request)
+        self.espera = self.contador.registrar(chave) if chave else 0
+        return not self.espera
+
+    def wait(self):
+        return math.ceil(self.espera)
+
+
+class LimiteLoginIP(_LimiteLogin):
+    """Por IP do cliente.
+
+    get_ident() só confia no X-Forwarded-For com REST_FRAMEWORK['NUM_PROXIES']
+    (ver saep/settings.py); sem isso, cada tentativa poderia mandar um
+    cabeçalho diferente e escapar do limite.
+    """
+    contador = tentativas_por_ip
+
+    def chave(self, request):
+        return self.get_ident(request)
+
+
+class LimiteLoginEmail(_LimiteLogin):
+    """Por e-mail tentado (normalizado); o login bem-sucedido zera o contador."""
+    contador = tentativas_por_email
+
+    def chave(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        return chave_email(email) if isinstance(email, str) and email else None
+
+
+def chave_email(email):
+    return email.strip().lower()
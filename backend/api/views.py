@@ -2,15 +2,84 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
-from .models import Usuario, Produto, MovimentacaoEstoque, AlertaEstoque
+from rest_framework.exceptions import NotFound, ValidationError
+from datetime import datetime, time, timedelta
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import Usuario, Produto, MovimentacaoEstoque, AlertaEstoque, EstoqueInsuficiente, PrevisaoEstoque
 from .serializers import *
+from .estoque import (
+    LoteInvalido, atualizar_produtos_em_lote, atualizar_produtos_por_filtro, produtos_do_filtro,
+    registrar_movimentacoes_em_lote,
+)
+from .pagination import MovimentacaoPagination, ProdutoPagination
+from .search import buscar_produtos
+from .dashboard import obter_dashboard
+from .alteracoes import alteracoes_disponiveis, listar_alteracoes
+from .consumo import AGRUPAMENTOS, relatorio_consumo
+from .campos import CamposMixin
+from .condicional import CondicionalMixin, com_validadores, nao_modificado, validador_conteudo
+from .exportacao import COLUNAS_MOVIMENTACAO, COLUNAS_PRODUTO, FORMATOS, exportar
+from .importacao import importar_produtos, ler_planilha_produtos
+from .planilhas import PlanilhaInvalida
+from rest_framework.parsers import MultiPartParser
 
-class ProdutoViewSet(viewsets.ModelViewSet):
+# Limite de linhas aceitas em POST /api/movimentacoes/lote/
+LOTE_MAXIMO = 5000
+# Alterações por página em GET /api/produtos/alteracoes/
+ALTERACOES_POR_PAGINA = 500
+ALTERACOES_MAXIMO = 2000
+# Período de GET /api/movimentacoes/consumo/ sem ?inicio=
+CONSUMO_DIAS_PADRAO = 30
+# Itens por resposta em GET /api/produtos/previsoes/
+PREVISOES_POR_PAGINA = 100
+PREVISOES_MAXIMO = 1000
+
+def _formato_exportacao(request):
+    formato = request.query_params.get('formato', 'csv')
+    if formato not in FORMATOS:
+        raise ValidationError({'formato': f"Use um dos formatos: {', '.join(FORMATOS)}"})
+    return formato
+
+def _data_parametro(request, parametro):
+    """Data (AAAA-MM-DD) do parâmetro da query string, ou None se ausente"""
+    valor = request.query_params.get(parametro)
+    if not valor:
+        return None
+    try:
+        data = parse_date(valor)
+    except ValueError:
+        data = None
+    if data is None:
+        raise ValidationError({parametro: 'Data inválida, use AAAA-MM-DD'})
+    return data
+
+def _filtrar_periodo(queryset, campo, request):
+    """Aplica ?inicio= e ?fim= (AAAA-MM-DD, inclusivos) como intervalo no campo de data/hora"""
+    for parametro in ('inicio', 'fim'):
+        data = _data_parametro(request, parametro)
+        if data is None:
+            continue
+        # Limites em data/hora (e não __date) para o índice do campo ser usado
+        if parametro == 'inicio':
+            limite = timezone.make_aware(datetime.combine(data, time.min))
+            queryset = queryset.filter(**{f'{campo}__gte': limite})
+        else:
+            limite = timezone.make_aware(datetime.combine(data + timedelta(days=1), time.min))
+            queryset = queryset.filter(**{f'{campo}__lt': limite})
+    return queryset
+
+class ProdutoViewSet(CondicionalMixin, viewsets.ModelViewSet):
     # queryset = Produto.objects.filter(ativo=True)
     queryset = Produto.objects.all() 
     serializer_class = ProdutoSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ProdutoPagination
+    campos_validador = ('data_atualizacao',)
+    # Consultas SQL por requisição, contando a do usuário quando ele não está no cache (ver api/perfil.py)
+    orcamento_consultas = {'list': 3, 'retrieve': 2}
     
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -18,28 +87,202 @@ class ProdutoViewSet(viewsets.ModelViewSet):
         # Filtro por busca
         search_term = self.request.query_params.get('search', None)
         if search_term:
-            queryset = queryset.filter(
-                Q(nome__icontains=search_term) |
-                Q(descricao__icontains=search_term)
-            )
+            # Índice FTS5; os resultados vêm ordenados por relevância
+            queryset = buscar_produtos(queryset, search_term)
         
         return queryset.select_related('criado_por')
     
     def perform_create(self, serializer):
         serializer.save(criado_por=self.request.user)
+    
+    @action(detail=False, methods=['patch'])
+    def lote(self, request):
+        """Altera preço, estoque mínimo e ativo de muitos produtos em poucos UPDATEs (ver api/estoque.py).
+
+        {"produtos": [{"id": 1, "preco": "9.90"}, ...]} aplica valores próprios a
+        cada produto; {"filtro": {...}, "alteracoes": {"estoque_minimo":
+        {"percentual": 10}}} aplica as mesmas alterações a todos os do filtro.
+        O filtro precisa de ao menos um critério; o catálogo inteiro só com
+        {"filtro": {"todos": true}}.
+        """
+        serializer = ProdutoLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        dados = serializer.validated_data
+        
+        if 'produtos' in dados:
+            try:
+                atualizados = atualizar_produtos_em_lote(dados['produtos'])
+            except LoteInvalido as e:
+                return Response({'erros': e.erros}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            atualizados = atualizar_produtos_por_filtro(produtos_do_filtro(dados['filtro']), dados['alteracoes'])
+        
+        return Response({'atualizados': atualizados})
+    
+    @action(detail=False, methods=['get'])
+    def alteracoes(self, request):
+        """Sincronização incremental: o que mudou depois de ?desde=<cursor>.
+
+        Sem ?desde devolve o catálogo inteiro. O cliente guarda o "cursor" da
+        resposta e continua pedindo enquanto "mais" for verdadeiro.
+        """
+        if not alteracoes_disponiveis(connection):
+            return Response(
+                {'detail': 'Feed de alterações indisponível neste banco'},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+        
+        desde = request.query_params.get('desde') or '0'
+        if not desde.isdigit():
+            raise ValidationError({'desde': 'Cursor inválido'})
+        try:
+            limite = int(request.query_params.get('page_size', ALTERACOES_POR_PAGINA))
+        except ValueError:
+            limite = ALTERACOES_POR_PAGINA
+        limite = max(1, min(limite, ALTERACOES_MAXIMO))
+        
+        produtos, removidos, cursor, mais = listar_alteracoes(int(desde), limite)
+        return Response({
+            'cursor': str(cursor),
+            'mais': mais,
+            'produtos': ProdutoSerializer(produtos, many=True).data,
+            'removidos': removidos,
+        })
+    
+    @action(detail=False, methods=['get'])
+    def previsoes(self, request):
+        """Previsões de consumo (comando prever_estoque), quem esgota primeiro vem antes.
+
+        ?ate=<dias> restringe aos produtos que esgotam dentro desse prazo.
+        """
+        queryset = PrevisaoEstoque.objects.filter(produto__ativo=True).select_related('produto').order_by(
+            F('dias_ate_esgotar').asc(nulls_last=True), 'produto_id'
+        )
+        ate = request.query_params.get('ate')
+        if ate:
+            try:
+                queryset = queryset.filter(dias_ate_esgotar__lte=float(ate))
+            except ValueError:
+                raise ValidationError({'ate': 'Informe um número de dias'})
+        try:
+            limite = int(request.query_params.get('page_size', PREVISOES_POR_PAGINA))
+        except ValueError:
+            limite = PREVISOES_POR_PAGINA
+        limite = max(1, min(limite, PREVISOES_MAXIMO))
+        
+        return Response(PrevisaoEstoqueSerializer(queryset[:limite], many=True).data)
+    
+    @action(detail=True, methods=['get'])
+    def previsao(self, request, pk=None):
+        produto = self.get_object()
+        previsao = PrevisaoEstoque.objects.filter(produto=produto).select_related('produto').first()
+        if previsao is None:
+            return Response({'detail': 'Previsão ainda não calculada'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(PrevisaoEstoqueSerializer(previsao).data)
+    
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        formato = _formato_exportacao(request)
+        queryset = _filtrar_periodo(Produto.objects.order_by('nome', 'id'), 'data_criacao', request)
+        
+        status_estoque = request.query_params.get('status')
+        if status_estoque:
+            queryset = queryset.filter(status_estoque__in=status_estoque.split(','))
+        ativo = request.query_params.get('ativo')
+        if ativo in ('true', 'false'):
+            queryset = queryset.filter(ativo=(ativo == 'true'))
+        
+        return exportar(queryset, COLUNAS_PRODUTO, 'produtos', formato)
+    
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def importar(self, request):
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is None:
+            return Response({'arquivo': 'Envie a planilha no campo "arquivo"'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            relatorio = importar_produtos(ler_planilha_produtos(arquivo, arquivo.name), request.user)
+        except PlanilhaInvalida as e:
+            return Response({'arquivo': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(relatorio)
 
-class MovimentacaoEstoqueViewSet(viewsets.ModelViewSet):
+class MovimentacaoEstoqueViewSet(CamposMixin, viewsets.ModelViewSet):
     queryset = MovimentacaoEstoque.objects.all()
     serializer_class = MovimentacaoEstoqueSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = MovimentacaoPagination
+    orcamento_consultas = {'list': 3, 'retrieve': 2}
     
     def perform_create(self, serializer):
-        serializer.save(usuario=self.request.user)
+        try:
+            serializer.save(usuario=self.request.user)
+        except EstoqueInsuficiente as e:
+            raise ValidationError({'quantidade': str(e)})
+        except Produto.DoesNotExist as e:
+            raise NotFound(str(e))
+    
+    @action(detail=False, methods=['post'])
+    def lote(self, request):
+        serializer = MovimentacaoLoteSerializer(
+            data=request.data, many=True, allow_empty=False, max_length=LOTE_MAXIMO
+        )
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            movimentacoes = registrar_movimentacoes_em_lote(serializer.validated_data, request.user)
+        except LoteInvalido as e:
+            return Response({'erros': e.erros}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(
+            MovimentacaoEstoqueSerializer(movimentacoes, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+    
+    @action(detail=False, methods=['get'])
+    def exportar(self, request):
+        formato = _formato_exportacao(request)
+        queryset = _filtrar_periodo(
+            MovimentacaoEstoque.objects.order_by('data_movimentacao', 'id'),
+            'data_movimentacao',
+            request
+        )
+        
+        tipo = request.query_params.get('tipo')
+        if tipo:
+            queryset = queryset.filter(tipo_movimentacao=tipo)
+        produto = request.query_params.get('produto')
+        if produto:
+            if not produto.isdigit():
+                raise ValidationError({'produto': 'Informe o id do produto'})
+            queryset = queryset.filter(produto_id=produto)
+        
+        return exportar(queryset, COLUNAS_MOVIMENTACAO, 'movimentacoes', formato)
+    
+    @action(detail=False, methods=['get'])
+    def consumo(self, request):
+        """Entradas e saídas num período: totais e série por dia, semana ou mês (ver api/consumo.py)"""
+        fim = _data_parametro(request, 'fim') or timezone.now().date()
+        inicio = _data_parametro(request, 'inicio') or fim - timedelta(days=CONSUMO_DIAS_PADRAO - 1)
+        if inicio > fim:
+            raise ValidationError({'inicio': 'A data inicial deve ser anterior ou igual à final'})
+        
+        agrupar = request.query_params.get('agrupar', 'dia')
+        if agrupar not in AGRUPAMENTOS:
+            raise ValidationError({'agrupar': f"Use um dos valores: {', '.join(AGRUPAMENTOS)}"})
+        produto = request.query_params.get('produto')
+        if produto and not produto.isdigit():
+            raise ValidationError({'produto': 'Informe o id do produto'})
+        
+        return Response(relatorio_consumo(inicio, fim, int(produto) if produto else None, agrupar))
 
-class AlertaEstoqueViewSet(viewsets.ModelViewSet):
+class AlertaEstoqueViewSet(CondicionalMixin, CamposMixin, viewsets.ModelViewSet):
     queryset = AlertaEstoque.objects.filter(lido=False)
     serializer_class = AlertaEstoqueSerializer
     permission_classes = [IsAuthenticated]
+    # A resposta inclui a quantidade e o mínimo do produto
+    campos_validador = ('data_criacao', 'data_atualizacao', 'produto__data_atualizacao')
+    orcamento_consultas = {'list': 3, 'retrieve': 2}
     
     @action(detail=True, methods=['post'])
     def marcar_como_lido(self, request, pk=None):
@@ -50,27 +293,12 @@ class AlertaEstoqueViewSet(viewsets.ModelViewSet):
 
 class DashboardViewSet(viewsets.ViewSet):
     permission_classes = [IsAuthenticated]
+    orcamento_consultas = {'list': 3}
     
     def list(self, request):
-        total_produtos = Produto.objects.filter(ativo=True).count()
-        produtos_em_estoque = Produto.objects.filter(
-            ativo=True, 
-            status_estoque='disponivel'
-        ).count()
-        produtos_criticos = Produto.objects.filter(
-            ativo=True
-        ).filter(
-            Q(status_estoque='critico') | Q(status_estoque='esgotado')
-        ).count()
-        alertas_nao_lidos = AlertaEstoque.objects.filter(lido=False).count()
-        ultimos_alertas = AlertaEstoque.objects.filter(lido=False).order_by('-data_criacao')[:5]
-        
-        serializer = DashboardSerializer({
-            'total_produtos': total_produtos,
-            'produtos_em_estoque': produtos_em_estoque,
-            'produtos_criticos': produtos_criticos,
-            'alertas_nao_lidos': alertas_nao_lidos,
-            'ultimos_alertas': ultimos_alertas
-        })
-        
-        return Response(serializer.data)
\ No newline at end of file
+        # Sem cache: contadores lidos da linha do ResumoEstoque (mantida por triggers)
+        # e os últimos alertas numa consulta com o produto já carregado (ver api/dashboard.py)
+        dados = obter_dashboard()
+        etag, last_modified = validador_conteudo(dados)
+        response = nao_modificado(request, etag, last_modified) or Response(dados)
+        return com_validadores(response, etag, last_modified)
@@ -3,6 +3,9 @@ ASGI config for saep project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The streaming endpoint /api/eventos/ (Server-Sent Events) needs this
+application, e.g. ``uvicorn saep.asgi:application``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
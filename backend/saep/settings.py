@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -50,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro, para o tempo total incluir os demais (ver api/perfil.py)
+    'api.perfil.PerfilMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -79,10 +82,47 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'saep.wsgi.application'
 
+# Produção: ative com SAEP_PRODUCAO=1 no ambiente do servidor
+PRODUCAO = os.environ.get('SAEP_PRODUCAO') == '1'
+
+# Executados em cada conexão nova; só valem para a conexão, não alteram o arquivo
+SQLITE_PRAGMAS = [
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=134217728',
+    'PRAGMA cache_size=-20000',
+]
+# WAL deixa leituras e a escrita rodarem juntas; com synchronous=NORMAL o
+# commit não espera fsync (só o checkpoint). O journal_mode fica gravado no
+# arquivo do banco, por isso só é ligado em produção: nem o banco de
+# desenvolvimento versionado (backend/db.sqlite3) nem um simples manage.py
+# check o alteram.
+SQLITE_PRAGMAS_PRODUCAO = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+]
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Sem conexões persistentes (CONN_MAX_AGE = 0), de propósito:
+        # - no ASGI (saep/asgi.py) o ORM roda nas threads do sync_to_async e a
+        #   conexão é por thread; o Django só fecha conexões velhas nos sinais
+        #   de início/fim de requisição, então conexões persistentes ficariam
+        #   abertas em threads que talvez nunca mais atendam uma requisição;
+        # - abrir uma conexão SQLite é abrir um arquivo local, sem rede nem
+        #   autenticação: o ganho de reaproveitá-la é só o init_command abaixo
+        #   (alguns PRAGMAs), que custa microssegundos.
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'init_command': ';'.join(SQLITE_PRAGMAS + (SQLITE_PRAGMAS_PRODUCAO if PRODUCAO else [])),
+            # A transação já começa com a trava de escrita: sem isso, uma
+            # transação que lê e depois escreve falha com "database is locked"
+            # na hora do UPDATE, sem esperar o busy_timeout. Leituras não usam
+            # atomic() (ver api/alteracoes.py), para não disputar essa trava.
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -107,8 +147,12 @@ AUTHENTICATION_BACKENDS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
+    # Proxies reversos na frente da aplicação. Com 0 o IP do limite de login é
+    # o REMOTE_ADDR e o X-Forwarded-For, que o cliente controla, é ignorado;
+    # atrás de um proxy, use o número de proxies confiáveis.
+    'NUM_PROXIES': 0,
 }
 
 from datetime import timedelta
@@ -130,6 +174,8 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Sem o app token_blacklist: a revogação após a rotação fica em api/revogacao.py
+    'TOKEN_REFRESH_SERIALIZER': 'api.serializers.RefreshRevogavelSerializer',
 }
 
 
@@ -5,7 +5,10 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 from api.views import *
 from api.auth_views import LoginView
-from api.registration_views import RegisterView
+from api.registration_views import ProvisionamentoView, RegisterView
+from api.event_views import TicketEventosView, eventos
+from api.perfil_views import PerfilView
+from api import async_views
 
 router = DefaultRouter()
 router.register(r'produtos', ProdutoViewSet)
@@ -18,5 +21,13 @@ urlpatterns = [
     path('api/auth/login/', LoginView.as_view(), name='login'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/register/', RegisterView.as_view(), name='register'),
+    path('api/usuarios/lote/', ProvisionamentoView.as_view(), name='usuarios-lote'),
+    path('api/eventos/', eventos, name='eventos'),
+    path('api/eventos/ticket/', TicketEventosView.as_view(), name='eventos-ticket'),
+    path('api/perfil/', PerfilView.as_view(), name='perfil'),
+    # Leituras assíncronas (ORM assíncrono), para servir pelo saep/asgi.py
+    path('api/async/produtos/', async_views.produtos, name='produtos-async'),
+    path('api/async/alertas/', async_views.alertas, name='alertas-async'),
+    path('api/async/dashboard/', async_views.dashboard, name='dashboard-async'),
     path('api/', include(router.urls)),
 ]
\ No newline at end of file
@@ -35,6 +35,14 @@ function Home() {
     };
 
     fetchData();
+
+    // Recarrega só quando o servidor avisa que algum alerta mudou; a assinatura
+    // só abre se o servidor oferecer eventos (ASGI), senão fica no carregamento acima
+    const unsubscribe = apiService.subscribeToEvents(
+      () => fetchData(),
+      ['alerta', 'alerta_resolvido', 'reset']
+    );
+    return unsubscribe;
   }, []);
 
   const handleManageProducts = () => {
@@ -24,6 +24,9 @@ function ProductManagement() {
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [editingProduct, setEditingProduct] = useState(null);
   const [loading, setLoading] = useState(true);
+  // Cursor da próxima página da listagem; nulo quando não há mais produtos
+  const [nextPage, setNextPage] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [formData, setFormData] = useState({
     nome: "",
     descricao: "",
@@ -32,20 +35,21 @@ function ProductManagement() {
     preco: 0,
   });
 
+  const fixPrices = (productsData) =>
+    productsData.map((product) => ({
+      ...product,
+      preco:
+        typeof product.preco === "string"
+          ? parseFloat(product.preco)
+          : product.preco,
+    }));
+
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const productsData = await apiService.getProducts();
-
-        const productsWithFixedPrices = productsData.map((product) => ({
-          ...product,
-          preco:
-            typeof product.preco === "string"
-              ? parseFloat(product.preco)
-              : product.preco,
-        }));
-
-        setProducts(productsWithFixedPrices);
+        const { results, next } = await apiService.getProducts();
+        setProducts(fixPrices(results));
+        setNextPage(next);
       } catch (error) {
         console.error("Erro ao carregar dados:", error);
         toast.error("Erro ao carregar produtos");
@@ -57,6 +61,20 @@ function ProductManagement() {
     fetchData();
   }, []);
 
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const { results, next } = await apiService.getProducts("", nextPage);
+      setProducts((current) => [...current, ...fixPrices(results)]);
+      setNextPage(next);
+    } catch (error) {
+      console.error("Erro ao carregar mais produtos:", error);
+      toast.error("Erro ao carregar mais produtos");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const filteredProducts = products.filter(
     (product) =>
       product.nome.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -371,7 +389,20 @@ function ProductManagement() {
             </table>
           </div>
 
-          {filteredProducts.length === 0 && (
+          {nextPage && (
+            <div className="text-center pt-6">
+              <button
+                onClick={handleLoadMore}
+                disabled={loadingMore}
+                className="inline-flex items-center space-x-2 py-2 px-4 border border-gray-300 rounded-lg text-sm font-medium text-gray-700 bg-white hover:bg-gray-50 disabled:opacity-50 transition-colors"
+              >
+                {loadingMore && <Loader2 className="h-4 w-4 animate-spin" />}
+                <span>Carregar mais</span>
+              </button>
+            </div>
+          )}
+
+          {filteredProducts.length === 0 && !nextPage && (
             <div className="text-center py-8">
               <Package className="mx-auto h-12 w-12 text-gray-400" />
               <h3 className="mt-2 text-sm font-medium text-gray-900">
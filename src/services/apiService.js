@@ -41,6 +41,10 @@ class ApiService {
             if (refreshResponse.ok) {
               const data = await refreshResponse.json();
               localStorage.setItem('access_token', data.access);
+              // Com a rotação o refresh usado é revogado: guarda o novo
+              if (data.refresh) {
+                localStorage.setItem('refresh_token', data.refresh);
+              }
 
               defaultOptions.headers.Authorization = `Bearer ${data.access}`;
 
@@ -126,12 +130,28 @@ class ApiService {
   // ================================================
   // PRODUTOS
   // ================================================
-  async getProducts(searchTerm = '') {
+  // Uma página por chamada: passe o "next" da resposta anterior para buscar a seguinte
+  async getProducts(searchTerm = '', next = null) {
+    if (next) return this.requestPage(next);
+
     const params = new URLSearchParams();
     if (searchTerm) params.append('search', searchTerm);
 
     const queryString = params.toString();
-    return this.request(`/api/produtos/${queryString ? '?' + queryString : ''}`);
+    return this.requestPage(`/api/produtos/${queryString ? '?' + queryString : ''}`);
+  }
+
+  // As listagens são paginadas por cursor: devolve { results, next }, com next nulo na última página
+  async requestPage(endpoint) {
+    const page = await this.request(endpoint.replace(this.baseURL, ''));
+    return { results: page.results || [], next: page.next || null };
+  }
+
+  // Sincronização incremental: produtos alterados e ids removidos desde o cursor.
+  // Guarde o "cursor" da resposta e repita enquanto "mais" for true.
+  async getProductChanges(cursor = '') {
+    const query = cursor ? `?desde=${encodeURIComponent(cursor)}` : '';
+    return this.request(`/api/produtos/alteracoes/${query}`);
   }
 
   async getProduct(id) {
@@ -161,8 +181,8 @@ class ApiService {
   // ================================================
   // MOVIMENTAÇÕES DE ESTOQUE
   // ================================================
-  async getStockMovements() {
-    return this.request('/api/movimentacoes/');
+  async getStockMovements(next = null) {
+    return this.requestPage(next || '/api/movimentacoes/');
   }
 
   async createStockMovement(movementData) {
@@ -191,6 +211,65 @@ class ApiService {
   async getDashboardData() {
     return this.request('/api/dashboard/');
   }
+
+  // ================================================
+  // EVENTOS EM TEMPO REAL (Server-Sent Events)
+  // ================================================
+  // O EventSource não envia headers: o fluxo abre com um ticket de uso único,
+  // pedido com o access token. Sem o servidor ASGI o ticket vem com 503 e nada
+  // é assinado. Em caso de queda reconecta com um ticket novo, retomando do
+  // último evento recebido.
+  subscribeToEvents(onEvent, types = ['alerta', 'alerta_resolvido', 'estoque', 'reset']) {
+    let source = null;
+    let closed = false;
+    let lastEventId = null;
+    let retryTimer = null;
+
+    const connect = async () => {
+      const ticket = await this.getEventsTicket();
+      if (!ticket || closed) return;
+
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) params.append('last_event_id', lastEventId);
+      source = new EventSource(`${this.baseURL}/api/eventos/?${params}`);
+      types.forEach((type) => {
+        source.addEventListener(type, (event) => {
+          lastEventId = event.lastEventId || lastEventId;
+          onEvent(type, JSON.parse(event.data));
+        });
+      });
+      // A reconexão automática do navegador reusaria o ticket, que já foi consumido
+      source.onerror = () => {
+        source.close();
+        if (!closed) retryTimer = setTimeout(connect, 3000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (source) source.close();
+    };
+  }
+
+  // Ticket para /api/eventos/, ou null quando o servidor não oferece eventos (503)
+  async getEventsTicket() {
+    const token = localStorage.getItem('access_token');
+    if (!token) return null;
+
+    try {
+      const response = await fetch(`${this.baseURL}/api/eventos/ticket/`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${token}` },
+      });
+      if (!response.ok) return null;
+      const data = await response.json();
+      return data.ticket;
+    } catch {
+      return null;
+    }
+  }
 }
 
 export default new ApiService();